@@ -20,6 +20,7 @@ import requests
 from sec_api_client import SECAPIClient, FilingDocument
 # from flexible_table_parser import FlexibleTableParser  # Removed - module doesn't exist
 from standardization import standardize_investment_type, standardize_industry, standardize_reference_rate
+from output_writer import InvestmentCSVWriter
 # from rate_normalization import parse_interest_text, clean_percentage  # Removed - module doesn't exist
 
 def clean_percentage(value):
@@ -584,9 +585,7 @@ def extract_bxsl_investments(user_agent: str = "BDC-Extractor/1.0 contact@exampl
         'commitment_limit', 'undrawn_commitment'
     ]
 
-    with open(output_file, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
+    with InvestmentCSVWriter(output_file, fieldnames=fieldnames) as writer:
         for row in normalized_rows:
             # Apply standardization
             if 'investment_type' in row:
@@ -647,9 +646,7 @@ class BXSLExtractor:
             'principal_amount','cost','fair_value','interest_rate','reference_rate','spread','floor_rate','pik_rate'
         ]
         
-        with open(out_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
+        with InvestmentCSVWriter(out_file, fieldnames=fieldnames) as writer:
             
             for inv in investments:
                 # Handle both dict and object formats
@@ -10,11 +10,13 @@ from typing import List, Dict, Optional
 from collections import defaultdict
 from dataclasses import dataclass
 import os
-import csv
 import requests
 
 from sec_api_client import SECAPIClient
 from standardization import standardize_investment_type, standardize_industry, standardize_reference_rate
+from output_writer import InvestmentCSVWriter
+from instrumentation import timed
+from name_matching import CompanyNameIndex
 
 logger = logging.getLogger(__name__)
 
@@ -120,12 +122,10 @@ class CCAPExtractor:
         out_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'output')
         os.makedirs(out_dir, exist_ok=True)
         out_file = os.path.join(out_dir, 'CCAP_Crescent_Capital_BDC_Inc_investments.csv')
-        with open(out_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=[
+        with InvestmentCSVWriter(out_file, fieldnames=[
                 'company_name','industry','business_description','investment_type','acquisition_date','maturity_date',
                 'principal_amount','cost','fair_value','interest_rate','reference_rate','spread','floor_rate','pik_rate'
-            ])
-            writer.writeheader()
+            ]) as writer:
             for inv in investments:
                 # Apply standardization
                 standardized_inv_type = standardize_investment_type(inv.investment_type)
@@ -605,6 +605,7 @@ class CCAPExtractor:
         dates=[c.get('instant') for c in contexts if c.get('instant') and re.match(r'^\d{4}-\d{2}-\d{2}$', c.get('instant'))]
         return max(dates) if dates else None
 
+    @timed('html_fallback')
     def _extract_html_fallback(self, filing_url: str, investments: List[CCAPInvestment]) -> Optional[Dict[str, Dict]]:
         """Extract optional fields from HTML as fallback when XBRL doesn't have them."""
         try:
@@ -682,33 +683,15 @@ class CCAPExtractor:
         name = re.sub(r'^(the\s+)', '', name)
         return name
     
-    def _fuzzy_match_company_names(self, name1: str, name2: str, threshold: float = 0.8) -> bool:
-        """Check if two company names are similar enough to match."""
-        from difflib import SequenceMatcher
-        norm1 = self._normalize_company_name(name1)
-        norm2 = self._normalize_company_name(name2)
-        if not norm1 or not norm2:
-            return False
-        if norm1 == norm2:
-            return True
-        if norm1 in norm2 or norm2 in norm1:
-            return True
-        similarity = SequenceMatcher(None, norm1, norm2).ratio()
-        return similarity >= threshold
-    
     def _merge_html_data(self, investments: List[CCAPInvestment], html_data: Dict[str, Dict]):
         """Merge HTML-extracted optional fields into XBRL investments."""
         html_by_name = html_data.get('by_name', {})
         html_by_name_type = html_data.get('by_name_type', {})
         
-        # Create normalized lookup for fuzzy matching
-        html_by_normalized = {}
-        for html_inv in html_by_name.values():
-            company_name = html_inv.get('company_name', '').strip()
-            if company_name:
-                normalized = self._normalize_company_name(company_name)
-                if normalized and normalized not in html_by_normalized:
-                    html_by_normalized[normalized] = html_inv
+        # Normalized n-gram index for exact-normalized and fuzzy matching
+        name_index = CompanyNameIndex(normalizer=self._normalize_company_name)
+        for html_name, html_inv in html_by_name.items():
+            name_index.add(html_name, html_inv)
         
         merged_count = 0
         for inv in investments:
@@ -725,17 +708,9 @@ class CCAPExtractor:
             if not html_inv:
                 html_inv = html_by_name.get(company_name_lower)
             
-            # Strategy 3: Try normalized matching
-            if not html_inv:
-                normalized = self._normalize_company_name(inv.company_name)
-                html_inv = html_by_normalized.get(normalized)
-            
-            # Strategy 4: Fuzzy matching (last resort)
+            # Strategy 3: Normalized or fuzzy match via the name index
             if not html_inv:
-                for html_name, html_inv_candidate in html_by_name.items():
-                    if self._fuzzy_match_company_names(inv.company_name, html_name, threshold=0.8):
-                        html_inv = html_inv_candidate
-                        break
+                html_inv = name_index.lookup(inv.company_name, threshold=0.8)
             
             if html_inv:
                 merged = False
@@ -12,12 +12,12 @@ import re
 import html
 from typing import Optional, List, Dict
 import requests
-import csv
 from collections import defaultdict
 from dataclasses import dataclass
 
 from sec_api_client import SECAPIClient
 from standardization import standardize_investment_type, standardize_industry, standardize_reference_rate
+from output_writer import InvestmentCSVWriter
 
 logger = logging.getLogger(__name__)
 
@@ -128,14 +128,12 @@ class CGBDCustomExtractor:
         out_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'output')
         os.makedirs(out_dir, exist_ok=True)
         out_file = os.path.join(out_dir, 'CGBD_TCG_BDC_Inc_investments.csv')
-        with open(out_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=[
+        with InvestmentCSVWriter(out_file, fieldnames=[
                 'company_name', 'industry', 'business_description', 'investment_type',
                 'acquisition_date', 'maturity_date', 'principal_amount', 'cost', 'fair_value',
                 'interest_rate', 'reference_rate', 'spread', 'floor_rate', 'pik_rate',
                 'shares_units', 'percent_net_assets', 'currency', 'commitment_limit', 'undrawn_commitment'
-            ])
-            writer.writeheader()
+            ]) as writer:
             for inv in investments:
                 standardized_inv_type = standardize_investment_type(inv.investment_type)
                 standardized_industry = standardize_industry(inv.industry)
@@ -7,7 +7,6 @@ Parses investment data directly from SEC filings HTML.
 import os
 import re
 import logging
-import csv
 import requests
 from typing import List, Dict, Optional
 from collections import defaultdict
@@ -18,6 +17,7 @@ import os
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(__file__))
 from standardization import standardize_investment_type, standardize_industry, standardize_reference_rate
+from output_writer import InvestmentCSVWriter
 from sec_api_client import SECAPIClient
 
 logger = logging.getLogger(__name__)
@@ -79,14 +79,12 @@ class CSWCCustomExtractor:
         os.makedirs(output_dir, exist_ok=True)
         output_file = os.path.join(output_dir, 'CSWC_Capital_Southwest_Corp_investments.csv')
         
-        with open(output_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=[
+        with InvestmentCSVWriter(output_file, fieldnames=[
                 'company_name', 'industry', 'business_description', 'investment_type',
                 'acquisition_date', 'maturity_date', 'principal_amount', 'cost', 'fair_value',
                 'interest_rate', 'reference_rate', 'spread', 'floor_rate', 'pik_rate',
                 'shares_units', 'percent_net_assets', 'currency', 'commitment_limit', 'undrawn_commitment', 'shares_units'
-            ])
-            writer.writeheader()
+            ]) as writer:
             for inv in all_investments:
                 writer.writerow({
                     'company_name': inv.get('company_name', ''),
@@ -13,16 +13,26 @@ import os
 import sys
 import logging
 import glob
-import importlib
 import json
+import time
+from contextlib import nullcontext
 from datetime import datetime, timedelta, date
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Optional
 from pathlib import Path
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(__file__))
 
 from sec_api_client import SECAPIClient
+from filing_handle import FilingHandle, extract_from_filing, latest_filing_handle
+from instrumentation import (RunMetrics, metrics, instrument_extractor, instrument_requests,
+                             write_metrics_report, format_hotspots)
+from parser_registry import find_parser_files, load_extractor_class
+
+# The profiler is shared with the preferred-stock tools in the repo-root core/
+# package; appended so this directory's own modules (e.g. scripts) still win
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.profiling import ExtractionProfiler
 
 logging.basicConfig(
     level=logging.INFO,
@@ -35,61 +45,6 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def find_parser_files() -> List[Tuple[str, str]]:
-    """Find all parser files and their tickers."""
-    parser_dir = os.path.dirname(__file__)
-    parsers = []
-    seen_tickers = set()
-    
-    parser_files = glob.glob(os.path.join(parser_dir, '*_parser.py'))
-    custom_files = glob.glob(os.path.join(parser_dir, '*_custom_parser.py'))
-    
-    all_files = parser_files + custom_files
-    
-    for parser_file in all_files:
-        basename = os.path.basename(parser_file)
-        # Skip utility parsers
-        if basename in ['flexible_table_parser.py', 'verbose_identifier_parser.py', 
-                       'xbrl_typed_extractor.py', 'daily_update.py']:
-            continue
-        
-        # Extract ticker from filename
-        if '_custom_parser.py' in basename:
-            ticker = basename.replace('_custom_parser.py', '').upper()
-        else:
-            ticker = basename.replace('_parser.py', '').upper()
-        
-        # Skip if we've already seen this ticker
-        if ticker in seen_tickers:
-            continue
-        
-        seen_tickers.add(ticker)
-        parsers.append((ticker, parser_file))
-    
-    return sorted(parsers)
-
-
-def get_extractor_class(module, ticker: str):
-    """Get the extractor class from a module."""
-    # Try common class name patterns
-    class_names = [
-        f'{ticker}Extractor',
-        f'{ticker}CustomExtractor',
-        'Extractor',
-        'CustomExtractor'
-    ]
-    
-    for class_name in class_names:
-        if hasattr(module, class_name):
-            return getattr(module, class_name)
-    
-    # Special cases
-    if ticker == 'FDUS':
-        return getattr(module, 'FDUSExtractor')
-    
-    return None
-
-
 def check_for_new_filing(ticker: str, sec_client: SECAPIClient, 
                          last_update_date: Optional[date] = None) -> Optional[date]:
     """
@@ -142,8 +97,16 @@ def get_last_update_time(output_dir: str) -> Dict[str, datetime]:
     return last_updates
 
 
-def run_parser(ticker: str, parser_file: str) -> Dict:
-    """Run a single parser and return results."""
+def run_parser(ticker: str, parser_file: str, handle: Optional[FilingHandle] = None) -> Dict:
+    """
+    Run a single parser and return results.
+
+    Args:
+        ticker: Company ticker symbol
+        parser_file: Path of the parser module
+        handle: Filing already found by the new-filing check; the parser is
+            pinned to it instead of looking up the latest filing again
+    """
     result = {
         'ticker': ticker,
         'parser_file': os.path.basename(parser_file),
@@ -151,14 +114,13 @@ def run_parser(ticker: str, parser_file: str) -> Dict:
         'error': None,
         'investments_count': 0
     }
+    metrics.reset()
     
     try:
-        # Import the parser module
+        # Import the parser module and get its extractor class
         module_name = os.path.basename(parser_file).replace('.py', '')
-        module = importlib.import_module(module_name)
-        
-        # Get extractor class
-        extractor_class = get_extractor_class(module, ticker)
+        with metrics.span('import'):
+            extractor_class = load_extractor_class(ticker, module_name)
         if not extractor_class:
             result['status'] = 'skipped'
             result['error'] = f'No extractor class found'
@@ -166,6 +128,7 @@ def run_parser(ticker: str, parser_file: str) -> Dict:
         
         # Create extractor instance
         extractor = extractor_class()
+        instrument_extractor(extractor)
         
         # Check if extract_from_ticker exists
         if not hasattr(extractor, 'extract_from_ticker'):
@@ -175,10 +138,14 @@ def run_parser(ticker: str, parser_file: str) -> Dict:
         
         # Run the extractor
         logger.info(f"Running {ticker} parser...")
-        try:
-            data = extractor.extract_from_ticker(ticker)
-        except TypeError:
-            data = extractor.extract_from_ticker()
+        with metrics.span('extract'):
+            if handle is not None and hasattr(extractor, 'sec_client'):
+                data = extract_from_filing(extractor, handle)
+            else:
+                try:
+                    data = extractor.extract_from_ticker(ticker)
+                except TypeError:
+                    data = extractor.extract_from_ticker()
         
         # Extract investment count
         if isinstance(data, dict):
@@ -192,6 +159,7 @@ def run_parser(ticker: str, parser_file: str) -> Dict:
         result['error'] = str(e)
         logger.error(f"[ERROR] {ticker}: {result['error']}")
     
+    result['metrics'] = metrics.snapshot()
     return result
 
 
@@ -229,7 +197,7 @@ def save_filing_dates(filing_dates: Dict[str, Dict], output_dir: str):
     
     logger.info(f"Saved filing dates to {filing_info_file}")
 
-def main(force_all: bool = False, days_back: int = 7):
+def main(force_all: bool = False, days_back: int = 7, profile: bool = False, profile_dir: str = None):
     """Main function to check for updates and run parsers."""
     logger.info("=" * 80)
     logger.info("DAILY UPDATE CHECK")
@@ -239,6 +207,11 @@ def main(force_all: bool = False, days_back: int = 7):
     logger.info(f"Days back: {days_back}")
     logger.info("")
     
+    try:
+        instrument_requests()
+    except ImportError:
+        logger.warning("requests not available, HTTP metrics disabled")
+    
     # Initialize SEC client
     sec_client = SECAPIClient()
     
@@ -262,12 +235,13 @@ def main(force_all: bool = False, days_back: int = 7):
     
     if force_all:
         logger.info("Force mode: Running all parsers")
-        parsers_to_run = parsers
+        parsers_to_run = [(ticker, parser_file, None) for ticker, parser_file in parsers]
     else:
         logger.info("Checking for new 10-Q filings...")
         
         for ticker, parser_file in parsers:
             should_run = False
+            handle = None
             
             # Always check for new 10-Q filings, regardless of CSV age
             if ticker in last_updates:
@@ -297,6 +271,7 @@ def main(force_all: bool = False, days_back: int = 7):
                     }
                     logger.info(f"{ticker}: New {filing_type} filing found (date: {new_filing_date}), updating.")
                     should_run = True
+                    handle = latest_filing_handle(sec_client, ticker)
                 else:
                     # Still track the latest filing date even if no update needed
                     q_date = sec_client.get_latest_filing_date(ticker, ["10-Q"])
@@ -344,6 +319,7 @@ def main(force_all: bool = False, days_back: int = 7):
                     }
                     logger.info(f"{ticker}: Found {filing_type} filing (date: {latest_filing_date}), running parser...")
                     should_run = True
+                    handle = latest_filing_handle(sec_client, ticker)
                 else:
                     # Still track if there's any filing available
                     q_date = sec_client.get_latest_filing_date(ticker, ["10-Q"])
@@ -368,17 +344,22 @@ def main(force_all: bool = False, days_back: int = 7):
                     logger.info(f"{ticker}: No 10-Q filings found, skipping")
             
             if should_run:
-                parsers_to_run.append((ticker, parser_file))
+                parsers_to_run.append((ticker, parser_file, handle))
         
         logger.info(f"Found {len(parsers_to_run)} parsers to run")
         logger.info("")
     
     # Run parsers if any need updating
     results = []
+    run_totals = RunMetrics()
+    run_start = time.perf_counter()
+    profiler = ExtractionProfiler(profile_dir) if profile else None
     if parsers_to_run:
-        for ticker, parser_file in parsers_to_run:
-            result = run_parser(ticker, parser_file)
+        for ticker, parser_file, handle in parsers_to_run:
+            with profiler.profile(ticker) if profiler else nullcontext():
+                result = run_parser(ticker, parser_file, handle)
             results.append(result)
+            run_totals.merge(metrics)
             logger.info("")
         
         # Summary
@@ -409,7 +390,20 @@ def main(force_all: bool = False, days_back: int = 7):
         
         total_investments = sum(r['investments_count'] for r in successful)
         logger.info(f"Total investments updated: {total_investments}")
+        for line in format_hotspots(results, run_totals):
+            logger.info(line)
         logger.info("=" * 80)
+        
+        try:
+            write_metrics_report(os.path.join(output_dir, 'run_metrics.json'), results, run_totals,
+                                 time.perf_counter() - run_start)
+        except Exception as e:
+            logger.warning(f"Could not write run metrics: {e}")
+        
+        if profiler:
+            summary_path = profiler.write_summary()
+            if summary_path:
+                logger.info(f"Profile summary: {summary_path}")
     else:
         logger.info("No parsers to run. All up to date!")
     
@@ -440,6 +434,14 @@ def main(force_all: bool = False, days_back: int = 7):
     # Save filing dates for frontend (always save to track all BDCs)
     save_filing_dates(filing_dates, output_dir)
     logger.info(f"Updated filing dates for {len(filing_dates)} BDCs")
+    
+    # Resolve portfolio companies from new/changed CSVs into the cross-BDC entity index
+    if any(r['status'] == 'success' for r in results):
+        try:
+            from entity_resolution import update_entity_index
+            update_entity_index(output_dir)
+        except Exception as e:
+            logger.warning(f"Could not update company entity index: {e}")
 
 
 if __name__ == '__main__':
@@ -451,7 +453,13 @@ if __name__ == '__main__':
     parser.add_argument('--days-back', type=int, default=7,
                        help='Number of days to look back for new filings (default: 7)')
     
+    parser.add_argument('--profile', action='store_true',
+                       help='Profile each parser run (cProfile + tracemalloc) into output/profiles/')
+    parser.add_argument('--profile-dir', default=None,
+                       help='Directory for profile files (default: output/profiles/<timestamp>)')
+    
     args = parser.parse_args()
     
-    main(force_all=args.force_all, days_back=args.days_back)
+    main(force_all=args.force_all, days_back=args.days_back,
+         profile=args.profile, profile_dir=args.profile_dir)
 
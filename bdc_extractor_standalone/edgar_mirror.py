@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Local EDGAR mirror backend for SEC requests.
+
+The mirror is a directory laid out like the SEC's own URL space:
+
+  <root>/files/company_tickers.json
+  <root>/submissions/CIK##########.json
+  <root>/Archives/edgar/data/{cik}/{accession}/...
+
+so https://www.sec.gov/Archives/edgar/data/1287750/000128775024000012/x.htm
+is served from <root>/Archives/edgar/data/1287750/000128775024000012/x.htm.
+It is filled by scripts/sync_edgar_mirror.py (or by running in 'fallback'
+mode, which stores the archive files it has to download).
+
+Only Archives/edgar/data/... files are immutable. Submissions JSON,
+company_tickers.json and browse-edgar listings change with every new
+filing, so fallback mode always fetches them live and never stores them;
+otherwise a run would keep finding the "latest" filing of its first run.
+They are served from the mirror only in offline mode, as last written by
+sync_edgar_mirror.py.
+
+Modes:
+  offline   never touch the network; SEC URLs missing from the mirror get a 404
+  fallback  serve archive files from the mirror, download (and store) missing
+            ones; fetch everything else live
+
+Set BDC_EDGAR_MIRROR=<dir> (and optionally BDC_EDGAR_MIRROR_MODE) to route
+every SEC request of a run through the mirror, including the ones parsers
+make with requests.get directly.
+"""
+
+import os
+import hashlib
+import logging
+import mimetypes
+import tempfile
+import threading
+from typing import Callable, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+logger = logging.getLogger(__name__)
+
+MIRROR_ENV_VAR = 'BDC_EDGAR_MIRROR'
+MIRROR_MODE_ENV_VAR = 'BDC_EDGAR_MIRROR_MODE'
+
+MODE_OFFLINE = 'offline'
+MODE_FALLBACK = 'fallback'
+MODES = (MODE_OFFLINE, MODE_FALLBACK)
+
+DEFAULT_MIRROR_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sec_mirror')
+
+SEC_HOSTS = ('www.sec.gov', 'sec.gov', 'data.sec.gov')
+
+_ARCHIVES_PREFIX = ('Archives', 'edgar', 'data')
+
+
+class EdgarMirror:
+    """Serves SEC URLs from a local directory tree, optionally filling it from the network."""
+
+    def __init__(self, root: str, mode: str = MODE_FALLBACK):
+        """
+        Initialize the mirror.
+
+        Args:
+            root: Mirror root directory
+            mode: 'offline' or 'fallback'
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown mirror mode {mode!r}; expected one of {', '.join(MODES)}")
+        self.root = os.path.abspath(root)
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def offline(self) -> bool:
+        return self.mode == MODE_OFFLINE
+
+    def path_for(self, url: str) -> Optional[str]:
+        """
+        Local file for an SEC URL, or None if the URL is not an SEC URL.
+
+        CIK directories under Archives/edgar/data are stored without leading
+        zeros, as EDGAR itself does, so padded and unpadded URLs share a file.
+        URLs with a query string are stored next to their path with a hash suffix.
+        """
+        parts = urlsplit(url)
+        if parts.netloc.lower() not in SEC_HOSTS:
+            return None
+        segments = [s for s in parts.path.split('/') if s]
+        if not segments or any(s in ('.', '..') for s in segments):
+            return None
+        if tuple(segments[:3]) == _ARCHIVES_PREFIX and len(segments) > 3 and segments[3].isdigit():
+            segments[3] = segments[3].lstrip('0') or '0'
+        if parts.query:
+            digest = hashlib.sha1(parts.query.encode('utf-8')).hexdigest()[:16]
+            segments[-1] = f"{segments[-1]}@{digest}"
+        return os.path.join(self.root, *segments)
+
+    @staticmethod
+    def is_archive(url: str) -> bool:
+        """Whether an SEC URL is an immutable Archives/edgar/data file."""
+        segments = [s for s in urlsplit(url).path.split('/') if s]
+        return tuple(segments[:3]) == _ARCHIVES_PREFIX and len(segments) > 3
+
+    def has(self, url: str) -> bool:
+        path = self.path_for(url)
+        return path is not None and os.path.exists(path)
+
+    def serves(self, url: str) -> bool:
+        """Whether fetch() would answer this URL from disk rather than the network."""
+        return (self.offline or self.is_archive(url)) and self.has(url)
+
+    def store(self, url: str, content: bytes) -> Optional[str]:
+        """Atomically write a downloaded body into the mirror; returns the path written."""
+        path = self.path_for(url)
+        if path is None:
+            return None
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp_')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return path
+
+    def fetch(self, url: str, download: Callable[[], requests.Response], store: bool = True) -> requests.Response:
+        """
+        Return the mirrored response for an SEC URL.
+
+        Args:
+            url: Requested URL
+            download: Performs the live request when the URL is not mirrored
+            store: Write successful archive downloads into the mirror
+
+        Returns:
+            A requests.Response; a 404 for unmirrored SEC URLs in offline mode
+        """
+        path = self.path_for(url)
+        if path is None:
+            return download()
+        if not self.offline and not self.is_archive(url):
+            # Mutable endpoint (submissions, company_tickers, browse-edgar): always live
+            return download()
+        if os.path.exists(path):
+            with self._lock:
+                self.hits += 1
+            return _local_response(url, path)
+        with self._lock:
+            self.misses += 1
+        if self.offline:
+            logger.debug(f"Not in EDGAR mirror: {url}")
+            return _missing_response(url)
+        response = download()
+        if store and response.status_code == 200:
+            try:
+                self.store(url, response.content)
+            except OSError as e:
+                logger.warning(f"Could not store {url} in EDGAR mirror: {e}")
+        return response
+
+    def get(self, url: str, headers: Optional[dict] = None, **kwargs) -> requests.Response:
+        """Drop-in for requests.get that goes through the mirror."""
+        if self is _installed_mirror:
+            # The requests hook already sends this GET through fetch(); calling
+            # fetch here too would count (and store) a miss twice
+            return requests.get(url, headers=headers, **kwargs)
+        return self.fetch(url, lambda: requests.get(url, headers=headers, **kwargs),
+                          store=not kwargs.get('stream'))
+
+
+def _local_response(url: str, path: str) -> requests.Response:
+    """Build a requests.Response from a mirrored file, as the live request would."""
+    with open(path, 'rb') as f:
+        content = f.read()
+    name = os.path.basename(path).split('@', 1)[0]
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    response = requests.Response()
+    response.status_code = 200
+    response.reason = 'OK'
+    response.url = url
+    response._content = content
+    response.headers = CaseInsensitiveDict({'Content-Type': content_type, 'Content-Length': str(len(content))})
+    response.encoding = get_encoding_from_headers(response.headers)
+    return response
+
+
+def _missing_response(url: str) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 404
+    response.reason = 'Not in local EDGAR mirror'
+    response.url = url
+    response._content = b''
+    response.headers = CaseInsensitiveDict({'Content-Length': '0'})
+    return response
+
+
+def mirror_from_env() -> Optional[EdgarMirror]:
+    """EdgarMirror configured by BDC_EDGAR_MIRROR / BDC_EDGAR_MIRROR_MODE, or None."""
+    root = os.environ.get(MIRROR_ENV_VAR, '').strip()
+    if not root:
+        return None
+    mode = os.environ.get(MIRROR_MODE_ENV_VAR, '').strip().lower() or MODE_FALLBACK
+    return EdgarMirror(root, mode)
+
+
+_installed_mirror: Optional[EdgarMirror] = None
+
+
+def install_mirror(mirror: EdgarMirror) -> EdgarMirror:
+    """
+    Route every GET to an SEC host made through `requests` via the mirror.
+
+    Parsers call requests.get directly as well as through SECAPIClient, so
+    the hook sits on requests.Session.request. Only the first mirror
+    installed in a process takes effect; later calls return it.
+    """
+    global _installed_mirror
+    if _installed_mirror is not None:
+        return _installed_mirror
+
+    original_request = requests.Session.request
+
+    def request(session, method, url, *args, **kwargs):
+        if method.upper() != 'GET':
+            return original_request(session, method, url, *args, **kwargs)
+        full_url = url
+        if kwargs.get('params'):
+            full_url = requests.Request('GET', url, params=kwargs['params']).prepare().url
+        return mirror.fetch(full_url, lambda: original_request(session, method, url, *args, **kwargs),
+                            store=not kwargs.get('stream'))
+
+    requests.Session.request = request
+    _installed_mirror = mirror
+    logger.info(f"Serving SEC requests from EDGAR mirror {mirror.root} ({mirror.mode})")
+    return mirror
+
+
+def installed_mirror() -> Optional[EdgarMirror]:
+    """The mirror hooked into `requests` in this process, if any."""
+    return _installed_mirror
+
+
+def install_from_env() -> Optional[EdgarMirror]:
+    """Install the mirror configured in the environment, if any. Safe to call more than once."""
+    if _installed_mirror is not None:
+        return _installed_mirror
+    mirror = mirror_from_env()
+    if mirror is not None:
+        install_mirror(mirror)
+    return mirror
+
+
+def enable_mirror(root: Optional[str] = None, mode: str = MODE_FALLBACK) -> EdgarMirror:
+    """
+    Use a mirror for the rest of this process and any child processes.
+
+    Args:
+        root: Mirror root directory (default: DEFAULT_MIRROR_DIR)
+        mode: 'offline' or 'fallback'
+
+    Returns:
+        The installed mirror
+    """
+    mirror = EdgarMirror(root or DEFAULT_MIRROR_DIR, mode)
+    os.environ[MIRROR_ENV_VAR] = mirror.root
+    os.environ[MIRROR_MODE_ENV_VAR] = mirror.mode
+    return install_mirror(mirror)
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Cross-BDC portfolio company entity resolution.
+
+Assigns a stable company id to every portfolio company name found in the
+investment CSVs, across all BDCs and periods. The index is persisted to
+output/company_entities.json and updated incrementally: only CSVs whose
+modification time changed since the last run are re-read.
+
+A flat output/company_entity_map.csv (ticker, period, company_name,
+company_id) is written alongside it, so cross-holder exposure queries are
+plain joins on company_id.
+"""
+
+import os
+import re
+import csv
+import json
+import glob
+import hashlib
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from name_matching import CompanyNameIndex, normalize_company_name
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUTPUT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'output')
+INDEX_FILENAME = 'company_entities.json'
+MAP_FILENAME = 'company_entity_map.csv'
+
+# Historical CSVs from fetch_historical_holdings.py: TICKER_YYYY_MM_DD_10_Q_investments.csv
+HISTORICAL_CSV_RE = re.compile(r'^([A-Z0-9]+)_(\d{4}_\d{2}_\d{2})_(10_[QK])_investments\.csv$')
+
+
+def _normalize_entity_name_once(name: str) -> str:
+    name = normalize_company_name(name)
+    if not name:
+        return ""
+    name = name.replace('&amp;', '&')
+    name = re.sub(r'\s*[,.]\s*', ' ', name)
+    name = re.sub(r'\s+', ' ', name).strip()
+    # Legal suffixes can trail once punctuation is gone ("acme, inc." -> "acme inc")
+    return re.sub(r'\s+(inc|incorporated|corp|corporation|ltd|limited|llc|lp|l p|l l c|co)$', '', name)
+
+
+def normalize_entity_name(name: str) -> str:
+    """
+    Normalize a company name into a cross-BDC entity key.
+
+    Stripping one suffix or article can expose another ("foo co., inc." ->
+    "foo co" -> "foo"), so the pass repeats until nothing changes. Keys are
+    therefore stable under re-normalization, which the index relies on.
+    """
+    previous = None
+    while name and name != previous:
+        previous = name
+        name = _normalize_entity_name_once(name)
+    return name or ""
+
+
+def parse_csv_filename(filename: str) -> Tuple[str, str]:
+    """Return (ticker, period) for an investments CSV; period is 'latest' for current files."""
+    m = HISTORICAL_CSV_RE.match(filename)
+    if m:
+        return m.group(1), f"{m.group(2).replace('_', '-')} {m.group(3).replace('_', '-')}"
+    return filename.split('_')[0].upper(), 'latest'
+
+
+class CompanyEntityIndex:
+    """
+    Persistent company name -> company id index.
+
+    Every distinct normalized name is an alias of exactly one entity. New
+    names are blocked with CompanyNameIndex against each entity's canonical
+    name (the alias that created it) and join that entity when the
+    similarity clears match_threshold; otherwise they start a new entity.
+    Matching only canonical names keeps aliases from chaining (A close to
+    B, B close to C does not pull C into A's entity), and containment
+    alone ("Pet" in "Pet Holdings") is not a match. Ids never change once
+    assigned.
+    """
+
+    def __init__(self, index_path: Optional[str] = None, match_threshold: float = 0.92):
+        """
+        Initialize the index, loading any previously saved state.
+
+        Args:
+            index_path: JSON file backing the index (default: output/company_entities.json)
+            match_threshold: Minimum similarity for a new alias to join an existing entity
+        """
+        self.index_path = index_path or os.path.join(DEFAULT_OUTPUT_DIR, INDEX_FILENAME)
+        self.match_threshold = match_threshold
+        self.entities: Dict[str, Dict] = {}
+        self.aliases: Dict[str, str] = {}
+        self.holdings: Dict[str, Dict[str, Dict[str, List[str]]]] = {}
+        self.sources: Dict[str, float] = {}
+        self._name_index = CompanyNameIndex(normalizer=normalize_entity_name, allow_containment=False)
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.warning(f"Could not read entity index {self.index_path}: {e}")
+            return
+        self.entities = data.get('entities', {})
+        self.holdings = data.get('holdings', {})
+        self.sources = data.get('sources', {})
+        # Re-key stored aliases with the current normalizer (a no-op for keys it
+        # produced); when two old aliases now collapse, the first entity keeps the key
+        self.aliases = {}
+        for key, entity_id in data.get('aliases', {}).items():
+            self.aliases.setdefault(normalize_entity_name(key), entity_id)
+        for entity_id, entity in self.entities.items():
+            aliases = [normalize_entity_name(alias) for alias in entity.get('aliases', [])]
+            entity['aliases'] = list(dict.fromkeys(a for a in aliases if a))
+            canonical = entity['aliases'][0] if entity['aliases'] else normalize_entity_name(entity.get('name', ''))
+            self._name_index.add(canonical, entity_id, normalized=True)
+
+    def save(self):
+        """Write the index atomically (temp file + rename)."""
+        os.makedirs(os.path.dirname(self.index_path) or '.', exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'updated_at': datetime.now().isoformat(),
+                'entities': self.entities,
+                'aliases': self.aliases,
+                'holdings': self.holdings,
+                'sources': self.sources,
+            }, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+        logger.info(f"Saved entity index ({len(self.entities)} companies) to {self.index_path}")
+
+    def _new_entity_id(self, key: str) -> str:
+        entity_id = 'C' + hashlib.sha1(key.encode('utf-8')).hexdigest()[:10]
+        suffix = 1
+        base = entity_id
+        while entity_id in self.entities:
+            suffix += 1
+            entity_id = f"{base}-{suffix}"
+        return entity_id
+
+    def resolve(self, company_name: str) -> Optional[str]:
+        """
+        Return the company id for a name, creating a new entity if nothing matches.
+
+        Args:
+            company_name: Raw company name as it appears in a schedule
+
+        Returns:
+            Stable company id, or None for empty names
+        """
+        key = normalize_entity_name(company_name)
+        if not key:
+            return None
+        entity_id = self.aliases.get(key)
+        if entity_id:
+            return entity_id
+
+        entity_id = self._name_index.lookup(key, threshold=self.match_threshold, normalized=True)
+        if not entity_id:
+            entity_id = self._new_entity_id(key)
+            self.entities[entity_id] = {'name': company_name.strip(), 'aliases': []}
+            # Only canonical names are matched against, so aliases can't chain
+            self._name_index.add(key, entity_id, normalized=True)
+            logger.debug(f"New entity {entity_id}: {company_name}")
+        self.entities[entity_id]['aliases'].append(key)
+        self.aliases[key] = entity_id
+        return entity_id
+
+    def lookup(self, company_name: str) -> Optional[str]:
+        """Return the company id for a name without creating new entities."""
+        key = normalize_entity_name(company_name)
+        if not key:
+            return None
+        return self.aliases.get(key) or self._name_index.lookup(key, threshold=self.match_threshold, normalized=True)
+
+    def ingest_csv(self, csv_path: str) -> int:
+        """
+        Resolve every company in one investments CSV and record its holder/period.
+
+        Returns:
+            Number of rows resolved
+        """
+        ticker, period = parse_csv_filename(os.path.basename(csv_path))
+        # Replace this holder/period's previous snapshot rather than accumulating
+        for holders in self.holdings.values():
+            periods = holders.get(ticker)
+            if periods and period in periods:
+                periods.remove(period)
+                if not periods:
+                    del holders[ticker]
+
+        count = 0
+        with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+            for row in csv.DictReader(f):
+                entity_id = self.resolve(row.get('company_name') or '')
+                if not entity_id:
+                    continue
+                periods = self.holdings.setdefault(entity_id, {}).setdefault(ticker, [])
+                if period not in periods:
+                    periods.append(period)
+                count += 1
+        self.sources[os.path.basename(csv_path)] = os.path.getmtime(csv_path)
+        return count
+
+    def update_from_directory(self, output_dir: str = DEFAULT_OUTPUT_DIR, force: bool = False) -> Dict[str, int]:
+        """
+        Ingest new or modified investments CSVs from a directory.
+
+        Args:
+            output_dir: Directory containing *_investments.csv files
+            force: Re-ingest every CSV regardless of modification time
+
+        Returns:
+            Dict with files_processed, rows_resolved and total companies
+        """
+        files_processed = 0
+        rows_resolved = 0
+        for csv_path in sorted(glob.glob(os.path.join(output_dir, '*_investments.csv'))):
+            name = os.path.basename(csv_path)
+            mtime = os.path.getmtime(csv_path)
+            if not force and self.sources.get(name) == mtime:
+                continue
+            try:
+                rows_resolved += self.ingest_csv(csv_path)
+                files_processed += 1
+            except Exception as e:
+                logger.warning(f"Could not ingest {name}: {e}")
+        return {
+            'files_processed': files_processed,
+            'rows_resolved': rows_resolved,
+            'companies': len(self.entities),
+        }
+
+    def holders_of(self, entity_id: str) -> Dict[str, List[str]]:
+        """Return {ticker: [periods]} for every BDC holding the company."""
+        return self.holdings.get(entity_id, {})
+
+    def shared_holdings(self, min_holders: int = 2) -> List[Tuple[str, str, List[str]]]:
+        """Return (company_id, name, tickers) for companies held by at least min_holders BDCs."""
+        shared = []
+        for entity_id, holders in self.holdings.items():
+            if len(holders) >= min_holders:
+                shared.append((entity_id, self.entities[entity_id]['name'], sorted(holders)))
+        shared.sort(key=lambda x: (-len(x[2]), x[1]))
+        return shared
+
+    def write_entity_map(self, output_dir: str = DEFAULT_OUTPUT_DIR) -> str:
+        """Write ticker/period/company_name/company_id rows for joins."""
+        map_path = os.path.join(output_dir, MAP_FILENAME)
+        tmp_path = f"{map_path}.tmp"
+        with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['company_id', 'company_name', 'ticker', 'period'])
+            for entity_id in sorted(self.holdings):
+                name = self.entities[entity_id]['name']
+                for ticker, periods in sorted(self.holdings[entity_id].items()):
+                    for period in sorted(periods):
+                        writer.writerow([entity_id, name, ticker, period])
+        os.replace(tmp_path, map_path)
+        logger.info(f"Saved entity map to {map_path}")
+        return map_path
+
+
+def update_entity_index(output_dir: str = DEFAULT_OUTPUT_DIR, force: bool = False) -> Dict[str, int]:
+    """Incrementally refresh the persisted entity index and map for an output directory."""
+    index = CompanyEntityIndex(os.path.join(output_dir, INDEX_FILENAME))
+    stats = index.update_from_directory(output_dir, force=force)
+    if stats['files_processed']:
+        index.save()
+        index.write_entity_map(output_dir)
+    logger.info(f"Entity index: {stats['files_processed']} files, {stats['rows_resolved']} rows, "
+                f"{stats['companies']} companies")
+    return stats
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Build or update the cross-BDC company entity index')
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR,
+                        help='Directory containing *_investments.csv files')
+    parser.add_argument('--rebuild', action='store_true',
+                        help='Discard the saved index and rebuild from scratch')
+    parser.add_argument('--shared', type=int, default=0, metavar='N',
+                        help='Print companies held by at least N BDCs')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    index_path = os.path.join(args.output_dir, INDEX_FILENAME)
+    if args.rebuild and os.path.exists(index_path):
+        os.remove(index_path)
+    update_entity_index(args.output_dir)
+
+    if args.shared:
+        index = CompanyEntityIndex(index_path)
+        for entity_id, name, tickers in index.shared_holdings(min_holders=args.shared):
+            print(f"{entity_id}  {name}  ({len(tickers)}): {', '.join(tickers)}")
+
+
+if __name__ == '__main__':
+    main()
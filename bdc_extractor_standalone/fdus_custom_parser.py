@@ -10,11 +10,11 @@ from typing import List, Dict, Optional
 from collections import defaultdict
 from dataclasses import dataclass
 import os
-import csv
 import requests
 
 from sec_api_client import SECAPIClient
 from standardization import standardize_investment_type, standardize_industry, standardize_reference_rate
+from output_writer import InvestmentCSVWriter
 
 logger = logging.getLogger(__name__)
 
@@ -115,12 +115,10 @@ class FDUSExtractor:
         out_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'output')
         os.makedirs(out_dir, exist_ok=True)
         out_file = os.path.join(out_dir, 'FDUS_Fidus_Investment_Corp_investments.csv')
-        with open(out_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=[
+        with InvestmentCSVWriter(out_file, fieldnames=[
                 'company_name','industry','business_description','investment_type','acquisition_date','maturity_date',
                 'principal_amount','cost','fair_value','interest_rate','reference_rate','spread','floor_rate','pik_rate'
-            ])
-            writer.writeheader()
+            ]) as writer:
             for inv in investments:
                 # Apply standardization
                 standardized_inv_type = standardize_investment_type(inv.investment_type)
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Run any BDC extractor against a specific, pre-resolved filing.
+
+Extractors only expose extract_from_ticker, which always resolves the
+latest filing itself. A FilingHandle carries a filing that has already
+been resolved (CIK, accession, form, document listing); extract_from_filing
+runs an unmodified extractor against it by pinning the extractor's SEC
+client, so historical and daily runs fetch each filing's index once and
+never re-resolve "latest".
+"""
+
+import csv
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+from sec_api_client import FilingDocument, SECAPIClient
+from output_writer import redirect_output
+
+logger = logging.getLogger(__name__)
+
+# Periodic reports carrying a schedule of investments. Parsers look up
+# whichever of these they support (most only ask for "10-Q"), so any of them,
+# amendments included, resolves to the handle being extracted.
+PERIODIC_FORMS = ('10-Q', '10-K')
+
+
+@dataclass
+class FilingHandle:
+    """A resolved filing: enough to locate its documents without another lookup."""
+    ticker: str
+    cik: str
+    accession: str
+    form: str
+    filing_date: Optional[str] = None
+    report_date: Optional[str] = None
+    documents: Optional[List[FilingDocument]] = None  # index listing, filled on first use
+
+    @property
+    def folder_url(self) -> str:
+        return f"https://www.sec.gov/Archives/edgar/data/{int(self.cik)}/{self.accession.replace('-', '')}"
+
+    @property
+    def index_url(self) -> str:
+        return f"{self.folder_url}/{self.accession}-index.html"
+
+    @property
+    def txt_url(self) -> str:
+        return f"{self.folder_url}/{self.accession}.txt"
+
+
+class PinnedSECClient:
+    """
+    SECAPIClient wrapper that resolves the ticker's filing lookups to one handle.
+
+    Extractors find their filing with get_filing_index_url (whatever year or
+    min_date they ask for) and list it with get_documents_from_index, so
+    pinning those two calls is enough to point extract_from_ticker at the
+    handle. Every periodic-form lookup for the handle's ticker is pinned,
+    whatever form the parser asks for: a 10-Q-only parser run on a 10-K
+    handle must read the 10-K, not the live latest 10-Q. Lookups of other
+    forms for the ticker go to the wrapped client and are recorded in
+    live_lookups; everything else passes through.
+    """
+
+    def __init__(self, client: SECAPIClient, handle: FilingHandle):
+        self._client = client
+        self.handle = handle
+        self.live_lookups: List[str] = []
+
+    def _is_pinned(self, ticker: Optional[str], filing_type: Optional[str] = None) -> bool:
+        if (ticker or '').upper() != self.handle.ticker.upper():
+            return False
+        if filing_type is None:
+            return True
+        form = filing_type.upper()
+        return form.split('/')[0].strip() in PERIODIC_FORMS or self.handle.form.upper().startswith(form)
+
+    def get_cik(self, ticker: str) -> Optional[str]:
+        if self._is_pinned(ticker):
+            return self.handle.cik
+        return self._client.get_cik(ticker)
+
+    def get_filing_index_url(self, ticker: str, filing_type: str, cik: Optional[str] = None,
+                             year: Optional[int] = None, min_date: Optional[str] = None) -> Optional[str]:
+        if self._is_pinned(ticker, filing_type):
+            return self.handle.index_url
+        if self._is_pinned(ticker):
+            self.live_lookups.append(filing_type)
+        return self._client.get_filing_index_url(ticker, filing_type, cik=cik, year=year, min_date=min_date)
+
+    def get_documents_from_index(self, index_url: str) -> List[FilingDocument]:
+        if index_url != self.handle.index_url:
+            return self._client.get_documents_from_index(index_url)
+        if self.handle.documents is None:
+            self.handle.documents = self._client.get_documents_from_index(index_url)
+        return self.handle.documents
+
+    def __getattr__(self, name: str):
+        return getattr(self._client, name)
+
+
+def latest_filing_handle(sec_client: SECAPIClient, ticker: str,
+                         filing_types: Iterable[str] = ('10-Q', '10-K')) -> Optional[FilingHandle]:
+    """
+    Resolve a ticker's most recent filing of the given types (by report date).
+
+    Args:
+        sec_client: SEC API client
+        ticker: Company ticker symbol
+        filing_types: Forms to consider
+
+    Returns:
+        FilingHandle, or None if the company has no such filing
+    """
+    cik = sec_client.get_cik(ticker)
+    if not cik:
+        return None
+    try:
+        recent = sec_client.get_submissions(cik)['filings']['recent']
+    except Exception as e:
+        logger.error(f"Error fetching submissions for {ticker}: {e}")
+        return None
+
+    forms = set(filing_types)
+    best = None
+    for i, form in enumerate(recent['form']):
+        if form not in forms:
+            continue
+        report_date = recent.get('reportDate', [None] * (i + 1))[i] or ''
+        key = (report_date, recent['filingDate'][i])
+        if best is None or key > best[0]:
+            best = (key, i)
+    if best is None:
+        return None
+    i = best[1]
+    return FilingHandle(ticker=ticker.upper(), cik=cik, accession=recent['accessionNumber'][i],
+                        form=recent['form'][i], filing_date=recent['filingDate'][i],
+                        report_date=recent.get('reportDate', [None] * (i + 1))[i] or None)
+
+
+def extract_from_filing(extractor, handle: FilingHandle, output_dir: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Run an extractor against a specific filing.
+
+    Extractors that define extract_from_filing(handle) are called directly;
+    for the rest, extract_from_ticker runs with the extractor's sec_client
+    pinned to the handle.
+
+    Args:
+        extractor: BDC extractor instance
+        handle: Filing to extract
+        output_dir: Write the extractor's CSVs here instead of their usual
+            path (keeps the latest-filing CSVs in output/ untouched)
+
+    Returns:
+        The extractor's result dict plus accession_number, form_type,
+        filing_date and output_files (CSVs written)
+
+    Raises:
+        RuntimeError: If the extractor resolved the ticker's filing through
+            the live client, so its result is not the handle's filing
+    """
+    if hasattr(extractor, 'extract_from_filing'):
+        run = lambda: extractor.extract_from_filing(handle)
+    elif hasattr(extractor, 'extract_from_ticker') and hasattr(extractor, 'sec_client'):
+        run = lambda: extractor.extract_from_ticker(handle.ticker)
+    else:
+        raise TypeError(f"{type(extractor).__name__} cannot be pointed at a specific filing")
+
+    original_client = getattr(extractor, 'sec_client', None)
+    pinned = None
+    if original_client is not None and not isinstance(original_client, PinnedSECClient):
+        pinned = extractor.sec_client = PinnedSECClient(original_client, handle)
+    try:
+        if output_dir:
+            with redirect_output(output_dir) as written:
+                result = run()
+            output_files = list(written)
+        else:
+            result = run()
+            output_files = []
+    finally:
+        if original_client is not None:
+            extractor.sec_client = original_client
+
+    if pinned is not None and pinned.live_lookups:
+        # Never label another filing's holdings with this accession
+        raise RuntimeError(f"{type(extractor).__name__} looked up {', '.join(pinned.live_lookups)} for "
+                           f"{handle.ticker} live instead of {handle.form} {handle.accession}")
+
+    result = dict(result) if isinstance(result, dict) else {'result': result}
+    result.update({
+        'accession_number': handle.accession,
+        'form_type': handle.form,
+        'filing_date': handle.filing_date,
+        'output_files': output_files,
+    })
+    return result
+
+
+def read_output_rows(paths: Iterable[str]) -> List[Dict[str, str]]:
+    """Rows of the investment CSVs an extraction wrote."""
+    rows: List[Dict[str, str]] = []
+    for path in paths:
+        try:
+            with open(path, 'r', encoding='utf-8', newline='') as f:
+                rows.extend(csv.DictReader(f))
+        except FileNotFoundError:
+            continue
+    return rows
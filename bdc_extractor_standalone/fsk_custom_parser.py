@@ -10,7 +10,6 @@ import re
 from typing import Optional, List, Dict
 from bs4 import BeautifulSoup
 import requests
-import csv
 from collections import defaultdict
 from datetime import datetime
 
@@ -18,6 +17,7 @@ import sys
 sys.path.insert(0, os.path.dirname(__file__))
 from sec_api_client import SECAPIClient
 from standardization import standardize_investment_type, standardize_industry, standardize_reference_rate
+from output_writer import InvestmentCSVWriter
 
 logger = logging.getLogger(__name__)
 
@@ -104,14 +104,12 @@ class FSKCustomExtractor:
         os.makedirs(output_dir, exist_ok=True)
         output_file = os.path.join(output_dir, 'FSK_FS_KKR_Capital_Corp_investments.csv')
         
-        with open(output_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=[
+        with InvestmentCSVWriter(output_file, fieldnames=[
                 'company_name', 'industry', 'business_description', 'investment_type',
                 'acquisition_date', 'maturity_date', 'principal_amount', 'cost', 'fair_value',
                 'interest_rate', 'reference_rate', 'spread', 'floor_rate', 'pik_rate',
                 'shares_units', 'percent_net_assets', 'currency', 'commitment_limit', 'undrawn_commitment'
-            ])
-            writer.writeheader()
+            ]) as writer:
             for inv in investments:
                 writer.writerow({
                     'company_name': inv.get('company_name', ''),
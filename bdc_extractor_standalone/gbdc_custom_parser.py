@@ -7,7 +7,6 @@ Fetches and parses investment data directly from SEC filings HTML tables.
 import os
 import re
 import logging
-import csv
 import requests
 from typing import List, Dict, Optional
 from collections import defaultdict
@@ -18,6 +17,7 @@ import sys
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(__file__))
 from standardization import standardize_investment_type, standardize_industry, standardize_reference_rate
+from output_writer import InvestmentCSVWriter
 from sec_api_client import SECAPIClient
 
 logger = logging.getLogger(__name__)
@@ -699,9 +699,7 @@ class GBDCCustomExtractor:
             'commitment_limit', 'undrawn_commitment'
         ]
         
-        with open(output_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
+        with InvestmentCSVWriter(output_file, fieldnames=fieldnames) as writer:
             
             for inv in investments:
                 writer.writerow({
@@ -7,7 +7,6 @@ Parses investment data from HTML tables extracted from SEC filings.
 import os
 import re
 import logging
-import csv
 import requests
 from typing import List, Dict, Optional
 from collections import defaultdict
@@ -19,6 +18,7 @@ import os
 sys.path.insert(0, os.path.dirname(__file__))
 from sec_api_client import SECAPIClient
 from standardization import standardize_investment_type, standardize_industry, standardize_reference_rate
+from output_writer import InvestmentCSVWriter
 
 logger = logging.getLogger(__name__)
 
@@ -95,14 +95,12 @@ class GLADCustomExtractor:
         os.makedirs(output_dir, exist_ok=True)
         output_file = os.path.join(output_dir, 'GLAD_Gladstone_Capital_Corp_investments.csv')
         
-        with open(output_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=[
+        with InvestmentCSVWriter(output_file, fieldnames=[
                 'company_name', 'industry', 'business_description', 'investment_type',
                 'acquisition_date', 'maturity_date', 'principal_amount', 'cost', 'fair_value',
                 'interest_rate', 'reference_rate', 'spread', 'floor_rate', 'pik_rate',
                 'shares_units', 'percent_net_assets', 'currency', 'commitment_limit', 'undrawn_commitment'
-            ])
-            writer.writeheader()
+            ]) as writer:
             for inv in all_investments:
                 writer.writerow({
                     'company_name': inv.get('company_name', ''),
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Lightweight run instrumentation for the BDC extractors.
+
+Collects wall time per stage (spans), HTTP requests/bytes/latency per
+host and rows written, so a slow parser run can be broken down into SEC
+fetches, XBRL and HTML parsing, enrichment, HTML fallback and CSV writing.
+
+`metrics` is the collector for the ticker currently running; the run
+scripts reset it before each parser and merge it into run totals after.
+"""
+
+import os
+import json
+import math
+import time
+import functools
+import logging
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+PERCENTILES = (50, 90, 99)
+
+# Methods the parsers share (the generated XBRL parsers and the HTML table
+# parsers use the same names), timed by instrument_extractor:
+#   parse.xbrl  context/fact scans of the filing's XBRL
+#   parse.html  BeautifulSoup parsing of the schedule of investments
+#   enrich      turning facts into investments, merging HTML and XBRL data
+PARSER_STAGES = {
+    'parse.xbrl': ('_extract_typed_contexts', '_extract_facts', '_build_industry_index',
+                   '_parse_inline_xbrl_tables'),
+    'parse.html': ('extract_from_html_url', '_parse_html_filing', '_parse_html_tables',
+                   '_parse_html_table', '_find_investment_tables'),
+    'enrich': ('_build_investment', '_merge_html_data', '_extract_industries_from_xbrl',
+               '_extract_interest_rates_from_xbrl'),
+}
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = min(len(sorted_values), max(1, math.ceil(pct / 100 * len(sorted_values))))
+    return sorted_values[rank - 1]
+
+
+class RunMetrics:
+    """
+    Thread-safe collector of stage timings, HTTP stats and row counts.
+
+    Stage times are inclusive: a span nested inside another counts toward
+    both. A span nested inside one of the same stage (e.g. _parse_html_filing
+    calling _parse_html_table) is not counted again. HTTP time is recorded
+    separately under the 'http' stage.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active = threading.local()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started = time.perf_counter()
+            self.stage_seconds: Dict[str, float] = defaultdict(float)
+            self.stage_calls: Dict[str, int] = defaultdict(int)
+            self.hosts: Dict[str, Dict[str, Any]] = {}
+            self.rows = 0
+
+    @contextmanager
+    def span(self, stage: str):
+        """Time a block of work under a stage name."""
+        active = self._active.__dict__.setdefault('stages', set())
+        if stage in active:
+            yield
+            return
+        active.add(stage)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            active.discard(stage)
+            self.add_time(stage, time.perf_counter() - start)
+
+    def add_time(self, stage: str, seconds: float):
+        with self._lock:
+            self.stage_seconds[stage] += seconds
+            self.stage_calls[stage] += 1
+
+    def record_request(self, url: str, nbytes: int, seconds: float, status: Optional[int] = None):
+        """Record one HTTP request against its host."""
+        host = urlsplit(url).netloc or 'unknown'
+        with self._lock:
+            stats = self.hosts.setdefault(host, {'requests': 0, 'bytes': 0, 'errors': 0, 'latencies': []})
+            stats['requests'] += 1
+            stats['bytes'] += nbytes
+            stats['latencies'].append(seconds)
+            if status is None or status >= 400:
+                stats['errors'] += 1
+            self.stage_seconds['http'] += seconds
+            self.stage_calls['http'] += 1
+
+    def add_rows(self, count: int):
+        with self._lock:
+            self.rows += count
+
+    def merge(self, other: 'RunMetrics'):
+        """Add another collector's totals into this one."""
+        with other._lock:
+            stage_seconds = dict(other.stage_seconds)
+            stage_calls = dict(other.stage_calls)
+            hosts = {h: dict(s, latencies=list(s['latencies'])) for h, s in other.hosts.items()}
+            rows = other.rows
+        with self._lock:
+            for stage, seconds in stage_seconds.items():
+                self.stage_seconds[stage] += seconds
+                self.stage_calls[stage] += stage_calls.get(stage, 0)
+            for host, stats in hosts.items():
+                mine = self.hosts.setdefault(host, {'requests': 0, 'bytes': 0, 'errors': 0, 'latencies': []})
+                for key in ('requests', 'bytes', 'errors'):
+                    mine[key] += stats[key]
+                mine['latencies'].extend(stats['latencies'])
+            self.rows += rows
+
+    def snapshot(self, elapsed: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Summarize everything collected so far.
+
+        Args:
+            elapsed: Wall time to report (default: time since the last reset)
+
+        Returns:
+            JSON-serializable dict with seconds, stages, hosts, rows and rows_per_second
+        """
+        with self._lock:
+            if elapsed is None:
+                elapsed = time.perf_counter() - self.started
+            hosts = {}
+            for host, stats in sorted(self.hosts.items()):
+                latencies = sorted(stats['latencies'])
+                hosts[host] = {
+                    'requests': stats['requests'],
+                    'bytes': stats['bytes'],
+                    'errors': stats['errors'],
+                    **{f'p{p}_ms': round(_percentile(latencies, p) * 1000, 1) for p in PERCENTILES},
+                    'max_ms': round(latencies[-1] * 1000, 1) if latencies else 0.0,
+                }
+            return {
+                'seconds': round(elapsed, 3),
+                'stages': {stage: {'seconds': round(seconds, 3), 'calls': self.stage_calls[stage]}
+                           for stage, seconds in sorted(self.stage_seconds.items(), key=lambda kv: -kv[1])},
+                'requests': sum(h['requests'] for h in hosts.values()),
+                'bytes': sum(h['bytes'] for h in hosts.values()),
+                'hosts': hosts,
+                'rows': self.rows,
+                'rows_per_second': round(self.rows / elapsed, 1) if elapsed > 0 else 0.0,
+            }
+
+
+# Collector for the parser currently running
+metrics = RunMetrics()
+
+
+def timed(stage: str):
+    """Decorator recording each call of the function under a stage in `metrics`."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with metrics.span(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def instrument_extractor(extractor) -> List[str]:
+    """
+    Time an extractor's shared parse and enrich methods (see PARSER_STAGES).
+
+    Wrappers are set on the instance, so the class and other instances are
+    untouched.
+
+    Returns:
+        Names of the methods wrapped
+    """
+    wrapped = []
+    for stage, names in PARSER_STAGES.items():
+        for name in names:
+            method = getattr(extractor, name, None)
+            if callable(method):
+                setattr(extractor, name, timed(stage)(method))
+                wrapped.append(name)
+    return wrapped
+
+
+_requests_instrumented = False
+
+
+def instrument_requests():
+    """
+    Record every HTTP request made through `requests` in `metrics`.
+
+    Parsers call requests.get directly as well as through SECAPIClient, so
+    the hook sits on requests.Session.request. Safe to call more than once.
+    """
+    global _requests_instrumented
+    if _requests_instrumented:
+        return
+    import requests
+
+    original_request = requests.Session.request
+
+    def request(session, method, url, *args, **kwargs):
+        start = time.perf_counter()
+        response = None
+        try:
+            response = original_request(session, method, url, *args, **kwargs)
+            return response
+        finally:
+            nbytes = 0
+            status = None
+            if response is not None:
+                status = response.status_code
+                # Content-Length avoids forcing a read of streamed bodies
+                length = response.headers.get('Content-Length')
+                if length and length.isdigit():
+                    nbytes = int(length)
+                elif not kwargs.get('stream'):
+                    nbytes = len(response.content)
+            metrics.record_request(url, nbytes, time.perf_counter() - start, status)
+
+    requests.Session.request = request
+    _requests_instrumented = True
+
+
+def write_metrics_report(path: str, results: List[Dict], totals: RunMetrics,
+                         elapsed: Optional[float] = None) -> str:
+    """
+    Write a run report with per-ticker metrics and run totals as JSON.
+
+    Args:
+        path: Report file path
+        results: Per-ticker result dicts (each may carry a 'metrics' snapshot)
+        totals: Collector holding the merged totals for the run
+        elapsed: Run wall time (default: time since totals was reset)
+
+    Returns:
+        The path written
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'generated_at': datetime.now().isoformat(),
+            'totals': totals.snapshot(elapsed),
+            'tickers': {r['ticker']: {'status': r['status'], 'investments_count': r.get('investments_count', 0),
+                                      **r.get('metrics', {})}
+                        for r in results},
+        }, f, indent=2)
+    os.replace(tmp_path, path)
+    logger.info(f"Saved run metrics to {path}")
+    return path
+
+
+def format_hotspots(results: List[Dict], totals: RunMetrics, top_n: int = 5) -> List[str]:
+    """Human-readable lines: slowest tickers, heaviest stages and per-host latency."""
+    snapshot = totals.snapshot()
+    lines = []
+    measured = [r for r in results if r.get('metrics')]
+    if measured:
+        lines.append("Slowest parsers:")
+        for r in sorted(measured, key=lambda r: -r['metrics']['seconds'])[:top_n]:
+            m = r['metrics']
+            stages = ', '.join(f"{s} {v['seconds']:.1f}s" for s, v in list(m['stages'].items())[:3])
+            lines.append(f"  {r['ticker']}: {m['seconds']:.1f}s ({stages}), "
+                         f"{m['requests']} requests, {m['rows_per_second']:.0f} rows/s")
+    if snapshot['stages']:
+        lines.append("Time by stage:")
+        for stage, v in list(snapshot['stages'].items())[:top_n + 3]:
+            lines.append(f"  {stage}: {v['seconds']:.1f}s over {v['calls']} calls")
+    if snapshot['hosts']:
+        lines.append("HTTP by host:")
+    for host, h in snapshot['hosts'].items():
+        lines.append(f"  {host}: {h['requests']} requests, {h['bytes'] / 1e6:.1f} MB, "
+                     f"p50 {h['p50_ms']:.0f}ms, p90 {h['p90_ms']:.0f}ms, p99 {h['p99_ms']:.0f}ms")
+    return lines
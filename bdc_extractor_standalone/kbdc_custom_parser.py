@@ -23,11 +23,11 @@ import re
 from typing import Optional, List, Dict
 from bs4 import BeautifulSoup
 import requests
-import csv
 from collections import defaultdict
 
 from sec_api_client import SECAPIClient
 from standardization import standardize_investment_type, standardize_industry, standardize_reference_rate
+from output_writer import InvestmentCSVWriter
 
 logger = logging.getLogger(__name__)
 
@@ -669,9 +669,7 @@ class KBDCCustomExtractor:
             'pik_rate', 'shares_units', 'percent_net_assets', 'currency', 'commitment_limit', 'undrawn_commitment'
         ]
         
-        with open(output_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
+        with InvestmentCSVWriter(output_file, fieldnames=fieldnames) as writer:
             
             for inv in investments:
                 # Apply standardization
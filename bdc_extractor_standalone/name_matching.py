@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Company name matching for BDC investment data.
+
+Provides a shared normalizer and an n-gram blocked index for fuzzy company
+name lookups, used when merging HTML fallback rows into XBRL investments.
+"""
+
+import re
+from collections import defaultdict
+from difflib import SequenceMatcher
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+def normalize_company_name(name: str) -> str:
+    """Normalize company name for better matching."""
+    if not name:
+        return ""
+    name = name.lower().strip()
+    name = re.sub(r'\s*(inc\.?|incorporated|corp\.?|corporation|ltd\.?|limited|llc\.?|lp\.?|l\.p\.?|l\.l\.c\.?)\s*$', '', name)
+    name = re.sub(r'\s*\([^)]*\)\s*', ' ', name)
+    name = re.sub(r'\s+', ' ', name).strip()
+    name = re.sub(r'^(the\s+)', '', name)
+    return name
+
+
+def _token_set_score(a: str, b: str) -> float:
+    """Jaccard similarity of the two names' token sets (word order ignored)."""
+    tokens_a = set(re.findall(r'[a-z0-9&]+', a))
+    tokens_b = set(re.findall(r'[a-z0-9&]+', b))
+    if not tokens_a or not tokens_b:
+        return 0.0
+    return len(tokens_a & tokens_b) / len(tokens_a | tokens_b)
+
+
+def _name_ngrams(normalized: str, n: int) -> set:
+    """Character n-grams of each token, padded so short tokens still block."""
+    grams = set()
+    for token in re.findall(r'[a-z0-9&]+', normalized):
+        padded = f" {token} "
+        if len(padded) <= n:
+            grams.add(padded)
+            continue
+        for i in range(len(padded) - n + 1):
+            grams.add(padded[i:i + n])
+    return grams
+
+
+class CompanyNameIndex:
+    """
+    Fuzzy lookup index over company names.
+
+    Names are normalized, split into tokens and blocked on character n-grams.
+    A query only scores entries sharing enough n-grams with it, so lookups
+    touch a handful of candidates instead of every indexed name.
+    """
+
+    def __init__(self,
+                 normalizer: Callable[[str], str] = normalize_company_name,
+                 ngram_size: int = 3,
+                 max_candidates: int = 10,
+                 max_posting_ratio: float = 0.2,
+                 allow_containment: bool = True):
+        """
+        Initialize the index.
+
+        Args:
+            normalizer: Function mapping a raw company name to its match key
+            ngram_size: Character n-gram length used for blocking
+            max_candidates: Number of best blocked candidates to score per query
+            max_posting_ratio: N-grams shared by more than this fraction of
+                entries (e.g. " in", "ing") are ignored when blocking
+            allow_containment: Score names contained in one another as 1.0.
+                Convenient for matching rows within one filing, but too loose
+                for identity ("Pet" vs "Pet Holdings"); when False, candidates
+                must clear the threshold on character ratio or token-set
+                similarity
+        """
+        self.normalizer = normalizer
+        self.ngram_size = ngram_size
+        self.max_candidates = max_candidates
+        self.max_posting_ratio = max_posting_ratio
+        self.allow_containment = allow_containment
+        self._keys: List[str] = []
+        self._grams: List[set] = []
+        self._values: List[Any] = []
+        self._by_key: Dict[str, int] = {}
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, name: str, value: Any, normalized: bool = False) -> bool:
+        """
+        Index a company name. The first value added for a normalized key wins.
+
+        Args:
+            name: Company name
+            value: Value returned for matches
+            normalized: name is already a normalized key
+
+        Returns:
+            True if the name was added, False if empty or already present
+        """
+        if normalized:
+            key = name or ""
+        else:
+            key = self.normalizer(name) if name else ""
+        if not key or key in self._by_key:
+            return False
+        idx = len(self._keys)
+        grams = _name_ngrams(key, self.ngram_size)
+        self._keys.append(key)
+        self._grams.append(grams)
+        self._values.append(value)
+        self._by_key[key] = idx
+        for gram in grams:
+            self._postings[gram].append(idx)
+        return True
+
+    def get_exact(self, name: str) -> Optional[Any]:
+        """Return the value indexed under the same normalized name, if any."""
+        key = self.normalizer(name) if name else ""
+        idx = self._by_key.get(key) if key else None
+        return self._values[idx] if idx is not None else None
+
+    def _candidates(self, key: str, grams: set) -> List[int]:
+        """Entries sharing the most n-grams with the query, best first."""
+        if not grams:
+            return []
+        posting_cap = max(32, int(len(self._keys) * self.max_posting_ratio))
+        postings = [self._postings[g] for g in grams if g in self._postings]
+        selective = [p for p in postings if len(p) <= posting_cap]
+        # Fall back to common n-grams only when the name has nothing rarer
+        counts: Dict[int, int] = defaultdict(int)
+        for posting in (selective or postings):
+            for idx in posting:
+                counts[idx] += 1
+        ranked = sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))
+        return [idx for idx, _ in ranked[:self.max_candidates]]
+
+    def best_match(self, name: str, threshold: float = 0.8,
+                   normalized: bool = False) -> Optional[Tuple[Any, float]]:
+        """
+        Find the best indexed match for a company name.
+
+        Exact normalized matches score 1.0, as do names contained in one
+        another when allow_containment is set; other candidates are scored
+        with SequenceMatcher ratio (or token-set similarity, if higher, when
+        containment is off).
+
+        Args:
+            name: Company name to look up
+            threshold: Minimum similarity for a candidate to be accepted
+            normalized: name is already a normalized key
+
+        Returns:
+            (value, score) for the best candidate, or None if nothing clears threshold
+        """
+        if normalized:
+            key = name or ""
+        else:
+            key = self.normalizer(name) if name else ""
+        if not key:
+            return None
+        idx = self._by_key.get(key)
+        if idx is not None:
+            return self._values[idx], 1.0
+
+        best_idx, best_score = None, 0.0
+        for idx in self._candidates(key, _name_ngrams(key, self.ngram_size)):
+            other = self._keys[idx]
+            if self.allow_containment and (key in other or other in key):
+                score = 1.0
+            elif self.allow_containment:
+                matcher = SequenceMatcher(None, key, other)
+                if matcher.real_quick_ratio() < threshold or matcher.quick_ratio() < threshold:
+                    continue
+                score = matcher.ratio()
+            else:
+                score = _token_set_score(key, other)
+                if score < threshold:
+                    matcher = SequenceMatcher(None, key, other)
+                    if matcher.real_quick_ratio() < threshold or matcher.quick_ratio() < threshold:
+                        continue
+                    score = max(score, matcher.ratio())
+            if score > best_score:
+                best_idx, best_score = idx, score
+                if score == 1.0:
+                    break
+        if best_idx is None or best_score < threshold:
+            return None
+        return self._values[best_idx], best_score
+
+    def lookup(self, name: str, threshold: float = 0.8, normalized: bool = False) -> Optional[Any]:
+        """Return only the value of best_match(), or None."""
+        match = self.best_match(name, threshold=threshold, normalized=normalized)
+        return match[0] if match else None
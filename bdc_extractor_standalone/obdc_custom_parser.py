@@ -12,13 +12,14 @@ import sys
 from typing import Optional, List, Dict
 from bs4 import BeautifulSoup
 import requests
-import csv
 from collections import defaultdict
 
 # Add current directory to path for imports
 sys.path.insert(0, os.path.dirname(__file__))
 from sec_api_client import SECAPIClient
 from standardization import standardize_investment_type, standardize_industry, standardize_reference_rate
+from output_writer import InvestmentCSVWriter
+from xbrl_artifact import XBRLArtifact
 
 logger = logging.getLogger(__name__)
 
@@ -119,8 +120,11 @@ class OBDCCustomExtractor:
         # Enhance with XBRL data (industry and interest rates) if available
         if xbrl_url:
             try:
+                # Fetch and index the XBRL once for both enrichment passes
+                xbrl = XBRLArtifact.fetch(xbrl_url, self.headers)
+
                 # Extract industry data
-                industry_map = self._extract_industries_from_xbrl(xbrl_url, all_investments)
+                industry_map = self._extract_industries_from_xbrl(xbrl, all_investments)
                 if industry_map:
                     logger.info(f"Found industry data for {len(industry_map)} investments from XBRL")
                     # Merge industry data
@@ -140,7 +144,7 @@ class OBDCCustomExtractor:
                     logger.info(f"Matched industry data for {matched_count} investments")
                 
                 # Extract interest rate data
-                rate_data_map = self._extract_interest_rates_from_xbrl(xbrl_url, all_investments)
+                rate_data_map = self._extract_interest_rates_from_xbrl(xbrl, all_investments)
                 if rate_data_map:
                     logger.info(f"Found interest rate data for {len(rate_data_map)} investments from XBRL")
                     # Merge interest rate data
@@ -909,18 +913,11 @@ class OBDCCustomExtractor:
         
         return interest_rate, reference_rate, spread, floor_rate, pik_rate
     
-    def _extract_industries_from_xbrl(self, xbrl_url: str, investments: List[Dict]) -> Dict[str, str]:
+    def _extract_industries_from_xbrl(self, xbrl: XBRLArtifact, investments: List[Dict]) -> Dict[str, str]:
         """Extract industry data from XBRL using EquitySecuritiesByIndustryAxis."""
         industry_map = {}
         
         try:
-            response = requests.get(xbrl_url, headers=self.headers)
-            response.raise_for_status()
-            content = response.text
-            
-            # Extract contexts with InvestmentIdentifierAxis and EquitySecuritiesByIndustryAxis
-            cp = re.compile(r'<context id="([^"]+)">(.*?)</context>', re.DOTALL)
-            
             # Build a map of all company names from HTML investments for better matching
             html_companies = {}
             for inv in investments:
@@ -930,27 +927,14 @@ class OBDCCustomExtractor:
                     html_companies[normalized] = company
             
             # Find investment identifiers and their industries
-            for m in cp.finditer(content):
-                cid = m.group(1)
-                chtml = m.group(2)
-                
-                # Check for InvestmentIdentifierAxis
-                inv_axis = re.search(
-                    r'<xbrldi:typedMember[^>]*dimension="us-gaap:InvestmentIdentifierAxis"[^>]*>'
-                    r'\s*<us-gaap:InvestmentIdentifierAxis\.domain>([^<]+)</us-gaap:InvestmentIdentifierAxis\.domain>'
-                    r'\s*</xbrldi:typedMember>', chtml, re.DOTALL)
-                
-                if not inv_axis:
-                    continue
-                
-                identifier = inv_axis.group(1).strip()
+            for ctx in xbrl.investment_contexts():
+                identifier = ctx.identifier
+                identifier_clean = identifier.strip()
                 
                 # Check for EquitySecuritiesByIndustryAxis or InvestmentIndustryAxis
-                ind_axis = re.search(
-                    r'<xbrldi:explicitMember[^>]*dimension="(?:us-gaap:)?(?:EquitySecuritiesByIndustryAxis|InvestmentIndustryAxis)"[^>]*>([^<]+)</xbrldi:explicitMember>',
-                    chtml, re.DOTALL | re.IGNORECASE)
+                industry_member = ctx.member('EquitySecuritiesByIndustryAxis', 'InvestmentIndustryAxis')
                 
-                if not ind_axis:
+                if not industry_member:
                     # Also try to find industry in the identifier itself
                     # Some companies embed industry in the identifier string
                     industry_in_ident = re.search(r'Industry[:\s]+([A-Za-z,&\s/]+?)(?:\s+Investment|\s+Type|$)', identifier_clean, re.IGNORECASE)
@@ -962,14 +946,11 @@ class OBDCCustomExtractor:
                             industry_map[normalized] = industry
                     continue
                 
-                industry = self._industry_member_to_name(ind_axis.group(1).strip())
+                industry = self._industry_member_to_name(industry_member)
                 if not industry or industry == 'Unknown':
                     continue
                 
                 # Try to match identifier to HTML company names
-                # Extract potential company name from identifier
-                identifier_clean = identifier.strip()
-                
                 # Try different extraction methods
                 potential_names = []
                 
@@ -1028,65 +1009,26 @@ class OBDCCustomExtractor:
         member = re.sub(r'([a-z])([A-Z])', r'\1 \2', member)
         return member.strip()
     
-    def _extract_interest_rates_from_xbrl(self, xbrl_url: str, investments: List[Dict]) -> Dict[str, Dict]:
+    def _extract_interest_rates_from_xbrl(self, xbrl: XBRLArtifact, investments: List[Dict]) -> Dict[str, Dict]:
         """Extract interest rate data from XBRL facts."""
         rate_data_map = {}
         
         try:
-            response = requests.get(xbrl_url, headers=self.headers)
-            response.raise_for_status()
-            content = response.text
-            
-            # Extract investment contexts
-            contexts = {}
-            cp = re.compile(r'<context id="([^"]+)">(.*?)</context>', re.DOTALL)
-            tp = re.compile(
-                r'<xbrldi:typedMember[^>]*dimension="us-gaap:InvestmentIdentifierAxis"[^>]*>'
-                r'\s*<us-gaap:InvestmentIdentifierAxis\.domain>([^<]+)</us-gaap:InvestmentIdentifierAxis\.domain>'
-                r'\s*</xbrldi:typedMember>', re.DOTALL)
-            
-            for m in cp.finditer(content):
-                cid = m.group(1)
-                chtml = m.group(2)
-                tm = tp.search(chtml)
-                if tm:
-                    identifier = tm.group(1).strip()
-                    # Extract company name from identifier
-                    company_name = identifier.split(',')[0].split('-')[0].strip()
-                    company_name = re.sub(r'\s*\([^)]*\)\s*$', '', company_name)
-                    normalized = self._normalize_company_name(company_name)
-                    contexts[cid] = normalized
-            
-            # Extract facts
-            facts = defaultdict(list)
-            # Standard XBRL facts
-            sp = re.compile(r'<([^>\s:]+:[^>\s]+)[^>]*contextRef="([^"]*)"[^>]*(?:unitRef="([^"]*)")?[^>]*>([^<]*)</\1>', re.DOTALL)
-            for match in sp.finditer(content):
-                concept = match.group(1)
-                cref = match.group(2)
-                val = match.group(4)
-                if val and cref:
-                    facts[cref].append({'concept': concept, 'value': val.strip()})
-            
-            # Inline XBRL facts
-            ixp = re.compile(r'<ix:nonFraction[^>]*?name="([^"]+)"[^>]*?contextRef="([^"]+)"[^>]*?(?:unitRef="([^"]*)")?[^>]*?>(.*?)</ix:nonFraction>', re.DOTALL|re.IGNORECASE)
-            for m in ixp.finditer(content):
-                name = m.group(1)
-                cref = m.group(2)
-                html = m.group(4)
-                txt = re.sub(r'<[^>]+>', '', html).strip()
-                if txt and cref:
-                    facts[cref].append({'concept': name, 'value': txt})
-            
-            # Process facts for each context
-            for ctx_id, company_key in contexts.items():
-                if ctx_id not in facts:
+            # Process facts for each investment context
+            for ctx in xbrl.investment_contexts():
+                ctx_facts = xbrl.facts_for(ctx.context_id)
+                if not ctx_facts:
                     continue
                 
+                # Extract company name from identifier
+                company_name = ctx.identifier.split(',')[0].split('-')[0].strip()
+                company_name = re.sub(r'\s*\([^)]*\)\s*$', '', company_name)
+                company_key = self._normalize_company_name(company_name)
+                
                 rate_data = {}
                 interest_rate_candidates = []
                 
-                for fact in facts[ctx_id]:
+                for fact in ctx_facts:
                     concept = fact['concept'].lower()
                     value = fact['value'].replace(',', '').strip()
                     
@@ -1196,7 +1138,7 @@ class OBDCCustomExtractor:
                     rate_data['interest_rate'] = f"{best_candidate:.2f}%"
                 
                 # Extract spread, floor, PIK, reference rate
-                for fact in facts[ctx_id]:
+                for fact in ctx_facts:
                     concept = fact['concept'].lower()
                     value = fact['value'].replace(',', '').strip()
                     
@@ -1250,27 +1192,17 @@ class OBDCCustomExtractor:
                             rate_data['reference_rate'] = 'EURIBOR'
                 
                 # Also check identifier for reference rate and spread
-                if ctx_id in contexts:
-                    # Find the identifier for this context
-                    for m in cp.finditer(content):
-                        if m.group(1) == ctx_id:
-                            identifier = ""
-                            tm = tp.search(m.group(2))
-                            if tm:
-                                identifier = tm.group(1).strip()
-                            
-                            # Extract reference rate and spread from identifier
-                            if identifier and not rate_data.get('reference_rate'):
-                                ref_match = re.search(r'(SOFR|LIBOR|PRIME|Base Rate|EURIBOR)', identifier, re.IGNORECASE)
-                                if ref_match:
-                                    rate_data['reference_rate'] = ref_match.group(1).upper()
-                            
-                            if identifier and not rate_data.get('spread'):
-                                spread_match = re.search(r'[+\-]\s*(\d+\.?\d*)\s*%', identifier)
-                                if spread_match:
-                                    spread_val = float(spread_match.group(1))
-                                    rate_data['spread'] = f"{spread_val:.2f}%"
-                            break
+                identifier = ctx.identifier
+                if identifier and not rate_data.get('reference_rate'):
+                    ref_match = re.search(r'(SOFR|LIBOR|PRIME|Base Rate|EURIBOR)', identifier, re.IGNORECASE)
+                    if ref_match:
+                        rate_data['reference_rate'] = ref_match.group(1).upper()
+                
+                if identifier and not rate_data.get('spread'):
+                    spread_match = re.search(r'[+\-]\s*(\d+\.?\d*)\s*%', identifier)
+                    if spread_match:
+                        spread_val = float(spread_match.group(1))
+                        rate_data['spread'] = f"{spread_val:.2f}%"
                 
                 if rate_data:
                     rate_data_map[company_key] = rate_data
@@ -1333,9 +1265,7 @@ class OBDCCustomExtractor:
             'pik_rate'
         ]
         
-        with open(output_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
+        with InvestmentCSVWriter(output_file, fieldnames=fieldnames) as writer:
             
             for inv in investments:
                 # Apply standardization
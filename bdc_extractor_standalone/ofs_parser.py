@@ -1,10 +1,11 @@
 #!/usr/bin/env python3
-import re, os, csv, logging, requests
+import re, os, logging, requests
 from dataclasses import dataclass
 from typing import List, Dict, Optional
 from collections import defaultdict
 from sec_api_client import SECAPIClient
 from standardization import standardize_investment_type, standardize_industry, standardize_reference_rate
+from output_writer import InvestmentCSVWriter
 
 logger = logging.getLogger(__name__)
 
@@ -97,9 +98,7 @@ class OFSExtractor:
 
         out_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'output'); os.makedirs(out_dir, exist_ok=True)
         out_file = os.path.join(out_dir, 'OFS_OFS_Capital_Corp_investments.csv')
-        with open(out_file, 'w', newline='', encoding='utf-8') as f:
-            w = csv.DictWriter(f, fieldnames=['company_name','industry','business_description','investment_type','acquisition_date','maturity_date','principal_amount','cost','fair_value','interest_rate','reference_rate','spread','floor_rate','pik_rate','shares_units','percent_net_assets','currency','commitment_limit','undrawn_commitment'])
-            w.writeheader()
+        with InvestmentCSVWriter(out_file, fieldnames=['company_name','industry','business_description','investment_type','acquisition_date','maturity_date','principal_amount','cost','fair_value','interest_rate','reference_rate','spread','floor_rate','pik_rate','shares_units','percent_net_assets','currency','commitment_limit','undrawn_commitment']) as w:
             for x in invs:
                 # Apply standardization
                 standardized_inv_type = standardize_investment_type(x.investment_type)
@@ -497,9 +496,7 @@ def main():
 		"fair_value",
 		"percent_of_net_assets",
 	]
-	with open(out_csv, "w", newline="", encoding="utf-8") as f:
-		writer = csv.DictWriter(f, fieldnames=fieldnames)
-		writer.writeheader()
+	with InvestmentCSVWriter(out_csv, fieldnames=fieldnames) as writer:
 		for rec in records:
 			# Apply standardization
 			if 'investment_type' in rec:
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Buffered, atomic output sink for BDC parser results.
+
+Rows are buffered and written in batches to a temporary file next to the
+target; the target is only replaced (os.replace) once every row has been
+written. A parser that crashes mid-write leaves the previous CSV, and its
+modification time, untouched, so daily_update.py never mistakes a partial
+file for a fresh one.
+"""
+
+import os
+import csv
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional
+
+from instrumentation import metrics
+
+logger = logging.getLogger(__name__)
+
+# Standard investment CSV schema shared by all parsers
+INVESTMENT_FIELDNAMES = [
+    'company_name', 'industry', 'business_description', 'investment_type',
+    'acquisition_date', 'maturity_date', 'principal_amount', 'cost', 'fair_value',
+    'interest_rate', 'reference_rate', 'spread', 'floor_rate', 'pik_rate',
+    'shares_units', 'percent_net_assets', 'currency', 'commitment_limit', 'undrawn_commitment'
+]
+
+# Set BDC_OUTPUT_COLUMNAR=1 to also write a .parquet next to every CSV
+COLUMNAR_ENV_VAR = 'BDC_OUTPUT_COLUMNAR'
+
+# mkstemp creates 0600 files; published outputs are made world-readable.
+# A fixed mode, since reading the umask means briefly changing it for the
+# whole process (unsafe with writers running on other threads).
+_FILE_MODE = 0o644
+
+# Per-thread output redirection set by redirect_output()
+_redirect = threading.local()
+
+
+@contextmanager
+def redirect_output(directory: str):
+    """
+    Send every InvestmentCSVWriter opened in this thread to `directory`.
+
+    Lets a run extract a specific (e.g. historical) filing without replacing
+    the latest-filing CSVs in output/. Yields the list of paths written,
+    filled in as writers are created.
+    """
+    previous = getattr(_redirect, 'state', None)
+    state = {'directory': directory, 'paths': []}
+    _redirect.state = state
+    try:
+        yield state['paths']
+    finally:
+        _redirect.state = previous
+
+
+class InvestmentCSVWriter:
+    """
+    DictWriter-compatible CSV sink with batching and atomic publish.
+
+    Use as a context manager; the header is written on open, rows are
+    committed on a clean exit and discarded if the block raises:
+
+        with InvestmentCSVWriter(out_file) as writer:
+            for inv in investments:
+                writer.writerow({...})
+    """
+
+    def __init__(self,
+                 path: str,
+                 fieldnames: Optional[List[str]] = None,
+                 batch_size: int = 1000,
+                 columnar: Optional[bool] = None,
+                 **dictwriter_kwargs):
+        """
+        Initialize the writer.
+
+        Args:
+            path: Final output path
+            fieldnames: CSV columns (default: INVESTMENT_FIELDNAMES)
+            batch_size: Number of rows buffered before each write
+            columnar: Also write a .parquet copy (default: from BDC_OUTPUT_COLUMNAR)
+            **dictwriter_kwargs: Passed through to csv.DictWriter
+        """
+        state = getattr(_redirect, 'state', None)
+        if state is not None:
+            path = os.path.join(state['directory'], os.path.basename(path))
+            state['paths'].append(path)
+        self.path = path
+        self.fieldnames = list(fieldnames) if fieldnames is not None else list(INVESTMENT_FIELDNAMES)
+        self.batch_size = max(1, batch_size)
+        if columnar is None:
+            columnar = os.environ.get(COLUMNAR_ENV_VAR, '').lower() in ('1', 'true', 'yes')
+        self.columnar = columnar
+        self.dictwriter_kwargs = dictwriter_kwargs
+        self.stats: Dict[str, Any] = {'path': path, 'rows': 0, 'bytes': 0}
+        self._buffer: List[Dict] = []
+        self._columnar_rows: List[Dict] = []
+        self._file = None
+        self._tmp_path = None
+        self._writer = None
+
+    def __enter__(self) -> 'InvestmentCSVWriter':
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+        return False
+
+    def open(self):
+        out_dir = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(out_dir, exist_ok=True)
+        fd, self._tmp_path = tempfile.mkstemp(
+            prefix=f".{os.path.basename(self.path)}.", suffix='.tmp', dir=out_dir)
+        os.fchmod(fd, _FILE_MODE)
+        self._file = os.fdopen(fd, 'w', newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(self._file, fieldnames=self.fieldnames, **self.dictwriter_kwargs)
+        self._writer.writeheader()
+
+    def writeheader(self):
+        """No-op: the header is written when the sink is opened."""
+
+    def writerow(self, row: Dict):
+        self._buffer.append(row)
+        if len(self._buffer) >= self.batch_size:
+            self._flush()
+
+    def writerows(self, rows: Iterable[Dict]):
+        for row in rows:
+            self.writerow(row)
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        with metrics.span('write'):
+            self._writer.writerows(self._buffer)
+        self.stats['rows'] += len(self._buffer)
+        if self.columnar:
+            self._columnar_rows.extend(self._buffer)
+        self._buffer = []
+
+    def commit(self) -> Dict[str, Any]:
+        """Write remaining rows, publish the file atomically and return write stats."""
+        if self._file is None:
+            return self.stats
+        try:
+            self._flush()
+            with metrics.span('write'):
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._file.close()
+                self._file = None
+                self.stats['bytes'] = os.path.getsize(self._tmp_path)
+                os.replace(self._tmp_path, self.path)
+            self._tmp_path = None
+        except Exception:
+            self.abort()
+            raise
+        metrics.add_rows(self.stats['rows'])
+
+        if self.columnar:
+            self._write_columnar()
+        logger.info(f"Wrote {self.stats['rows']} rows ({self.stats['bytes']:,} bytes) to {self.path}")
+        return self.stats
+
+    def abort(self):
+        """Discard everything written so far; the existing target file is left untouched."""
+        self._buffer = []
+        self._columnar_rows = []
+        if self._file is not None:
+            try:
+                self._file.close()
+            except Exception:
+                pass
+            self._file = None
+        if self._tmp_path and os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+            logger.warning(f"Discarded partial output for {self.path}")
+        self._tmp_path = None
+
+    def _write_columnar(self):
+        """Write the same rows as .parquet (requires pandas with a parquet engine)."""
+        parquet_path = os.path.splitext(self.path)[0] + '.parquet'
+        tmp_path = parquet_path + '.tmp'
+        try:
+            import pandas as pd
+            df = pd.DataFrame(self._columnar_rows, columns=self.fieldnames)
+            df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, parquet_path)
+            self.stats['columnar_path'] = parquet_path
+            self.stats['columnar_bytes'] = os.path.getsize(parquet_path)
+        except Exception as e:
+            logger.warning(f"Could not write columnar output {parquet_path}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        finally:
+            self._columnar_rows = []
+
+
+def write_investments_csv(path: str, rows: Iterable[Dict],
+                          fieldnames: Optional[List[str]] = None, **kwargs) -> Dict[str, Any]:
+    """Write rows to path through an InvestmentCSVWriter and return its stats."""
+    with InvestmentCSVWriter(path, fieldnames=fieldnames, **kwargs) as writer:
+        writer.writerows(rows)
+    return writer.stats
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Declarative registry of BDC parsers.
+
+Maps each ticker to the module and extractor class that handles it, plus
+what the extractor supports. Run scripts look parsers up here instead of
+importing every *_parser.py and probing class names, so a single-ticker
+run imports one parser module, on first use.
+
+Parser files not listed here are still discovered by filename so a new
+parser works before it is registered; `python parser_registry.py` lists
+any such drift.
+"""
+
+import os
+import ast
+import glob
+import logging
+import importlib
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PARSER_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Capabilities
+CAP_TICKER = 'ticker'                # extract_from_ticker(ticker)
+CAP_URL = 'url'                      # extract_from_url(filing_url, company_name, cik)
+CAP_HTML_FALLBACK = 'html_fallback'  # fills missing fields from the HTML schedule
+
+# Utility modules matching *_parser.py that are not BDC parsers
+NON_PARSER_MODULES = {'flexible_table_parser', 'verbose_identifier_parser', 'xbrl_typed_extractor'}
+
+
+@dataclass(frozen=True)
+class ParserSpec:
+    """Where a ticker's extractor lives and what it supports."""
+    ticker: str
+    module: str
+    class_name: str
+    capabilities: Tuple[str, ...] = (CAP_TICKER,)
+    alternate: Optional[str] = None  # other parser module for the same ticker, not run by default
+
+    @property
+    def parser_file(self) -> str:
+        return os.path.join(PARSER_DIR, f"{self.module}.py")
+
+    def supports(self, capability: str) -> bool:
+        return capability in self.capabilities
+
+
+# Where a ticker has both an XBRL parser and a custom HTML parser, the
+# regular parser is registered and the custom one is kept as `alternate`.
+PARSERS: Dict[str, ParserSpec] = {spec.ticker: spec for spec in [
+    ParserSpec('ARCC', 'arcc_custom_parser', 'ARCCCustomExtractor', (CAP_TICKER,)),
+    ParserSpec('BCSF', 'bcsf_custom_parser', 'BCSFCustomExtractor', (CAP_TICKER,)),
+    ParserSpec('BXSL', 'bxsl_parser', 'BXSLExtractor', (CAP_TICKER, CAP_URL)),
+    ParserSpec('CCAP', 'ccap_parser', 'CCAPExtractor', (CAP_TICKER, CAP_URL, CAP_HTML_FALLBACK)),
+    ParserSpec('CGBD', 'cgbd_custom_parser', 'CGBDCustomExtractor', (CAP_TICKER, CAP_URL)),
+    ParserSpec('CSWC', 'cswc_custom_parser', 'CSWCCustomExtractor', (CAP_TICKER,)),
+    ParserSpec('FDUS', 'fdus_custom_parser', 'FDUSExtractor', (CAP_TICKER, CAP_URL)),
+    ParserSpec('FSK', 'fsk_custom_parser', 'FSKCustomExtractor', (CAP_TICKER,)),
+    ParserSpec('GBDC', 'gbdc_custom_parser', 'GBDCCustomExtractor', (CAP_TICKER,)),
+    ParserSpec('GECC', 'gecc_parser', 'GECCExtractor', (CAP_TICKER, CAP_URL)),
+    ParserSpec('GLAD', 'glad_parser', 'GLADExtractor', (CAP_TICKER, CAP_URL, CAP_HTML_FALLBACK), alternate='glad_custom_parser'),
+    ParserSpec('GSBD', 'gsbd_parser', 'GSBDExtractor', (CAP_TICKER, CAP_URL, CAP_HTML_FALLBACK)),
+    ParserSpec('HRZN', 'hrzn_parser', 'HRZNExtractor', (CAP_TICKER, CAP_URL)),
+    ParserSpec('ICMB', 'icmb_parser', 'ICMBExtractor', (CAP_TICKER, CAP_URL)),
+    ParserSpec('KBDC', 'kbdc_custom_parser', 'KBDCCustomExtractor', (CAP_TICKER, CAP_URL)),
+    ParserSpec('LIEN', 'lien_parser', 'LIENExtractor', (CAP_TICKER, CAP_URL)),
+    ParserSpec('LRFC', 'lrfc_parser', 'LRFCExtractor', (CAP_TICKER, CAP_URL)),
+    ParserSpec('MAIN', 'main_custom_parser', 'MAINCustomExtractor', (CAP_TICKER,)),
+    ParserSpec('MRCC', 'mrcc_parser', 'MRCCExtractor', (CAP_TICKER, CAP_URL)),
+    ParserSpec('MSDL', 'msdl_custom_parser', 'MSDLCustomExtractor', (CAP_TICKER, CAP_URL)),
+    ParserSpec('MSIF', 'msif_parser', 'MSIFExtractor', (CAP_TICKER, CAP_URL)),
+    ParserSpec('NCDL', 'ncdl_custom_parser', 'NCDLCustomExtractor', (CAP_TICKER, CAP_URL)),
+    ParserSpec('NMFC', 'nmfc_custom_parser', 'NMFCCustomExtractor', (CAP_TICKER, CAP_URL)),
+    ParserSpec('OBDC', 'obdc_custom_parser', 'OBDCCustomExtractor', (CAP_TICKER,)),
+    ParserSpec('OCSL', 'ocsl_custom_parser', 'OCSLCustomExtractor', (CAP_TICKER,)),
+    ParserSpec('OFS', 'ofs_parser', 'OFSExtractor', (CAP_TICKER, CAP_URL), alternate='ofs_custom_parser'),
+    ParserSpec('OXSQ', 'oxsq_parser', 'OXSQExtractor', (CAP_TICKER, CAP_URL)),
+    ParserSpec('PFLT', 'pflt_parser', 'PFLTExtractor', (CAP_TICKER, CAP_URL, CAP_HTML_FALLBACK)),
+    ParserSpec('PFX', 'pfx_parser', 'PFXExtractor', (CAP_TICKER, CAP_URL)),
+    ParserSpec('PNNT', 'pnnt_parser', 'PNNTExtractor', (CAP_TICKER, CAP_URL)),
+    ParserSpec('PSBD', 'psbd_parser', 'PSBDExtractor', (CAP_TICKER, CAP_URL)),
+    ParserSpec('PSEC', 'psec_custom_parser', 'PSECCustomExtractor', (CAP_TICKER,)),
+    ParserSpec('RAND', 'rand_parser', 'RANDExtractor', (CAP_TICKER, CAP_URL), alternate='rand_custom_parser'),
+    ParserSpec('RWAY', 'rway_parser', 'RWAYExtractor', (CAP_TICKER, CAP_URL)),
+    ParserSpec('SAR', 'sar_parser', 'SARExtractor', (CAP_TICKER,)),
+    ParserSpec('SCM', 'scm_parser', 'SCMExtractor', (CAP_TICKER,)),
+    ParserSpec('SLRC', 'slrc_parser', 'SLRCExtractor', (CAP_TICKER, CAP_URL)),
+    ParserSpec('SSSS', 'ssss_parser', 'SSSSExtractor', (CAP_TICKER, CAP_URL), alternate='ssss_custom_parser'),
+    ParserSpec('TPVG', 'tpvg_parser', 'TPVGExtractor', (CAP_TICKER, CAP_URL), alternate='tpvg_custom_parser'),
+    ParserSpec('TRIN', 'trin_parser', 'TRINExtractor', (CAP_TICKER, CAP_URL)),
+    ParserSpec('WHF', 'whf_parser', 'WHFExtractor', (CAP_TICKER, CAP_URL)),
+]}
+
+_class_cache: Dict[str, type] = {}
+
+
+def _ticker_from_module(module: str) -> str:
+    return module.replace('_custom_parser', '').replace('_parser', '').upper()
+
+
+def get_spec(ticker: str) -> Optional[ParserSpec]:
+    """Return the registered spec for a ticker, or None."""
+    return PARSERS.get(ticker.upper())
+
+
+def list_tickers(capability: Optional[str] = None) -> List[str]:
+    """Registered tickers, optionally only those supporting a capability."""
+    return sorted(t for t, spec in PARSERS.items() if capability is None or spec.supports(capability))
+
+
+def _unregistered_parser_files() -> List[Tuple[str, str]]:
+    """(ticker, path) for *_parser.py files whose ticker is not in PARSERS."""
+    found = {}
+    for path in sorted(glob.glob(os.path.join(PARSER_DIR, '*_parser.py'))):
+        module = os.path.basename(path)[:-3]
+        if module in NON_PARSER_MODULES:
+            continue
+        ticker = _ticker_from_module(module)
+        if ticker in PARSERS:
+            continue
+        # Prefer the regular parser over a custom one, as the registry does
+        if ticker not in found or '_custom_parser' in found[ticker]:
+            found[ticker] = path
+    return sorted(found.items())
+
+
+def find_parser_files() -> List[Tuple[str, str]]:
+    """
+    All (ticker, parser_file) pairs to run, sorted by ticker.
+
+    Registered parsers come from the manifest; unregistered *_parser.py
+    files are added by filename so they are not silently skipped.
+    """
+    parsers = [(ticker, spec.parser_file) for ticker, spec in PARSERS.items()
+               if os.path.exists(spec.parser_file)]
+    for ticker, path in _unregistered_parser_files():
+        logger.debug(f"{ticker}: {os.path.basename(path)} is not in the parser registry")
+        parsers.append((ticker, path))
+    return sorted(parsers)
+
+
+def load_extractor_class(ticker: str, module_name: Optional[str] = None) -> Optional[type]:
+    """
+    Import a ticker's parser module on first use and return its extractor class.
+
+    Args:
+        ticker: BDC ticker
+        module_name: Parser module to load instead of the registered one
+
+    Returns:
+        The extractor class, or None if the module has no registered class
+    """
+    spec = get_spec(ticker)
+    module_name = module_name or (spec.module if spec else None)
+    if not module_name:
+        return None
+    cache_key = f"{ticker.upper()}:{module_name}"
+    if cache_key not in _class_cache:
+        module = importlib.import_module(module_name)
+        if spec and module_name == spec.module:
+            cls = getattr(module, spec.class_name, None)
+        else:
+            cls = _probe_extractor_class(module, ticker.upper())
+        if cls is None:
+            return None
+        _class_cache[cache_key] = cls
+    return _class_cache[cache_key]
+
+
+def _probe_extractor_class(module, ticker: str) -> Optional[type]:
+    """Guess the extractor class of an unregistered module from naming conventions."""
+    for class_name in (f'{ticker}Extractor', f'{ticker}CustomExtractor', 'Extractor', 'CustomExtractor'):
+        if hasattr(module, class_name):
+            return getattr(module, class_name)
+    return None
+
+
+def create_extractor(ticker: str, **kwargs):
+    """Instantiate the registered extractor for a ticker."""
+    cls = load_extractor_class(ticker)
+    if cls is None:
+        raise KeyError(f"No registered parser for {ticker}")
+    return cls(**kwargs)
+
+
+def check_registry() -> List[str]:
+    """
+    Compare the manifest with the parser files on disk without importing them.
+
+    Returns:
+        Problems found (missing modules, missing classes, unregistered parsers)
+    """
+    problems = []
+    for ticker, spec in sorted(PARSERS.items()):
+        if not os.path.exists(spec.parser_file):
+            problems.append(f"{ticker}: module {spec.module} not found")
+            continue
+        with open(spec.parser_file, 'r', encoding='utf-8') as f:
+            tree = ast.parse(f.read())
+        classes = {node.name for node in tree.body if isinstance(node, ast.ClassDef)}
+        if spec.class_name not in classes:
+            problems.append(f"{ticker}: class {spec.class_name} not found in {spec.module}")
+    for ticker, path in _unregistered_parser_files():
+        problems.append(f"{ticker}: {os.path.basename(path)} is not registered")
+    return problems
+
+
+if __name__ == '__main__':
+    for ticker in list_tickers():
+        spec = PARSERS[ticker]
+        alternate = f" (alternate: {spec.alternate})" if spec.alternate else ''
+        print(f"{ticker:<6} {spec.module}.{spec.class_name} [{', '.join(spec.capabilities)}]{alternate}")
+    problems = check_registry()
+    if problems:
+        print()
+        for problem in problems:
+            print(f"WARNING: {problem}")
+        raise SystemExit(1)
@@ -11,11 +11,13 @@ from typing import List, Dict, Optional
 from collections import defaultdict
 from dataclasses import dataclass
 import os
-import csv
 import requests
 
 from sec_api_client import SECAPIClient
 from standardization import standardize_investment_type, standardize_industry, standardize_reference_rate
+from output_writer import InvestmentCSVWriter
+from instrumentation import timed
+from name_matching import CompanyNameIndex
 
 logger = logging.getLogger(__name__)
 
@@ -121,14 +123,12 @@ class PFLTExtractor:
         out_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'output')
         os.makedirs(out_dir, exist_ok=True)
         out_file = os.path.join(out_dir, 'PFLT_PennantPark_Floating_Rate_Capital_Ltd_investments.csv')
-        with open(out_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=[
+        with InvestmentCSVWriter(out_file, fieldnames=[
                 'company_name', 'industry', 'business_description', 'investment_type',
                 'acquisition_date', 'maturity_date', 'principal_amount', 'cost', 'fair_value',
                 'interest_rate', 'reference_rate', 'spread', 'floor_rate', 'pik_rate',
                 'shares_units', 'percent_net_assets', 'currency', 'commitment_limit', 'undrawn_commitment'
-            ])
-            writer.writeheader()
+            ]) as writer:
             for inv in investments:
                 # Apply standardization
                 standardized_inv_type = standardize_investment_type(inv.investment_type)
@@ -563,6 +563,7 @@ class PFLTExtractor:
         dates=[c.get('instant') for c in contexts if c.get('instant') and re.match(r'^\d{4}-\d{2}-\d{2}$', c.get('instant'))]
         return max(dates) if dates else None
     
+    @timed('html_fallback')
     def _extract_html_fallback(self, filing_url: str, investments: List[PFLTInvestment]) -> Optional[Dict[str, Dict]]:
         """Extract HTML table data as fallback for missing optional fields."""
         try:
@@ -633,32 +634,14 @@ class PFLTExtractor:
         name = re.sub(r'^(the\s+)', '', name)
         return name
     
-    def _fuzzy_match_company_names(self, name1: str, name2: str, threshold: float = 0.8) -> bool:
-        """Check if two company names are similar enough to match."""
-        from difflib import SequenceMatcher
-        norm1 = self._normalize_company_name(name1)
-        norm2 = self._normalize_company_name(name2)
-        if not norm1 or not norm2:
-            return False
-        if norm1 == norm2:
-            return True
-        if norm1 in norm2 or norm2 in norm1:
-            return True
-        similarity = SequenceMatcher(None, norm1, norm2).ratio()
-        return similarity >= threshold
-    
     def _merge_html_data(self, investments: List[PFLTInvestment], html_data: Dict[str, Dict]):
         """Merge HTML-extracted optional fields into XBRL investments."""
         html_by_name = html_data.get('by_name', {})
         html_by_name_type = html_data.get('by_name_type', {})
         
-        html_by_normalized = {}
-        for html_inv in html_by_name.values():
-            company_name = html_inv.get('company_name', '').strip()
-            if company_name:
-                normalized = self._normalize_company_name(company_name)
-                if normalized and normalized not in html_by_normalized:
-                    html_by_normalized[normalized] = html_inv
+        name_index = CompanyNameIndex(normalizer=self._normalize_company_name)
+        for html_name, html_inv in html_by_name.items():
+            name_index.add(html_name, html_inv)
         
         merged_count = 0
         for inv in investments:
@@ -674,14 +657,7 @@ class PFLTExtractor:
                 html_inv = html_by_name.get(company_name_lower)
             
             if not html_inv:
-                normalized = self._normalize_company_name(inv.company_name)
-                html_inv = html_by_normalized.get(normalized)
-            
-            if not html_inv:
-                for html_name, html_inv_candidate in html_by_name.items():
-                    if self._fuzzy_match_company_names(inv.company_name, html_name, threshold=0.8):
-                        html_inv = html_inv_candidate
-                        break
+                html_inv = name_index.lookup(inv.company_name, threshold=0.8)
             
             if html_inv:
                 merged = False
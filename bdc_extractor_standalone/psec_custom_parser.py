@@ -13,6 +13,7 @@ import requests
 sys.path.insert(0, os.path.dirname(__file__))
 from sec_api_client import SECAPIClient
 from standardization import standardize_investment_type, standardize_industry, standardize_reference_rate
+from output_writer import InvestmentCSVWriter
 
 logger = logging.getLogger(__name__)
 
@@ -709,8 +710,6 @@ class PSECCustomExtractor:
     
     def _save_to_csv(self, investments: List[Dict]) -> str:
         """Save investments to CSV file."""
-        import csv
-        
         output_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'output')
         os.makedirs(output_dir, exist_ok=True)
         output_file = os.path.join(output_dir, 'PSEC_Prospect_Capital_Corp_investments.csv')
@@ -723,9 +722,7 @@ class PSECCustomExtractor:
             'commitment_limit', 'undrawn_commitment'
         ]
         
-        with open(output_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
+        with InvestmentCSVWriter(output_file, fieldnames=fieldnames) as writer:
             
             for inv in investments:
                 writer.writerow({
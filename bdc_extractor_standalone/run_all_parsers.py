@@ -10,12 +10,24 @@ This script:
 """
 
 import os
+import sys
+import time
 import glob
-import importlib
+import argparse
 import logging
 import traceback
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional
+
+from instrumentation import (RunMetrics, metrics, instrument_extractor, instrument_requests,
+                             write_metrics_report, format_hotspots)
+from parser_registry import find_parser_files, load_extractor_class
+
+# The profiler is shared with the preferred-stock tools in the repo-root core/
+# package; appended so this directory's own modules (e.g. scripts) still win
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.profiling import ExtractionProfiler
 
 logging.basicConfig(
     level=logging.INFO,
@@ -45,62 +57,6 @@ def clear_output_folder(output_dir: str = None):
     
     logger.info(f"Cleared {csv_count} CSV files from output folder")
 
-def find_parser_files() -> List[Tuple[str, str]]:
-    """Find all parser files and their tickers."""
-    parser_dir = os.path.dirname(__file__)
-    parsers = []
-    seen_tickers = set()
-    
-    # Get all parser files (including custom parsers that were renamed)
-    parser_files = glob.glob(os.path.join(parser_dir, '*_parser.py'))
-    # Also check for any remaining custom parsers
-    custom_files = glob.glob(os.path.join(parser_dir, '*_custom_parser.py'))
-    
-    all_files = parser_files + custom_files
-    
-    for parser_file in all_files:
-        basename = os.path.basename(parser_file)
-        # Skip utility parsers
-        if basename in ['flexible_table_parser.py', 'verbose_identifier_parser.py', 'xbrl_typed_extractor.py']:
-            continue
-        
-        # Extract ticker from filename
-        if '_custom_parser.py' in basename:
-            ticker = basename.replace('_custom_parser.py', '').upper()
-        else:
-            ticker = basename.replace('_parser.py', '').upper()
-        
-        # Skip if we've already seen this ticker (prefer regular parser over custom)
-        if ticker in seen_tickers:
-            continue
-        
-        seen_tickers.add(ticker)
-        parsers.append((ticker, parser_file))
-    
-    return sorted(parsers)
-
-def get_extractor_class(module, ticker: str):
-    """Get the extractor class from a module."""
-    # Try common class name patterns
-    class_names = [
-        f'{ticker}Extractor',
-        f'{ticker.upper()}Extractor',
-        f'{ticker}CustomExtractor',  # For custom parsers
-        f'{ticker.upper()}CustomExtractor',
-        'Extractor',
-        'CustomExtractor',
-    ]
-    
-    for class_name in class_names:
-        if hasattr(module, class_name):
-            return getattr(module, class_name)
-    
-    # Special case: FDUS custom parser uses FDUSExtractor (not FDUSCustomExtractor)
-    if ticker == 'FDUS' and hasattr(module, 'FDUSExtractor'):
-        return getattr(module, 'FDUSExtractor')
-    
-    return None
-
 def run_parser(ticker: str, parser_file: str) -> Dict:
     """Run a single parser and return results."""
     result = {
@@ -110,14 +66,13 @@ def run_parser(ticker: str, parser_file: str) -> Dict:
         'error': None,
         'investments_count': 0
     }
+    metrics.reset()
     
     try:
-        # Import the parser module
+        # Import the parser module and get its extractor class
         module_name = os.path.basename(parser_file).replace('.py', '')
-        module = importlib.import_module(module_name)
-        
-        # Get extractor class
-        extractor_class = get_extractor_class(module, ticker)
+        with metrics.span('import'):
+            extractor_class = load_extractor_class(ticker, module_name)
         if not extractor_class:
             result['status'] = 'skipped'
             result['error'] = f'No extractor class found in {parser_file}'
@@ -126,6 +81,7 @@ def run_parser(ticker: str, parser_file: str) -> Dict:
         
         # Create extractor instance
         extractor = extractor_class()
+        instrument_extractor(extractor)
         
         # Check if extract_from_ticker exists
         if not hasattr(extractor, 'extract_from_ticker'):
@@ -137,11 +93,12 @@ def run_parser(ticker: str, parser_file: str) -> Dict:
         # Run the extractor
         logger.info(f"🔄 Running {ticker} parser...")
         # Some parsers might not take ticker as argument, try with and without
-        try:
-            data = extractor.extract_from_ticker(ticker)
-        except TypeError:
-            # Try without ticker argument (uses default)
-            data = extractor.extract_from_ticker()
+        with metrics.span('extract'):
+            try:
+                data = extractor.extract_from_ticker(ticker)
+            except TypeError:
+                # Try without ticker argument (uses default)
+                data = extractor.extract_from_ticker()
         
         # Extract investment count
         if isinstance(data, dict):
@@ -164,30 +121,52 @@ def run_parser(ticker: str, parser_file: str) -> Dict:
         logger.error(f"❌ {ticker}: Error - {e}")
         logger.debug(traceback.format_exc())
     
+    result['metrics'] = metrics.snapshot()
     return result
 
-def main():
-    """Main function to run all parsers."""
+def main(metrics_file: str = None, profile: bool = False, profile_dir: str = None, profile_top: int = 25,
+         tickers: Optional[List[str]] = None):
+    """Main function to run all parsers (or only the given tickers)."""
+    output_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'output')
+    if metrics_file is None:
+        metrics_file = os.path.join(output_dir, 'run_metrics.json')
+    try:
+        instrument_requests()
+    except ImportError:
+        logger.warning("requests not available, HTTP metrics disabled")
+    run_totals = RunMetrics()
+    run_start = time.perf_counter()
+    profiler = ExtractionProfiler(profile_dir, top_n=profile_top) if profile else None
+    
     print("=" * 80)
     print("RUNNING ALL BDC PARSERS")
     print("=" * 80)
     print()
     
-    # Clear output folder
-    logger.info("Clearing output folder...")
-    clear_output_folder()
-    print()
-    
     # Find all parsers
     parsers = find_parser_files()
+    if tickers:
+        wanted = {t.upper() for t in tickers}
+        parsers = [(ticker, parser_file) for ticker, parser_file in parsers if ticker in wanted]
+        missing = wanted - {ticker for ticker, _ in parsers}
+        if missing:
+            logger.warning(f"No parser found for: {', '.join(sorted(missing))}")
+    else:
+        # Full refresh: clear output folder
+        logger.info("Clearing output folder...")
+        clear_output_folder()
+        print()
+    
     logger.info(f"Found {len(parsers)} parser files")
     print()
     
     # Run each parser
     results = []
     for ticker, parser_file in parsers:
-        result = run_parser(ticker, parser_file)
+        with profiler.profile(ticker) if profiler else nullcontext():
+            result = run_parser(ticker, parser_file)
         results.append(result)
+        run_totals.merge(metrics)
         print()  # Blank line between parsers
     
     # Summary
@@ -225,8 +204,34 @@ def main():
     
     total_investments = sum(r['investments_count'] for r in successful)
     print(f"Total investments extracted: {total_investments}")
+    print()
+    
+    for line in format_hotspots(results, run_totals):
+        print(line)
+    try:
+        write_metrics_report(metrics_file, results, run_totals, time.perf_counter() - run_start)
+    except Exception as e:
+        logger.warning(f"Could not write run metrics: {e}")
+    if profiler:
+        summary_path = profiler.write_summary()
+        if summary_path:
+            print(f"Profile summary: {summary_path}")
     print("=" * 80)
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description='Run all BDC parsers to regenerate investment CSV files')
+    parser.add_argument('--ticker', action='append', dest='tickers',
+                        help='Only run this ticker\'s parser (can be repeated; output folder is not cleared)')
+    parser.add_argument('--metrics-file', default=None,
+                        help='Where to write the run metrics report (default: output/run_metrics.json)')
+    parser.add_argument('--profile', action='store_true',
+                        help='Profile each parser (cProfile + tracemalloc) into output/profiles/')
+    parser.add_argument('--profile-dir', default=None,
+                        help='Directory for profile files (default: output/profiles/<timestamp>)')
+    parser.add_argument('--profile-top', type=int, default=25,
+                        help='Number of hot functions listed per report (default: 25)')
+    args = parser.parse_args()
+    
+    main(metrics_file=args.metrics_file, profile=args.profile,
+         profile_dir=args.profile_dir, profile_top=args.profile_top, tickers=args.tickers)
 
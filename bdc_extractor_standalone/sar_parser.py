@@ -9,12 +9,12 @@ import logging
 from typing import List, Dict, Optional
 from dataclasses import dataclass
 import os
-import csv
 import requests
 from bs4 import BeautifulSoup
 
 from sec_api_client import SECAPIClient
 from standardization import standardize_investment_type, standardize_industry, standardize_reference_rate
+from output_writer import InvestmentCSVWriter
 
 logger = logging.getLogger(__name__)
 
@@ -365,9 +365,7 @@ def main():
     fieldnames = [
         "company_name","investment_type","industry","interest_rate","reference_rate","spread","floor_rate","pik_rate","acquisition_date","maturity_date","principal_amount","amortized_cost","fair_value","percent_of_net_assets",
     ]
-    with open(out_csv, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
+    with InvestmentCSVWriter(out_csv, fieldnames=fieldnames) as writer:
         for rec in records:
             if 'investment_type' in rec:
                 rec['investment_type'] = standardize_investment_type(rec.get('investment_type'))
@@ -423,10 +421,8 @@ def main():
         })
     
     inv_out = os.path.join(out_dir, 'SAR_Saratoga_Investment_Corp_investments.csv')
-    with open(inv_out, 'w', newline='', encoding='utf-8') as f:
-        inv_fields = ['company_name','industry','business_description','investment_type','acquisition_date','maturity_date','principal_amount','cost','fair_value','interest_rate','reference_rate','spread','floor_rate','pik_rate']
-        w = csv.DictWriter(f, fieldnames=inv_fields)
-        w.writeheader()
+    inv_fields = ['company_name','industry','business_description','investment_type','acquisition_date','maturity_date','principal_amount','cost','fair_value','interest_rate','reference_rate','spread','floor_rate','pik_rate']
+    with InvestmentCSVWriter(inv_out, fieldnames=inv_fields) as w:
         for r in inv_rows:
             if 'investment_type' in r:
                 r['investment_type'] = standardize_investment_type(r.get('investment_type'))
@@ -541,10 +537,8 @@ class SARExtractor:
         out_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'output')
         os.makedirs(out_dir, exist_ok=True)
         inv_out = os.path.join(out_dir, 'SAR_Saratoga_Investment_Corp_investments.csv')
-        with open(inv_out, 'w', newline='', encoding='utf-8') as f:
-            inv_fields = ['company_name','industry','business_description','investment_type','acquisition_date','maturity_date','principal_amount','cost','fair_value','interest_rate','reference_rate','spread','floor_rate','pik_rate']
-            w = csv.DictWriter(f, fieldnames=inv_fields)
-            w.writeheader()
+        inv_fields = ['company_name','industry','business_description','investment_type','acquisition_date','maturity_date','principal_amount','cost','fair_value','interest_rate','reference_rate','spread','floor_rate','pik_rate']
+        with InvestmentCSVWriter(inv_out, fieldnames=inv_fields) as w:
             for r in inv_rows:
                 if 'investment_type' in r:
                     r['investment_type'] = standardize_investment_type(r.get('investment_type'))
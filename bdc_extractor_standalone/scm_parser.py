@@ -6,7 +6,6 @@ HTML-based extraction following HTML_SCHEDULE_WORKFLOW.md
 
 import re
 import os
-import csv
 import logging
 import requests
 from typing import List, Dict, Optional
@@ -14,6 +13,8 @@ from collections import defaultdict
 from bs4 import BeautifulSoup
 from sec_api_client import SECAPIClient
 from standardization import standardize_investment_type, standardize_industry, standardize_reference_rate
+from output_writer import InvestmentCSVWriter
+from xbrl_artifact import XBRLArtifact
 
 logger = logging.getLogger(__name__)
 
@@ -158,9 +159,7 @@ class SCMExtractor:
             'percent_of_net_assets',
         ]
         
-        with open(out_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
+        with InvestmentCSVWriter(out_file, fieldnames=fieldnames) as writer:
             for rec in records:
                 # Apply standardization
                 if 'investment_type' in rec and rec['investment_type']:
@@ -687,39 +686,11 @@ class SCMExtractor:
             txt_url = f"https://www.sec.gov/Archives/edgar/data/{cik_numeric}/{accession_no_hyphens}/{accession}.txt"
             logger.info(f"Downloading XBRL for industry enrichment: {txt_url}")
             
-            response = requests.get(txt_url, headers=self.headers)
-            response.raise_for_status()
-            content = response.text
-            
-            # Extract contexts with InvestmentIdentifierAxis and industry
-            cp = re.compile(r'<context id="([^"]+)">(.*?)</context>', re.DOTALL)
-            tp = re.compile(
-                r'<xbrldi:typedMember[^>]*dimension="us-gaap:InvestmentIdentifierAxis"[^>]*>'
-                r'\s*<us-gaap:InvestmentIdentifierAxis\.domain>([^<]+)</us-gaap:InvestmentIdentifierAxis\.domain>'
-                r'\s*</xbrldi:typedMember>', re.DOTALL
-            )
-            ep = re.compile(
-                r'<xbrldi:explicitMember[^>]*dimension="us-gaap:EquitySecuritiesByIndustryAxis"[^>]*>([^<]+)</xbrldi:explicitMember>',
-                re.DOTALL | re.IGNORECASE
-            )
-            
-            context_count = 0
-            typed_member_count = 0
+            xbrl = XBRLArtifact.fetch(txt_url, self.headers)
             industry_member_count = 0
             
-            for m in cp.finditer(content):
-                context_count += 1
-                cid = m.group(1)
-                chtml = m.group(2)
-                
-                # Find investment identifier
-                tm = tp.search(chtml)
-                if not tm:
-                    continue
-                
-                typed_member_count += 1
-                ident = tm.group(1).strip()
-                parsed = self._parse_identifier_xbrl(ident)
+            for ctx in xbrl.investment_contexts():
+                parsed = self._parse_identifier_xbrl(ctx.identifier)
                 company_name = parsed.get('company_name', '').strip()
                 industry_from_ident = parsed.get('industry', '').strip()
                 
@@ -727,11 +698,10 @@ class SCMExtractor:
                     continue
                 
                 # Try to find industry from explicitMember first
-                em = ep.search(chtml)
+                industry_qname = ctx.member('EquitySecuritiesByIndustryAxis')
                 industry = None
-                if em:
+                if industry_qname:
                     industry_member_count += 1
-                    industry_qname = em.group(1).strip()
                     industry = self._industry_member_to_name(industry_qname)
                 
                 # Fallback: use industry from identifier if available
@@ -745,7 +715,7 @@ class SCMExtractor:
                         industry_map[company_key] = industry
                         logger.debug(f"Mapped {company_name} -> {industry}")
             
-            logger.info(f"XBRL parsing: {context_count} contexts, {typed_member_count} typed members, {industry_member_count} industry members")
+            logger.info(f"XBRL parsing: {xbrl.context_count} contexts, {len(xbrl.contexts)} typed members, {industry_member_count} industry members")
             
             logger.info(f"Extracted {len(industry_map)} industry mappings from XBRL")
             
@@ -3,7 +3,8 @@
 import re
 from pathlib import Path
 
-HTML_FALLBACK_METHODS = '''    def _extract_html_fallback(self, filing_url: str, investments: List[{INVESTMENT_TYPE}]) -> Optional[Dict[str, Dict]]:
+HTML_FALLBACK_METHODS = '''    @timed('html_fallback')
+    def _extract_html_fallback(self, filing_url: str, investments: List[{INVESTMENT_TYPE}]) -> Optional[Dict[str, Dict]]:
         """Extract optional fields from HTML as fallback when XBRL doesn't have them."""
         try:
             from flexible_table_parser import FlexibleTableParser
@@ -80,33 +81,15 @@ HTML_FALLBACK_METHODS = '''    def _extract_html_fallback(self, filing_url: str,
         name = re.sub(r'^(the\\s+)', '', name)
         return name
     
-    def _fuzzy_match_company_names(self, name1: str, name2: str, threshold: float = 0.8) -> bool:
-        """Check if two company names are similar enough to match."""
-        from difflib import SequenceMatcher
-        norm1 = self._normalize_company_name(name1)
-        norm2 = self._normalize_company_name(name2)
-        if not norm1 or not norm2:
-            return False
-        if norm1 == norm2:
-            return True
-        if norm1 in norm2 or norm2 in norm1:
-            return True
-        similarity = SequenceMatcher(None, norm1, norm2).ratio()
-        return similarity >= threshold
-    
     def _merge_html_data(self, investments: List[{INVESTMENT_TYPE}], html_data: Dict[str, Dict]):
         """Merge HTML-extracted optional fields into XBRL investments."""
         html_by_name = html_data.get('by_name', {{}})
         html_by_name_type = html_data.get('by_name_type', {{}})
         
-        # Create normalized lookup for fuzzy matching
-        html_by_normalized = {{}}
-        for html_inv in html_by_name.values():
-            company_name = html_inv.get('company_name', '').strip()
-            if company_name:
-                normalized = self._normalize_company_name(company_name)
-                if normalized and normalized not in html_by_normalized:
-                    html_by_normalized[normalized] = html_inv
+        # Normalized n-gram index for exact-normalized and fuzzy matching
+        name_index = CompanyNameIndex(normalizer=self._normalize_company_name)
+        for html_name, html_inv in html_by_name.items():
+            name_index.add(html_name, html_inv)
         
         merged_count = 0
         for inv in investments:
@@ -123,17 +106,9 @@ HTML_FALLBACK_METHODS = '''    def _extract_html_fallback(self, filing_url: str,
             if not html_inv:
                 html_inv = html_by_name.get(company_name_lower)
             
-            # Strategy 3: Try normalized matching
-            if not html_inv:
-                normalized = self._normalize_company_name(inv.company_name)
-                html_inv = html_by_normalized.get(normalized)
-            
-            # Strategy 4: Fuzzy matching (last resort)
+            # Strategy 3: Normalized or fuzzy match via the name index
             if not html_inv:
-                for html_name, html_inv_candidate in html_by_name.items():
-                    if self._fuzzy_match_company_names(inv.company_name, html_name, threshold=0.8):
-                        html_inv = html_inv_candidate
-                        break
+                html_inv = name_index.lookup(inv.company_name, threshold=0.8)
             
             if html_inv:
                 merged = False
@@ -177,7 +152,13 @@ def add_html_fallback_to_parser(parser_file: Path, investment_type: str):
     
     # Insert methods
     new_content = content[:insert_pos] + '\n' + methods + '\n\n    ' + content[insert_pos:]
-    
+
+    # Merging relies on the shared name index; the fallback is timed as its own stage
+    for import_line in ('from name_matching import CompanyNameIndex', 'from instrumentation import timed'):
+        if import_line not in new_content:
+            new_content = re.sub(r'(\nfrom standardization import [^\n]+\n)',
+                                 lambda m: m.group(1) + import_line + '\n', new_content, count=1)
+
     parser_file.write_text(new_content, encoding='utf-8')
     print(f"Added HTML fallback methods to {parser_file.name}")
 
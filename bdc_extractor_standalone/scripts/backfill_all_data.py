@@ -8,6 +8,7 @@ and generates static JSON files for the frontend.
 Usage:
     python scripts/backfill_all_data.py --years-back 5
     python scripts/backfill_all_data.py --ticker ARCC --ticker OBDC
+    python scripts/backfill_all_data.py --mirror --offline
 """
 
 import os
@@ -20,6 +21,7 @@ from datetime import datetime
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from scripts.generate_static_data import main as generate_static_data_main
+from edgar_mirror import enable_mirror, MODE_FALLBACK, MODE_OFFLINE
 from bdc_config import BDC_UNIVERSE, get_bdc_by_ticker
 
 logging.basicConfig(
@@ -60,13 +62,31 @@ def main():
         default=5,
         help='Number of parallel workers (default: 5, increase for faster processing but watch SEC rate limits)'
     )
+    parser.add_argument(
+        '--mirror',
+        nargs='?',
+        const='',
+        metavar='DIR',
+        help='Read SEC files from a local EDGAR mirror (see scripts/sync_edgar_mirror.py)'
+    )
+    parser.add_argument(
+        '--offline',
+        action='store_true',
+        help='Only use the local EDGAR mirror, never the network'
+    )
     
     args = parser.parse_args()
     
+    mirror = None
+    if args.mirror is not None or args.offline:
+        mirror = enable_mirror(args.mirror or None, MODE_OFFLINE if args.offline else MODE_FALLBACK)
+    
     logger.info("="*80)
     logger.info("BDC HISTORICAL DATA BACKFILL")
     logger.info("="*80)
     logger.info(f"Years back: {args.years_back}")
+    if mirror:
+        logger.info(f"EDGAR mirror: {mirror.root} ({mirror.mode})")
     logger.info(f"Start time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     logger.info("="*80)
     
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Offline replay benchmark for the BDC parsers.
+
+Record mode runs each parser once against SEC and stores every HTTP
+response it makes in a fixture corpus (benchmarks/fixtures/<TICKER>/).
+Replay mode runs the same parsers with all HTTP served from that corpus,
+so timings measure our code rather than EDGAR.
+
+Every ticker runs in its own subprocess and reports:
+  - fetch, parse, standardize and write time (seconds)
+  - peak RSS (MB), rows written, requests and bytes served
+
+Results are compared against a JSON baseline (benchmarks/baseline.json)
+and regressions beyond the tolerance are flagged.
+
+Usage:
+    python scripts/benchmark_parsers.py --record --ticker ARCC --ticker MAIN
+    python scripts/benchmark_parsers.py                      # replay all recorded tickers
+    python scripts/benchmark_parsers.py --update-baseline
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import hashlib
+import argparse
+import resource
+import tempfile
+import subprocess
+from datetime import datetime
+from typing import Dict, List, Optional
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+BENCHMARK_DIR = os.path.join(BASE_DIR, 'benchmarks')
+DEFAULT_FIXTURE_DIR = os.path.join(BENCHMARK_DIR, 'fixtures')
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, 'baseline.json')
+
+STAGES = ('fetch', 'parse', 'standardize', 'write')
+# Regressions smaller than this are noise, whatever the relative change
+MIN_REGRESSION_SECONDS = 0.05
+MIN_REGRESSION_MB = 5.0
+
+
+class StageTimer:
+    """Accumulates wall time per stage; parse time is what the other stages don't cover."""
+
+    def __init__(self):
+        self.totals = {stage: 0.0 for stage in STAGES}
+        self.requests = 0
+        self.bytes = 0
+
+    def add(self, stage: str, seconds: float):
+        self.totals[stage] += seconds
+
+    def wrap(self, stage: str, func):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.totals[stage] += time.perf_counter() - start
+        timed.__wrapped__ = func
+        return timed
+
+
+class FixtureStore:
+    """HTTP responses for one ticker, keyed by method and URL."""
+
+    def __init__(self, fixture_dir: str, ticker: str):
+        self.path = os.path.join(fixture_dir, ticker.upper())
+
+    @staticmethod
+    def key(method: str, url: str) -> str:
+        return hashlib.sha1(f"{method.upper()} {url}".encode('utf-8')).hexdigest()
+
+    def save(self, method: str, url: str, response):
+        os.makedirs(self.path, exist_ok=True)
+        key = self.key(method, url)
+        with open(os.path.join(self.path, f'{key}.body'), 'wb') as f:
+            f.write(response.content)
+        with open(os.path.join(self.path, f'{key}.json'), 'w', encoding='utf-8') as f:
+            json.dump({
+                'method': method.upper(),
+                'url': response.url,
+                'status_code': response.status_code,
+                'encoding': response.encoding,
+                'content_type': response.headers.get('Content-Type'),
+            }, f, indent=2)
+
+    def load(self, method: str, url: str):
+        import requests
+
+        key = self.key(method, url)
+        meta_path = os.path.join(self.path, f'{key}.json')
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        response = requests.Response()
+        with open(os.path.join(self.path, f'{key}.body'), 'rb') as f:
+            response._content = f.read()
+        response.status_code = meta['status_code']
+        response.url = meta['url']
+        response.encoding = meta.get('encoding')
+        if meta.get('content_type'):
+            response.headers['Content-Type'] = meta['content_type']
+        return response
+
+
+def install_instrumentation(timer: StageTimer, store: FixtureStore, record: bool, output_dir: str):
+    """
+    Patch HTTP, standardization and CSV writing for one benchmark process.
+
+    Must run before any parser module is imported, since parsers bind the
+    standardization functions at import time.
+    """
+    import requests
+    import standardization
+    import output_writer
+
+    original_request = requests.Session.request
+
+    def request(session, method, url, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            full_url = requests.Request(method, url, params=kwargs.get('params')).prepare().url
+            if record:
+                response = original_request(session, method, url, *args, **kwargs)
+                if response.status_code == 200:
+                    store.save(method, full_url, response)
+            else:
+                response = store.load(method, full_url)
+                if response is None:
+                    raise requests.ConnectionError(f"No fixture for {method} {full_url} (run with --record)")
+            timer.requests += 1
+            timer.bytes += len(response.content)
+            return response
+        finally:
+            timer.add('fetch', time.perf_counter() - start)
+
+    requests.Session.request = request
+
+    for name in dir(standardization):
+        if name.startswith('standardize_') and callable(getattr(standardization, name)):
+            setattr(standardization, name, timer.wrap('standardize', getattr(standardization, name)))
+
+    writer_cls = output_writer.InvestmentCSVWriter
+    original_init = writer_cls.__init__
+
+    def redirected_init(self, path, *args, **kwargs):
+        # Keep benchmark runs from overwriting the real output/ files
+        original_init(self, os.path.join(output_dir, os.path.basename(path)), *args, **kwargs)
+
+    writer_cls.__init__ = redirected_init
+    for method in ('open', '_flush', 'commit'):
+        setattr(writer_cls, method, timer.wrap('write', getattr(writer_cls, method)))
+
+
+def _peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes on Linux
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def run_worker(ticker: str, fixture_dir: str, record: bool) -> Dict:
+    """Run one parser under instrumentation (called in the per-ticker subprocess)."""
+    import logging
+    logging.disable(logging.WARNING)
+
+    timer = StageTimer()
+    store = FixtureStore(fixture_dir, ticker)
+    with tempfile.TemporaryDirectory(prefix='bdc_bench_') as output_dir:
+        install_instrumentation(timer, store, record, output_dir)
+
+        from run_all_parsers import find_parser_files, run_parser
+
+        parser_file = dict(find_parser_files()).get(ticker)
+        if not parser_file:
+            return {'ticker': ticker, 'status': 'error', 'error': 'No parser found'}
+
+        start = time.perf_counter()
+        result = run_parser(ticker, parser_file)
+        total = time.perf_counter() - start
+
+        rows = 0
+        for name in os.listdir(output_dir):
+            if name.endswith('.csv'):
+                with open(os.path.join(output_dir, name), 'r', encoding='utf-8', newline='') as f:
+                    rows += sum(1 for _ in csv.DictReader(f))
+
+    stages = {stage: round(seconds, 4) for stage, seconds in timer.totals.items()}
+    stages['parse'] = round(max(0.0, total - timer.totals['fetch'] - timer.totals['standardize']
+                                - timer.totals['write']), 4)
+    return {
+        'ticker': ticker,
+        'status': result['status'],
+        'error': result['error'],
+        'total_seconds': round(total, 4),
+        'stages': stages,
+        'peak_rss_mb': round(_peak_rss_mb(), 1),
+        'rows': rows,
+        'requests': timer.requests,
+        'bytes': timer.bytes,
+    }
+
+
+def run_ticker(ticker: str, fixture_dir: str, record: bool, timeout: int) -> Dict:
+    """Run one ticker in a fresh interpreter so RSS and import costs are per-ticker."""
+    cmd = [sys.executable, os.path.abspath(__file__), '--worker', ticker, '--fixtures', fixture_dir]
+    if record:
+        cmd.append('--record')
+    try:
+        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout, cwd=BASE_DIR)
+    except subprocess.TimeoutExpired:
+        return {'ticker': ticker, 'status': 'error', 'error': f'Timed out after {timeout}s'}
+    lines = proc.stdout.strip().splitlines()
+    try:
+        return json.loads(lines[-1])
+    except (IndexError, ValueError):
+        return {'ticker': ticker, 'status': 'error', 'error': proc.stderr.strip()[-500:] or 'No result'}
+
+
+def compare_to_baseline(results: List[Dict], baseline: Dict, tolerance: float) -> List[str]:
+    """Return human-readable regressions of results against the baseline."""
+    regressions = []
+    for result in results:
+        base = baseline.get('tickers', {}).get(result['ticker'])
+        if not base or result.get('status') != 'success':
+            continue
+        metrics = [('total_seconds', result['total_seconds'], base.get('total_seconds'), MIN_REGRESSION_SECONDS, 's'),
+                   ('peak_rss_mb', result['peak_rss_mb'], base.get('peak_rss_mb'), MIN_REGRESSION_MB, ' MB')]
+        for stage in STAGES:
+            metrics.append((stage, result['stages'][stage], base.get('stages', {}).get(stage),
+                            MIN_REGRESSION_SECONDS, 's'))
+        for name, current, previous, min_delta, unit in metrics:
+            if previous is None:
+                continue
+            if current > previous * (1 + tolerance) and current - previous > min_delta:
+                regressions.append(f"{result['ticker']} {name}: {previous}{unit} -> {current}{unit}")
+        if base.get('rows') is not None and result['rows'] != base['rows']:
+            regressions.append(f"{result['ticker']} rows: {base['rows']} -> {result['rows']}")
+    return regressions
+
+
+def recorded_tickers(fixture_dir: str) -> List[str]:
+    if not os.path.isdir(fixture_dir):
+        return []
+    return sorted(d for d in os.listdir(fixture_dir) if os.path.isdir(os.path.join(fixture_dir, d)))
+
+
+def _load_json(path: str) -> Optional[Dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark BDC parsers against recorded EDGAR responses')
+    parser.add_argument('--ticker', action='append', dest='tickers', help='Ticker to benchmark (can be repeated)')
+    parser.add_argument('--record', action='store_true', help='Fetch from SEC and (re)record fixtures')
+    parser.add_argument('--fixtures', default=DEFAULT_FIXTURE_DIR, help='Fixture corpus directory')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline JSON file')
+    parser.add_argument('--update-baseline', action='store_true', help='Write these results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Relative slowdown flagged as a regression (default: 0.2)')
+    parser.add_argument('--output', help='Also write results JSON to this path')
+    parser.add_argument('--timeout', type=int, default=600, help='Per-ticker timeout in seconds')
+    parser.add_argument('--worker', metavar='TICKER', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker.upper(), args.fixtures, args.record)))
+        return 0
+
+    if args.tickers:
+        tickers = [t.upper() for t in args.tickers]
+    elif args.record:
+        from run_all_parsers import find_parser_files
+        tickers = [ticker for ticker, _ in find_parser_files()]
+    else:
+        tickers = recorded_tickers(args.fixtures)
+    if not tickers:
+        print(f"No recorded fixtures in {args.fixtures}; run with --record first")
+        return 1
+
+    mode = 'record' if args.record else 'replay'
+    print(f"Benchmarking {len(tickers)} parsers ({mode})")
+    print(f"{'Ticker':<8} {'Total':>8} {'Fetch':>8} {'Parse':>8} {'Std':>8} {'Write':>8} {'RSS MB':>8} {'Rows':>7} {'Reqs':>5}")
+    print("-" * 80)
+
+    results = []
+    for ticker in tickers:
+        result = run_ticker(ticker, args.fixtures, args.record, args.timeout)
+        results.append(result)
+        if result.get('status') == 'success':
+            s = result['stages']
+            print(f"{ticker:<8} {result['total_seconds']:>8.2f} {s['fetch']:>8.2f} {s['parse']:>8.2f} "
+                  f"{s['standardize']:>8.2f} {s['write']:>8.2f} {result['peak_rss_mb']:>8.1f} "
+                  f"{result['rows']:>7} {result['requests']:>5}")
+        else:
+            print(f"{ticker:<8} ERROR: {result.get('error')}")
+
+    report = {
+        'generated_at': datetime.now().isoformat(),
+        'mode': mode,
+        'python': sys.version.split()[0],
+        'tickers': {r['ticker']: r for r in results},
+    }
+
+    status = 0
+    baseline = _load_json(args.baseline)
+    if baseline and not args.record:
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        report['regressions'] = regressions
+        print()
+        if regressions:
+            print(f"Regressions vs {os.path.basename(args.baseline)} (tolerance {args.tolerance:.0%}):")
+            for regression in regressions:
+                print(f"  {regression}")
+            status = 1
+        else:
+            print(f"No regressions vs {os.path.basename(args.baseline)}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    if args.update_baseline:
+        if args.record:
+            print("Not updating baseline from a record run (timings include network)")
+        else:
+            os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+            with open(args.baseline, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            print(f"Baseline written to {args.baseline}")
+    return status
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
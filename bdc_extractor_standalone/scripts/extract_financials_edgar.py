@@ -9,7 +9,10 @@ import json
 import sys
 from datetime import datetime, timezone, timedelta
 import datetime as dt_module
-from typing import Dict, Optional
+import threading
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 
 # Add parent directory to path
 ROOT = os.path.dirname(os.path.dirname(__file__))
@@ -32,11 +35,67 @@ except ImportError:
 PUBLIC_DATA_DIR = os.path.join(ROOT, 'frontend', 'public', 'data')
 
 
+class QuarterlyFilingIndex:
+    """
+    EDGAR quarterly form indexes shared by every extraction in the process.
+
+    get_filings(year, quarter, form) downloads and materialises the whole
+    quarter, so each (year, quarter, form) is loaded once and hashed by CIK;
+    finding one company's filings is then a dict lookup instead of a scan.
+    """
+
+    def __init__(self):
+        self._quarters: Dict[Tuple[int, int, str], Tuple[Any, Dict[int, List[int]]]] = {}
+        self._company_names: Dict[Tuple[int, int, str], List[str]] = {}
+        self._lock = threading.Lock()
+
+    def _load(self, year: int, quarter: int, form: str) -> Tuple[Any, Dict[int, List[int]]]:
+        key = (year, quarter, form)
+        with self._lock:
+            if key not in self._quarters:
+                from edgar import get_filings
+                filings = get_filings(year=year, quarter=quarter, form=form)
+                by_cik = defaultdict(list)
+                if filings is not None:
+                    for pos, cik in enumerate(filings.data['cik'].to_pylist()):
+                        by_cik[int(cik)].append(pos)
+                self._quarters[key] = (filings, dict(by_cik))
+            return self._quarters[key]
+
+    def filings_for_cik(self, cik, year: int, quarter: int, form: str) -> List:
+        """Filings of one CIK in the quarter's index, in index order."""
+        filings, by_cik = self._load(year, quarter, form)
+        return [filings.get_filing_at(pos) for pos in by_cik.get(int(cik), [])]
+
+    def filings_for_company_name(self, company_name: str, year: int, quarter: int, form: str) -> List:
+        """Filings whose company name contains company_name (case-insensitive)."""
+        filings, _ = self._load(year, quarter, form)
+        if filings is None:
+            return []
+        key = (year, quarter, form)
+        with self._lock:
+            if key not in self._company_names:
+                self._company_names[key] = [str(c).lower() for c in filings.data['company'].to_pylist()]
+            names = self._company_names[key]
+        needle = company_name.lower()
+        return [filings.get_filing_at(pos) for pos, name in enumerate(names) if needle in name]
+
+
+# Shared by all tickers and periods extracted in this process
+QUARTERLY_INDEX = QuarterlyFilingIndex()
+
+
+@lru_cache(maxsize=None)
+def get_company(ticker: str):
+    """edgartools Company for a ticker, looked up once per run."""
+    set_identity("bdc-extractor@example.com")
+    return Company(ticker)
+
+
 def extract_financials_simple(ticker: str, period: str, accession_number: str = None, form_type: str = None) -> Optional[Dict]:
     """Extract financials using edgartools - get quarterly data from specific 10-Q or 10-K filing."""
     try:
-        set_identity("bdc-extractor@example.com")
-        company = Company(ticker)
+        company = get_company(ticker)
         
         # Parse period to get year and quarter
         period_date = dt_module.datetime.strptime(period, '%Y-%m-%d')
@@ -94,46 +153,43 @@ def extract_financials_simple(ticker: str, period: str, accession_number: str =
         
         target_filing = None
         
-        # Try using get_filings with year and quarter to get the specific filing
+        # Look the company up in the quarter's filing index (loaded once per run)
         try:
-            from edgar import get_filings
-            # Get filings for the specific year and quarter, then filter by ticker
-            all_filings = get_filings(year=year, quarter=quarter, form=target_form)
-            if all_filings:
-                # Filter by ticker/company
-                filings = [f for f in all_filings if hasattr(f, 'ticker') and f.ticker == ticker.upper()]
-                if not filings:
-                    # Try by company name
-                    company_name = company.name if hasattr(company, 'name') else None
-                    filings = [f for f in all_filings if hasattr(f, 'company') and company_name and company_name.lower() in str(f.company).lower()]
+            cik = getattr(company, 'cik', None)
+            filings = QUARTERLY_INDEX.filings_for_cik(cik, year, quarter, target_form) if cik else []
+            if not filings:
+                # Try by company name
+                company_name = company.name if hasattr(company, 'name') else None
+                if company_name:
+                    filings = QUARTERLY_INDEX.filings_for_company_name(company_name, year, quarter, target_form)
+            
+            if filings:
+                # Find the filing that matches our period (within 30 days for 10-Q, 90 days for 10-K)
+                max_days = 90 if target_form == '10-K' else 30
+                for filing in filings:
+                    try:
+                        filing_date = filing.filing_date if hasattr(filing, 'filing_date') else None
+                        if filing_date:
+                            if isinstance(filing_date, str):
+                                filing_date = dt_module.datetime.strptime(filing_date, '%Y-%m-%d')
+                            # Check if filing date is close to period
+                            if abs((period_date - filing_date).days) < max_days:
+                                target_filing = filing
+                                if target_form == '10-K':
+                                    print(f"  Found annual filing: {filing_date} ({year})")
+                                else:
+                                    print(f"  Found quarterly filing: {filing_date} (Q{quarter} {year})")
+                                break
+                    except:
+                        continue
                 
-                if filings:
-                    # Find the filing that matches our period (within 30 days for 10-Q, 90 days for 10-K)
-                    max_days = 90 if target_form == '10-K' else 30
-                    for filing in filings:
-                        try:
-                            filing_date = filing.filing_date if hasattr(filing, 'filing_date') else None
-                            if filing_date:
-                                if isinstance(filing_date, str):
-                                    filing_date = dt_module.datetime.strptime(filing_date, '%Y-%m-%d')
-                                # Check if filing date is close to period
-                                if abs((period_date - filing_date).days) < max_days:
-                                    target_filing = filing
-                                    if target_form == '10-K':
-                                        print(f"  Found annual filing: {filing_date} ({year})")
-                                    else:
-                                        print(f"  Found quarterly filing: {filing_date} (Q{quarter} {year})")
-                                    break
-                        except:
-                            continue
-                    
-                    # If no exact match, use the first filing from that quarter/year
-                    if not target_filing and len(filings) > 0:
-                        target_filing = filings[0]
-                        if target_form == '10-K':
-                            print(f"  Using first filing from {year}")
-                        else:
-                            print(f"  Using first filing from Q{quarter} {year}")
+                # If no exact match, use the first filing from that quarter/year
+                if not target_filing and len(filings) > 0:
+                    target_filing = filings[0]
+                    if target_form == '10-K':
+                        print(f"  Using first filing from {year}")
+                    else:
+                        print(f"  Using first filing from Q{quarter} {year}")
         except Exception as e:
             print(f"  Could not use get_filings(year, quarter): {e}")
         
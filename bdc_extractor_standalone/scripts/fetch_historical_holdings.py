@@ -12,12 +12,13 @@ This script:
 import os
 import sys
 import json
-import csv
+import queue
 import logging
-import requests
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
-import importlib
 import traceback
 
 ROOT = os.path.dirname(os.path.dirname(__file__))
@@ -26,25 +27,66 @@ PUBLIC_DATA_DIR = os.path.join(ROOT, 'frontend', 'public', 'data')
 
 sys.path.insert(0, ROOT)
 
-from sec_api_client import SECAPIClient
+from sec_api_client import SECAPIClient, FilingDocument, throttle_sec_requests
+from edgar_mirror import enable_mirror, MODE_FALLBACK, MODE_OFFLINE
+from output_writer import InvestmentCSVWriter
+from filing_handle import FilingHandle, extract_from_filing, read_output_rows
+from parser_registry import get_spec, load_extractor_class
 from bdc_config import BDC_UNIVERSE
 
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 logger = logging.getLogger(__name__)
 
 
-def get_historical_filings(sec_client: SECAPIClient, ticker: str, form_type: str, years_back: int = 2) -> List[Dict[str, Any]]:
+class BackfillContext:
+    """
+    State shared by every filing of a backfill run.
+
+    Holds one SECAPIClient and caches CIKs, submissions and each
+    accession's document listing, so a ticker's 10-Q and 10-K passes and
+    concurrent filing workers don't repeat the same SEC requests.
+    """
+
+    def __init__(self, sec_client: Optional[SECAPIClient] = None):
+        self.sec_client = sec_client or SECAPIClient()
+        self._ciks: Dict[str, Optional[str]] = {}
+        self._submissions: Dict[str, Dict[str, Any]] = {}
+        self._documents: Dict[str, List[FilingDocument]] = {}
+        self._lock = threading.Lock()
+
+    def get_cik(self, ticker: str) -> Optional[str]:
+        ticker = ticker.upper()
+        if ticker not in self._ciks:
+            self._ciks[ticker] = self.sec_client.get_cik(ticker)
+        return self._ciks[ticker]
+
+    def get_submissions(self, cik: str) -> Dict[str, Any]:
+        """Submissions JSON for a CIK, fetched once per run."""
+        with self._lock:
+            if cik not in self._submissions:
+                self._submissions[cik] = self.sec_client.get_submissions(cik)
+            return self._submissions[cik]
+
+    def get_documents(self, accession: str, index_url: str) -> List[FilingDocument]:
+        """Document listing of a filing's index page, fetched once per accession."""
+        with self._lock:
+            documents = self._documents.get(accession)
+        if documents is None:
+            documents = self.sec_client.get_documents_from_index(index_url)
+            with self._lock:
+                self._documents[accession] = documents
+        return documents
+
+
+def get_historical_filings(context: BackfillContext, ticker: str, form_type: str, years_back: int = 2) -> List[Dict[str, Any]]:
     """Get historical filings of a specific type (10-Q or 10-K)."""
-    cik = sec_client.get_cik(ticker)
+    cik = context.get_cik(ticker)
     if not cik:
         logger.warning(f"Could not find CIK for {ticker}")
         return []
     
     try:
-        submissions_url = f"https://data.sec.gov/submissions/CIK{cik}.json"
-        response = requests.get(submissions_url, headers=sec_client.headers)
-        response.raise_for_status()
-        submissions = response.json()
+        submissions = context.get_submissions(cik)
         recent_filings = submissions['filings']['recent']
         
         # Set date range
@@ -87,93 +129,52 @@ def get_historical_filings(sec_client: SECAPIClient, ticker: str, form_type: str
 
 
 def get_parser_for_ticker(ticker: str):
-    """Get the parser module for a ticker."""
-    ticker_lower = ticker.lower()
-    parser_name = f"{ticker_lower}_parser"
-    
+    """Instantiate the extractor registered for a ticker (including *_custom_parser modules)."""
     try:
-        parser_module = importlib.import_module(parser_name)
-        # Look for extractor class (usually named like HTGCExtractor, PSECExtractor, etc.)
-        extractor_class = None
-        for attr_name in dir(parser_module):
-            if attr_name.endswith('Extractor') and not attr_name.startswith('_'):
-                extractor_class = getattr(parser_module, attr_name)
-                break
-        
-        if extractor_class:
-            return extractor_class()
-        else:
-            logger.warning(f"No extractor class found in {parser_name}")
-            return None
+        extractor_class = load_extractor_class(ticker)
+        if extractor_class is None and get_spec(ticker) is None:
+            # Unregistered parser file following the naming convention
+            extractor_class = load_extractor_class(ticker, f"{ticker.lower()}_parser")
     except ImportError as e:
-        logger.warning(f"Could not import {parser_name}: {e}")
+        logger.warning(f"Could not import parser for {ticker}: {e}")
+        return None
+
+    if extractor_class is None:
+        logger.warning(f"No extractor class found for {ticker}")
         return None
+    return extractor_class()
 
 
-def extract_holdings_from_filing(extractor, ticker: str, filing_info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-    """Extract holdings from a single filing."""
+def extract_holdings_from_filing(extractor, ticker: str, filing_info: Dict[str, Any],
+                                 context: Optional[BackfillContext] = None) -> Optional[Dict[str, Any]]:
+    """
+    Extract holdings from a single filing.
+
+    The extractor runs against this exact filing via extract_from_filing,
+    with its CSVs written to a scratch directory (so the latest-filing CSVs
+    in output/ are left alone) and read back as the filing's investments.
+    """
+    if context is None:
+        context = BackfillContext()
+    cik = context.get_cik(ticker)
+    if not cik:
+        logger.warning(f"Could not find CIK for {ticker}")
+        return None
+    handle = FilingHandle(
+        ticker=ticker.upper(),
+        cik=cik,
+        accession=filing_info['accession'],
+        form=filing_info['form'],
+        filing_date=filing_info['date'],
+        documents=context.get_documents(filing_info['accession'], filing_info['index_url']),
+    )
     try:
-        # Try to extract using the extractor's standard method
-        if hasattr(extractor, 'extract_from_url'):
-            # Some extractors take URL directly
-            result = extractor.extract_from_url(filing_info['index_url'], ticker, filing_info.get('accession'))
-        elif hasattr(extractor, 'extract_from_html_url'):
-            # Get the main HTML document URL - look for the main filing document
-            sec_client = SECAPIClient()
-            documents = sec_client.get_documents_from_index(filing_info['index_url'])
-            
-            # Find main HTML document (not exhibits/excluded files)
-            # Priority: 1) main filing (ticker-YYYYMMDD.htm), 2) any .htm that's not an exhibit
-            main_html = None
-            ticker_lower = ticker.lower()
-            
-            # First, try to find main filing document (pattern: ticker-YYYYMMDD.htm)
-            for doc in documents:
-                if doc.filename and doc.filename.lower().endswith('.htm'):
-                    fn_lower = doc.filename.lower()
-                    # Skip exhibits and excluded documents
-                    if 'ex-' in fn_lower or 'exx' in fn_lower or 'exhibit' in fn_lower:
-                        continue
-                    # Prefer documents that start with ticker
-                    if fn_lower.startswith(ticker_lower):
-                        main_html = doc
-                        break
-            
-            # If not found, get first .htm that's not an exhibit
-            if not main_html:
-                for doc in documents:
-                    if doc.filename and doc.filename.lower().endswith('.htm'):
-                        fn_lower = doc.filename.lower()
-                        if 'ex-' not in fn_lower and 'exx' not in fn_lower and 'exhibit' not in fn_lower:
-                            main_html = doc
-                            break
-            
-            if main_html:
-                cik = sec_client.get_cik(ticker)
-                logger.info(f"Using HTML document: {main_html.filename}")
-                result = extractor.extract_from_html_url(main_html.url, ticker, cik)
-            else:
-                logger.warning(f"No main HTML document found for {filing_info['index_url']}")
-                return None
-        elif hasattr(extractor, 'extract_from_ticker'):
-            # Some extractors fetch their own filing
-            # We need to modify them to use our specific filing
-            logger.warning(f"Extractor for {ticker} uses extract_from_ticker - may not work with specific filing")
-            return None
-        else:
-            logger.warning(f"Extractor for {ticker} doesn't have a recognized extraction method")
-            return None
-        
-        if result and isinstance(result, dict):
-            # Add filing metadata
-            result['filing_date'] = filing_info['date']
-            result['accession_number'] = filing_info['accession']
-            result['form_type'] = filing_info['form']
-            return result
-        else:
-            logger.warning(f"Extraction returned unexpected result type: {type(result)}")
-            return None
-            
+        with tempfile.TemporaryDirectory(prefix=f"{ticker.lower()}_{handle.accession}_") as scratch_dir:
+            result = extract_from_filing(extractor, handle, output_dir=scratch_dir)
+            if not result.get('investments'):
+                result['investments'] = read_output_rows(result['output_files'])
+        result.pop('output_files', None)
+        return result
     except Exception as e:
         logger.error(f"Error extracting holdings from {filing_info['index_url']}: {e}")
         logger.debug(traceback.format_exc())
@@ -225,9 +226,7 @@ def save_holdings_to_csv(ticker: str, holdings_data: Dict[str, Any], period: str
     fieldnames = list(investments_dicts[0].keys())
     
     # Write CSV
-    with open(csv_path, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
+    with InvestmentCSVWriter(csv_path, fieldnames=fieldnames) as writer:
         for inv in investments_dicts:
             # Convert None to empty string for CSV
             row = {k: (v if v is not None else '') for k, v in inv.items()}
@@ -282,13 +281,24 @@ def save_holdings_to_json(ticker: str, holdings_data: Dict[str, Any], period: st
     return json_path
 
 
-def process_ticker(ticker: str, name: str):
-    """Process a single ticker: fetch historical filings and extract holdings."""
+def process_ticker(ticker: str, name: str, context: Optional[BackfillContext] = None,
+                   years_back: int = 2, workers: int = 1):
+    """
+    Process a single ticker: fetch historical filings and extract holdings.
+    
+    Args:
+        ticker: Ticker symbol
+        name: Company name
+        context: Shared client and caches (default: a new one)
+        years_back: Years to look back for filings
+        workers: Number of filings extracted concurrently
+    """
     logger.info(f"\n{'='*60}")
     logger.info(f"Processing {ticker} ({name})")
     logger.info(f"{'='*60}")
     
-    sec_client = SECAPIClient()
+    if context is None:
+        context = BackfillContext()
     extractor = get_parser_for_ticker(ticker)
     
     if not extractor:
@@ -297,12 +307,12 @@ def process_ticker(ticker: str, name: str):
     
     # Fetch last 4 quarters (10-Q)
     logger.info(f"\nFetching 10-Q filings for {ticker}...")
-    quarterly_filings = get_historical_filings(sec_client, ticker, "10-Q", years_back=2)
+    quarterly_filings = get_historical_filings(context, ticker, "10-Q", years_back=years_back)
     quarterly_filings = quarterly_filings[:4]  # Limit to last 4 quarters
     
     # Fetch last 2 annual filings (10-K)
     logger.info(f"\nFetching 10-K filings for {ticker}...")
-    annual_filings = get_historical_filings(sec_client, ticker, "10-K", years_back=2)
+    annual_filings = get_historical_filings(context, ticker, "10-K", years_back=years_back)
     annual_filings = annual_filings[:2]  # Limit to last 2 annual
     
     all_filings = quarterly_filings + annual_filings
@@ -313,26 +323,42 @@ def process_ticker(ticker: str, name: str):
     
     logger.info(f"Found {len(all_filings)} total filings ({len(quarterly_filings)} 10-Q, {len(annual_filings)} 10-K)")
     
-    # Extract holdings from each filing
-    extracted_count = 0
-    for filing_info in all_filings:
-        logger.info(f"\nExtracting from {filing_info['form']} filed {filing_info['date']}...")
-        
-        holdings_data = extract_holdings_from_filing(extractor, ticker, filing_info)
+    # Parsers keep per-filing state, so concurrent workers never share an
+    # extractor; idle ones are reused, so at most `workers` are built
+    idle_extractors = queue.SimpleQueue()
+    idle_extractors.put(extractor)
+    
+    def extract_one(filing_info: Dict[str, Any]) -> bool:
+        try:
+            worker_extractor = idle_extractors.get_nowait()
+        except queue.Empty:
+            worker_extractor = get_parser_for_ticker(ticker)
+        try:
+            logger.info(f"\nExtracting from {filing_info['form']} filed {filing_info['date']}...")
+            holdings_data = extract_holdings_from_filing(worker_extractor, ticker, filing_info, context)
+        finally:
+            idle_extractors.put(worker_extractor)
         
-        if holdings_data:
-            # Use filing date as period identifier (or try to extract period end date)
-            period = filing_info['date']
-            
-            # Save to CSV
-            csv_path = save_holdings_to_csv(ticker, holdings_data, period, filing_info['form'])
-            
-            # Save to JSON
-            json_path = save_holdings_to_json(ticker, holdings_data, period)
-            
-            extracted_count += 1
-        else:
+        if not holdings_data:
             logger.warning(f"Failed to extract holdings from {filing_info['form']} {filing_info['date']}")
+            return False
+        
+        # Use filing date as period identifier (or try to extract period end date)
+        period = filing_info['date']
+        
+        # Save to CSV
+        save_holdings_to_csv(ticker, holdings_data, period, filing_info['form'])
+        
+        # Save to JSON
+        save_holdings_to_json(ticker, holdings_data, period)
+        return True
+    
+    if workers > 1 and len(all_filings) > 1:
+        with ThreadPoolExecutor(max_workers=min(workers, len(all_filings))) as executor:
+            outcomes = list(executor.map(extract_one, all_filings))
+    else:
+        outcomes = [extract_one(filing_info) for filing_info in all_filings]
+    extracted_count = sum(outcomes)
     
     logger.info(f"\n✅ Completed {ticker}: extracted {extracted_count}/{len(all_filings)} filings")
 
@@ -344,9 +370,22 @@ def main():
     parser = argparse.ArgumentParser(description='Fetch historical 10-Q and 10-K filings and extract holdings')
     parser.add_argument('--ticker', type=str, help='Process specific ticker only')
     parser.add_argument('--years-back', type=int, default=2, help='Years to look back for filings (default: 2)')
+    parser.add_argument('--mirror', nargs='?', const='', metavar='DIR',
+                        help='Read SEC files from a local EDGAR mirror (see scripts/sync_edgar_mirror.py)')
+    parser.add_argument('--offline', action='store_true',
+                        help='Only use the local EDGAR mirror, never the network')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='Filings of a ticker extracted concurrently (default: 4)')
+    parser.add_argument('--max-rps', type=float, default=8.0,
+                        help='Maximum SEC requests per second across all workers (SEC allows 10; default: 8)')
     
     args = parser.parse_args()
     
+    throttle_sec_requests(args.max_rps)
+    if args.mirror is not None or args.offline:
+        enable_mirror(args.mirror or None, MODE_OFFLINE if args.offline else MODE_FALLBACK)
+    context = BackfillContext()
+    
     # Convert BDC_UNIVERSE list to dict for easier lookup
     bdc_dict = {bdc['ticker'].upper(): bdc['name'] for bdc in BDC_UNIVERSE if 'ticker' in bdc and 'name' in bdc}
     
@@ -355,7 +394,7 @@ def main():
         ticker_upper = args.ticker.upper()
         if ticker_upper in bdc_dict:
             name = bdc_dict[ticker_upper]
-            process_ticker(ticker_upper, name)
+            process_ticker(ticker_upper, name, context, args.years_back, args.workers)
         else:
             logger.error(f"Ticker {args.ticker} not found in BDC_UNIVERSE")
             return 1
@@ -364,7 +403,7 @@ def main():
         logger.info(f"Processing all {len(bdc_dict)} BDCs...")
         for ticker, name in bdc_dict.items():
             try:
-                process_ticker(ticker, name)
+                process_ticker(ticker, name, context, args.years_back, args.workers)
             except Exception as e:
                 logger.error(f"Error processing {ticker}: {e}")
                 logger.debug(traceback.format_exc())
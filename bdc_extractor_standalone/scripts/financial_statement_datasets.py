@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""
+Bulk financials from the SEC Financial Statement (and Notes) data sets.
+
+The SEC publishes every quarter's XBRL financial data as one ZIP
+(https://www.sec.gov/dera/data/financial-statement-data-sets, or the
+"Financial Statement and Notes" ZIPs) with tab-separated sub/num/pre
+tables. This script loads downloaded ZIPs into an indexed SQLite store and
+answers income statement, balance sheet and cash flow queries from it, so
+financials for every BDC and period come from one bulk load instead of
+downloading and parsing each filing's XBRL instance.
+
+Query results have the same shape as extract_financials_edgar.extract_financials_simple.
+
+Usage:
+    python scripts/financial_statement_datasets.py load ~/Downloads/2024q*.zip
+    python scripts/financial_statement_datasets.py load 2024q3_notes.zip --ticker ARCC --ticker MAIN
+    python scripts/financial_statement_datasets.py query --ticker ARCC --period 2024-09-30
+    python scripts/generate_all_data.py --financials --financials-store output/financial_statements.sqlite
+"""
+
+import os
+import io
+import sys
+import csv
+import json
+import sqlite3
+import zipfile
+import argparse
+import logging
+import threading
+from datetime import datetime, timezone, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_PATH = os.path.join(ROOT, 'output', 'financial_statements.sqlite')
+
+# pre.txt statement codes -> keys of the financials dict
+STATEMENTS = {
+    'IS': ('income_statement', 'full_income_statement'),
+    'BS': ('balance_sheet', 'full_balance_sheet'),
+    'CF': ('cash_flow_statement', 'full_cash_flow_statement'),
+}
+
+# Filings within this many days of the requested period can stand in for it
+PERIOD_TOLERANCE_DAYS = 120
+
+BATCH_SIZE = 50000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS datasets (
+    name TEXT PRIMARY KEY, loaded_at TEXT, filings INTEGER, facts INTEGER
+);
+CREATE TABLE IF NOT EXISTS tickers (
+    ticker TEXT PRIMARY KEY, cik INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sub (
+    adsh TEXT PRIMARY KEY, cik INTEGER NOT NULL, name TEXT, form TEXT,
+    period TEXT, fy TEXT, fp TEXT, filed TEXT, dataset TEXT
+);
+CREATE INDEX IF NOT EXISTS sub_cik_period ON sub (cik, period);
+CREATE TABLE IF NOT EXISTS num (
+    adsh TEXT NOT NULL, tag TEXT NOT NULL, version TEXT NOT NULL, ddate TEXT NOT NULL,
+    qtrs INTEGER NOT NULL, uom TEXT NOT NULL, value REAL,
+    PRIMARY KEY (adsh, tag, version, ddate, qtrs, uom)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS pre (
+    adsh TEXT NOT NULL, report INTEGER NOT NULL, line INTEGER NOT NULL, stmt TEXT,
+    tag TEXT, version TEXT, plabel TEXT, negating INTEGER,
+    PRIMARY KEY (adsh, report, line)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS pre_adsh_stmt ON pre (adsh, stmt);
+"""
+
+
+def _iso(yyyymmdd: str) -> Optional[str]:
+    """20240930 (or 20240930.0) -> 2024-09-30."""
+    digits = (yyyymmdd or '').split('.')[0]
+    if len(digits) != 8 or not digits.isdigit():
+        return None
+    return f"{digits[:4]}-{digits[4:6]}-{digits[6:]}"
+
+
+def _concept(tag: str, version: str) -> str:
+    """XBRL concept name as edgartools reports it (us-gaap_NetAssets); custom tags keep the bare name."""
+    if '/' in (version or ''):
+        return f"{version.split('/')[0]}_{tag}"
+    return tag
+
+
+def _duration_preference(stmt: str, form: str, fp: str) -> List[int]:
+    """Fact durations (num.qtrs) to use for a statement, most preferred first."""
+    if stmt == 'BS':
+        return [0]
+    if (form or '').startswith('10-K') or fp == 'FY':
+        return [4]
+    ytd = {'Q1': 1, 'Q2': 2, 'Q3': 3}.get(fp or '', 1)
+    # Income statements are compared quarter to quarter; cash flows are only reported year to date
+    return [1, ytd] if stmt == 'IS' else [ytd, 1]
+
+
+def _read_table(zf: zipfile.ZipFile, name: str) -> Iterable[Dict[str, str]]:
+    """Rows of a tab-separated table inside a data set ZIP."""
+    member = next((n for n in zf.namelist() if os.path.basename(n).lower() == name), None)
+    if member is None:
+        raise ValueError(f"{name} not found in {zf.filename}")
+    with zf.open(member) as raw:
+        text = io.TextIOWrapper(raw, encoding='utf-8', errors='replace', newline='')
+        yield from csv.DictReader(text, delimiter='\t', quoting=csv.QUOTE_NONE)
+
+
+class FinancialStatementStore:
+    """SQLite store of SEC Financial Statement data set tables, indexed by filer and period."""
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        """
+        Open (or create) a store.
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self):
+        self._conn.close()
+
+    def set_tickers(self, tickers: Dict[str, int]):
+        """Record ticker -> CIK so queries can be made by ticker without network lookups."""
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO tickers (ticker, cik) VALUES (?, ?)",
+                                   [(t.upper(), int(c)) for t, c in tickers.items()])
+
+    def cik_for(self, ticker: str) -> Optional[int]:
+        with self._lock:
+            row = self._conn.execute("SELECT cik FROM tickers WHERE ticker = ?", (ticker.upper(),)).fetchone()
+        return row['cik'] if row else None
+
+    def is_loaded(self, zip_path: str) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM datasets WHERE name = ?",
+                                     (os.path.basename(zip_path),)).fetchone()
+        return row is not None
+
+    def load_zip(self, zip_path: str, ciks: Optional[Set[int]] = None) -> Dict[str, int]:
+        """
+        Load one quarterly data set ZIP.
+
+        Only consolidated, non-dimensional facts are kept (no coregistrant or
+        segment members), which is what the statements themselves show.
+
+        Args:
+            zip_path: Financial Statement (or Financial Statement and Notes) data set ZIP
+            ciks: Only load filings of these CIKs (default: every filer)
+
+        Returns:
+            Counts of filings, facts and presentation lines loaded
+        """
+        dataset = os.path.basename(zip_path)
+        counts = {'filings': 0, 'facts': 0, 'lines': 0}
+        with zipfile.ZipFile(zip_path) as zf, self._lock, self._conn:
+            conn = self._conn
+            adshs = set()
+            subs = []
+            for row in _read_table(zf, 'sub.txt'):
+                cik = int(row['cik'])
+                if ciks is not None and cik not in ciks:
+                    continue
+                adshs.add(row['adsh'])
+                subs.append((row['adsh'], cik, row.get('name'), row.get('form'), _iso(row.get('period')),
+                             row.get('fy'), row.get('fp'), _iso(row.get('filed')), dataset))
+            conn.executemany("INSERT OR REPLACE INTO sub VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", subs)
+            counts['filings'] = len(subs)
+
+            batch = []
+            for row in _read_table(zf, 'num.txt'):
+                if row['adsh'] not in adshs or row.get('coreg') or row.get('segments') or not row.get('value'):
+                    continue
+                try:
+                    value = float(row['value'])
+                except ValueError:
+                    continue
+                batch.append((row['adsh'], row['tag'], row['version'], _iso(row['ddate']),
+                              int(row['qtrs']), row['uom'], value))
+                if len(batch) >= BATCH_SIZE:
+                    conn.executemany("INSERT OR REPLACE INTO num VALUES (?, ?, ?, ?, ?, ?, ?)", batch)
+                    counts['facts'] += len(batch)
+                    batch = []
+            conn.executemany("INSERT OR REPLACE INTO num VALUES (?, ?, ?, ?, ?, ?, ?)", batch)
+            counts['facts'] += len(batch)
+
+            lines = [(row['adsh'], int(row['report']), int(row['line']), row['stmt'], row['tag'],
+                      row['version'], row.get('plabel'), 1 if row.get('negating') == '1' else 0)
+                     for row in _read_table(zf, 'pre.txt')
+                     if row['adsh'] in adshs and row.get('stmt') in STATEMENTS]
+            conn.executemany("INSERT OR REPLACE INTO pre VALUES (?, ?, ?, ?, ?, ?, ?, ?)", lines)
+            counts['lines'] = len(lines)
+
+            conn.execute("INSERT OR REPLACE INTO datasets VALUES (?, ?, ?, ?)",
+                         (dataset, datetime.now().isoformat(), counts['filings'], counts['facts']))
+        logger.info(f"Loaded {dataset}: {counts['filings']} filings, {counts['facts']} facts, "
+                    f"{counts['lines']} statement lines")
+        return counts
+
+    def find_filing(self, cik: int, period: str, form_type: Optional[str] = None,
+                    accession_number: Optional[str] = None) -> Optional[sqlite3.Row]:
+        """
+        Filing that reports a period.
+
+        Args:
+            cik: Filer CIK
+            period: Period end or filing date (YYYY-MM-DD)
+            form_type: Preferred form ('10-Q' or '10-K')
+            accession_number: Exact filing, if known
+
+        Returns:
+            The sub row, or None
+        """
+        with self._lock:
+            if accession_number:
+                row = self._conn.execute("SELECT * FROM sub WHERE adsh = ?", (accession_number,)).fetchone()
+                if row:
+                    return row
+            rows = self._conn.execute("SELECT * FROM sub WHERE cik = ? AND form IN ('10-Q', '10-K', '10-Q/A', '10-K/A')",
+                                      (int(cik),)).fetchall()
+        try:
+            target = datetime.strptime(period, '%Y-%m-%d')
+        except ValueError:
+            return None
+
+        def score(row):
+            # Exact period end first, then nearest period end or filing date; originals over amendments
+            days = min(abs((datetime.strptime(d, '%Y-%m-%d') - target).days)
+                       for d in (row['period'], row['filed']) if d)
+            return (row['period'] != period, days, bool(form_type) and not row['form'].startswith(form_type),
+                    row['form'].endswith('/A'), -int((row['filed'] or '0').replace('-', '')))
+
+        candidates = [r for r in rows if r['period'] or r['filed']]
+        if not candidates:
+            return None
+        best = min(candidates, key=score)
+        if best['period'] != period and score(best)[1] > PERIOD_TOLERANCE_DAYS:
+            return None
+        return best
+
+    def statement(self, filing: sqlite3.Row, stmt: str) -> List[Dict[str, Any]]:
+        """
+        Line items of one statement of a filing, in presentation order.
+
+        Args:
+            filing: sub row from find_filing
+            stmt: 'IS', 'BS' or 'CF'
+
+        Returns:
+            List of {concept, label, value, qtrs, uom}
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                """SELECT p.tag, p.version, p.plabel, n.qtrs, n.uom, n.value
+                   FROM pre p JOIN num n ON n.adsh = p.adsh AND n.tag = p.tag AND n.version = p.version
+                   WHERE p.adsh = ? AND p.stmt = ? AND n.ddate = ?
+                   ORDER BY p.report, p.line""",
+                (filing['adsh'], stmt, filing['period'])).fetchall()
+
+        preference = _duration_preference(stmt, filing['form'], filing['fp'])
+        best: Dict[str, sqlite3.Row] = {}
+        order: List[str] = []
+        for row in rows:
+            if row['qtrs'] not in preference:
+                continue
+            concept = _concept(row['tag'], row['version'])
+            current = best.get(concept)
+            if current is None:
+                order.append(concept)
+                best[concept] = row
+            elif (preference.index(row['qtrs']), row['uom'] != 'USD') < \
+                    (preference.index(current['qtrs']), current['uom'] != 'USD'):
+                best[concept] = row
+        return [{'concept': c, 'label': best[c]['plabel'], 'value': best[c]['value'],
+                 'qtrs': best[c]['qtrs'], 'uom': best[c]['uom']} for c in order]
+
+    def financials(self, ticker: str, period: str, accession_number: Optional[str] = None,
+                   form_type: Optional[str] = None, cik: Optional[int] = None) -> Optional[Dict]:
+        """
+        Financials for a ticker and period, shaped like extract_financials_simple's result.
+
+        Args:
+            ticker: Ticker symbol (resolved through the tickers table unless cik is given)
+            period: Period (YYYY-MM-DD)
+            accession_number: Exact filing, if known
+            form_type: Preferred form ('10-Q' or '10-K')
+            cik: Filer CIK
+
+        Returns:
+            Financials dict, or None if the store has no matching filing
+        """
+        cik = cik or self.cik_for(ticker)
+        if not cik:
+            logger.warning(f"No CIK for {ticker} in {self.path}; load with --ticker {ticker}")
+            return None
+        filing = self.find_filing(cik, period, form_type, accession_number)
+        if filing is None:
+            return None
+
+        result = {
+            'ticker': ticker.upper(),
+            'name': filing['name'] or ticker,
+            'period': period,
+            'period_start': None,
+            'period_end': filing['period'],
+            'filing_date': filing['filed'],
+            'accession_number': filing['adsh'],
+            'form_type': filing['form'],
+            'income_statement': {},
+            'gains_losses': {},
+            'balance_sheet': {},
+            'cash_flow_statement': {},
+            'shares': {},
+            'leverage': {},
+            'derived': {},
+            'full_income_statement': {},
+            'full_cash_flow_statement': {},
+            'full_balance_sheet': {},
+            'source': 'sec_financial_statement_data_sets',
+            'generated_at': datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
+        }
+        income_durations = []
+        for stmt, (key, full_key) in STATEMENTS.items():
+            for item in self.statement(filing, stmt):
+                result[key][item['concept']] = item['value']
+                result[full_key][item['concept']] = {
+                    'label': item['label'],
+                    'concept': item['concept'],
+                    'value': item['value'],
+                    'period': period
+                }
+                if stmt == 'IS':
+                    income_durations.append(item['qtrs'])
+        if income_durations and filing['period']:
+            qtrs = max(set(income_durations), key=income_durations.count)
+            result['period_start'] = _months_before(datetime.strptime(filing['period'], '%Y-%m-%d'), 3 * qtrs)
+        return result
+
+
+def _months_before(end: datetime, months: int) -> str:
+    """First day after the month-end that is `months` before end (start of a reporting period)."""
+    year, month = end.year, end.month - months
+    while month <= 0:
+        month += 12
+        year -= 1
+    return (datetime(year, month, 1) + timedelta(days=32)).replace(day=1).strftime('%Y-%m-%d')
+
+
+def resolve_ciks(tickers: List[str]) -> Dict[str, int]:
+    """Ticker -> CIK via the SEC company tickers file (served from the EDGAR mirror if configured)."""
+    from sec_api_client import SECAPIClient
+    client = SECAPIClient()
+    resolved = {}
+    for ticker in tickers:
+        cik = client.get_cik(ticker)
+        if cik:
+            resolved[ticker.upper()] = int(cik)
+        else:
+            logger.warning(f"Could not find CIK for {ticker}")
+    return resolved
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load SEC Financial Statement data sets and query financials')
+    parser.add_argument('--store', default=DEFAULT_STORE_PATH, help=f'SQLite store (default: {DEFAULT_STORE_PATH})')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    load = sub.add_parser('load', help='Load quarterly data set ZIPs from disk')
+    load.add_argument('zips', nargs='+', help='Data set ZIPs (e.g. 2024q3.zip or 2024q3_notes.zip)')
+    load.add_argument('--ticker', action='append',
+                      help='Only load these filers (can be used multiple times; default: all registered parsers)')
+    load.add_argument('--all-companies', action='store_true', help='Load every filer in the data sets')
+    load.add_argument('--force', action='store_true', help='Reload ZIPs that were already loaded')
+
+    query = sub.add_parser('query', help='Print financials for a ticker and period as JSON')
+    query.add_argument('--ticker', required=True)
+    query.add_argument('--period', required=True, help='Period (YYYY-MM-DD)')
+    query.add_argument('--form', help='Preferred form type (10-Q or 10-K)')
+    query.add_argument('--accession', help='Exact accession number')
+
+    args = parser.parse_args()
+    store = FinancialStatementStore(args.store)
+
+    if args.command == 'load':
+        ciks = None
+        if not args.all_companies:
+            if args.ticker:
+                tickers = args.ticker
+            else:
+                from parser_registry import list_tickers
+                tickers = list_tickers()
+            ticker_ciks = resolve_ciks(tickers)
+            store.set_tickers(ticker_ciks)
+            ciks = set(ticker_ciks.values())
+        for zip_path in args.zips:
+            if not args.force and store.is_loaded(zip_path):
+                logger.info(f"Skipping {os.path.basename(zip_path)} (already loaded; use --force to reload)")
+                continue
+            try:
+                store.load_zip(zip_path, ciks)
+            except (OSError, ValueError, zipfile.BadZipFile) as e:
+                logger.error(f"Could not load {zip_path}: {e}")
+        return 0
+
+    financials = store.financials(args.ticker, args.period, args.accession, args.form)
+    if not financials:
+        logger.error(f"No filing for {args.ticker} near {args.period} in {args.store}")
+        return 1
+    print(json.dumps(financials, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -107,8 +107,12 @@ def ensure_ticker_dir(ticker: str) -> str:
     return d
 
 
-def process_ticker(ticker: str, name: str, extract_financials: bool = False):
-    """Process a single ticker: generate investments JSON from CSV files."""
+def process_ticker(ticker: str, name: str, extract_financials: bool = False, financials_store=None):
+    """Process a single ticker: generate investments JSON from CSV files.
+
+    With a financials_store (FinancialStatementStore), financials are read
+    from the bulk-loaded SEC data sets instead of fetched per filing.
+    """
     print(f"\nProcessing {ticker} ({name})...")
     
     csv_files = find_csv_files(ticker)
@@ -167,18 +171,26 @@ def process_ticker(ticker: str, name: str, extract_financials: bool = False):
             # Extract financials if requested
             if extract_financials:
                 try:
-                    from scripts.extract_financials_edgar import extract_financials_simple
                     # Get form_type from investment data
                     form_type = data.get('form_type')
                     accession_number = data.get('accession_number')
                     
                     print(f"  Extracting financials for {period} (form_type: {form_type})...")
-                    financials = extract_financials_simple(
-                        ticker, 
-                        period, 
-                        accession_number=accession_number,
-                        form_type=form_type
-                    )
+                    if financials_store is not None:
+                        financials = financials_store.financials(
+                            ticker,
+                            period,
+                            accession_number=accession_number,
+                            form_type=form_type
+                        )
+                    else:
+                        from scripts.extract_financials_edgar import extract_financials_simple
+                        financials = extract_financials_simple(
+                            ticker, 
+                            period, 
+                            accession_number=accession_number,
+                            form_type=form_type
+                        )
                     
                     if financials:
                         # Save JSON
@@ -243,8 +255,13 @@ def build_index(entries: List[Dict]):
     print(f"\n✅ Generated index.json with {len(entries)} BDCs")
 
 
-def main(tickers: List[str] = None, extract_financials: bool = False):
+def main(tickers: List[str] = None, extract_financials: bool = False, financials_store_path: str = None):
     """Main entry point."""
+    financials_store = None
+    if financials_store_path:
+        from scripts.financial_statement_datasets import FinancialStatementStore
+        financials_store = FinancialStatementStore(financials_store_path)
+    
     print("=" * 60)
     print("Generating All BDC Data")
     print("=" * 60)
@@ -257,7 +274,7 @@ def main(tickers: List[str] = None, extract_financials: bool = False):
         name = bdc['name']
         
         try:
-            entry = process_ticker(ticker, name, extract_financials)
+            entry = process_ticker(ticker, name, extract_financials, financials_store)
             if entry:
                 entries.append(entry)
         except Exception as e:
@@ -274,7 +291,10 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Generate all data files for BDCs')
     parser.add_argument('--ticker', action='append', help='Process specific ticker(s)')
     parser.add_argument('--financials', action='store_true', help='Also extract financials (requires SEC API)')
+    parser.add_argument('--financials-store', metavar='PATH',
+                        help='Read financials from a store built by scripts/financial_statement_datasets.py instead of the SEC API')
     args = parser.parse_args()
     
-    main(tickers=args.ticker, extract_financials=args.financials)
+    main(tickers=args.ticker, extract_financials=args.financials or bool(args.financials_store),
+         financials_store_path=args.financials_store)
 
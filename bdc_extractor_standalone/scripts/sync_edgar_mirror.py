@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Sync a local EDGAR mirror for offline and bulk runs.
+
+Downloads, for each ticker, the submissions JSON and every filing of the
+requested forms in the date range (index page, full submission .txt and
+the documents listed in the index) into the mirror layout read by
+edgar_mirror.EdgarMirror. Archive files already in the mirror are never
+downloaded again; company_tickers.json and submissions are refreshed on
+every sync since they change as companies file.
+
+Usage:
+    python scripts/sync_edgar_mirror.py --ticker ARCC --years-back 5
+    python scripts/sync_edgar_mirror.py --forms 10-Q 10-K 8-K --mirror-dir /data/sec_mirror
+    BDC_EDGAR_MIRROR=/data/sec_mirror BDC_EDGAR_MIRROR_MODE=offline python run_all_parsers.py
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import requests
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from edgar_mirror import EdgarMirror, DEFAULT_MIRROR_DIR, MIRROR_ENV_VAR
+from parser_registry import list_tickers
+from sec_api_client import SECAPIClient, RateLimiter
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+COMPANY_TICKERS_URL = "https://www.sec.gov/files/company_tickers.json"
+DEFAULT_USER_AGENT = "BDC-Extractor/1.0 contact@example.com"
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class MirrorSync:
+    """Downloads SEC files into an EdgarMirror, skipping archive files it already has."""
+
+    def __init__(self, mirror: EdgarMirror, user_agent: str, max_per_second: float = 8.0, retries: int = 3):
+        self.mirror = mirror
+        self.headers = {'User-Agent': user_agent}
+        self.limiter = RateLimiter(max_per_second)
+        self.retries = retries
+        self.session = requests.Session()
+        self.counts: Counter = Counter()
+
+    def sync_url(self, url: str, refresh: bool = False) -> bool:
+        """
+        Make sure one URL is in the mirror.
+
+        Args:
+            url: SEC URL to mirror
+            refresh: Download even if the mirror already has it
+
+        Returns:
+            True if the file is in the mirror afterwards
+        """
+        if not refresh and self.mirror.has(url):
+            self.counts['cached'] += 1
+            return True
+        for attempt in range(self.retries):
+            self.limiter.wait()
+            try:
+                response = self.session.get(url, headers=self.headers, timeout=60)
+            except requests.RequestException as e:
+                logger.warning(f"Request failed for {url}: {e}")
+                time.sleep(2 ** attempt)
+                continue
+            if response.status_code in RETRY_STATUSES:
+                time.sleep(2 ** attempt)
+                continue
+            if response.status_code != 200:
+                logger.warning(f"HTTP {response.status_code} for {url}")
+                break
+            self.mirror.store(url, response.content)
+            self.counts['downloaded'] += 1
+            self.counts['bytes'] += len(response.content)
+            return True
+        self.counts['failed'] += 1
+        # A refresh that failed still leaves the previous copy usable
+        return self.mirror.has(url)
+
+    def read_json(self, url: str) -> Optional[Dict]:
+        path = self.mirror.path_for(url)
+        if not path or not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def list_filings(self, cik: str, forms: List[str], start_date: str) -> List[Dict[str, str]]:
+        """Refresh the submissions JSON (and older pages in range) and list matching filings."""
+        submissions_url = f"https://data.sec.gov/submissions/CIK{cik}.json"
+        if not self.sync_url(submissions_url, refresh=True):
+            return []
+        submissions = self.read_json(submissions_url) or {}
+        filings_data = submissions.get('filings', {})
+
+        pages = [filings_data.get('recent', {})]
+        for page in filings_data.get('files', []):
+            if page.get('filingTo', '') < start_date:
+                continue
+            page_url = f"https://data.sec.gov/submissions/{page['name']}"
+            if self.sync_url(page_url):
+                pages.append(self.read_json(page_url) or {})
+
+        filings = []
+        seen = set()
+        for page in pages:
+            for i, form in enumerate(page.get('form', [])):
+                accession = page['accessionNumber'][i]
+                if form not in forms or page['filingDate'][i] < start_date or accession in seen:
+                    continue
+                seen.add(accession)
+                filings.append({'form': form, 'date': page['filingDate'][i], 'accession': accession})
+        filings.sort(key=lambda f: f['date'], reverse=True)
+        return filings
+
+    def sync_filing(self, client: SECAPIClient, cik: str, accession: str, documents: bool = True):
+        """Mirror a filing's index page, full submission text and listed documents."""
+        folder = f"https://www.sec.gov/Archives/edgar/data/{int(cik)}/{accession.replace('-', '')}"
+        index_url = f"{folder}/{accession}-index.html"
+        if not self.sync_url(index_url):
+            return
+        self.sync_url(f"{folder}/{accession}.txt")
+        if documents:
+            # The client reads the index page back from the mirror
+            for doc in client.get_documents_from_index(index_url):
+                self.sync_url(doc.url)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sync a local EDGAR mirror for offline and bulk runs')
+    parser.add_argument('--mirror-dir', default=os.environ.get(MIRROR_ENV_VAR) or DEFAULT_MIRROR_DIR,
+                        help=f'Mirror root directory (default: ${MIRROR_ENV_VAR} or {DEFAULT_MIRROR_DIR})')
+    parser.add_argument('--ticker', action='append',
+                        help='Ticker(s) to sync (can be used multiple times; default: all registered parsers)')
+    parser.add_argument('--forms', nargs='+', default=['10-Q', '10-K'],
+                        help='Form types to mirror (default: 10-Q 10-K)')
+    parser.add_argument('--years-back', type=int, default=5, help='Years of filings to mirror (default: 5)')
+    parser.add_argument('--index-only', action='store_true',
+                        help='Only mirror index pages and full submission text, not individual documents')
+    parser.add_argument('--max-rps', type=float, default=8.0,
+                        help='Maximum requests per second (SEC fair access allows 10; default: 8)')
+    parser.add_argument('--user-agent', default=DEFAULT_USER_AGENT, help='User-Agent sent to the SEC')
+    args = parser.parse_args()
+
+    mirror = EdgarMirror(args.mirror_dir)
+    sync = MirrorSync(mirror, args.user_agent, max_per_second=args.max_rps)
+    start_date = (datetime.now() - timedelta(days=args.years_back * 365)).strftime('%Y-%m-%d')
+    tickers = [t.upper() for t in args.ticker] if args.ticker else list_tickers()
+
+    logger.info(f"Syncing {len(tickers)} ticker(s), forms {', '.join(args.forms)} since {start_date} into {mirror.root}")
+    started = time.perf_counter()
+
+    sync.sync_url(COMPANY_TICKERS_URL, refresh=True)
+    client = SECAPIClient(data_dir=os.path.join(mirror.root, '.client'), user_agent=args.user_agent, mirror=mirror)
+
+    failed_tickers = []
+    for n, ticker in enumerate(tickers, 1):
+        cik = client.get_cik(ticker)
+        if not cik:
+            logger.warning(f"[{n}/{len(tickers)}] {ticker}: CIK not found, skipping")
+            failed_tickers.append(ticker)
+            continue
+        filings = sync.list_filings(cik, args.forms, start_date)
+        logger.info(f"[{n}/{len(tickers)}] {ticker}: {len(filings)} filing(s)")
+        for filing in filings:
+            try:
+                sync.sync_filing(client, cik, filing['accession'], documents=not args.index_only)
+            except Exception as e:
+                logger.warning(f"{ticker} {filing['form']} {filing['accession']}: {e}")
+                sync.counts['failed'] += 1
+
+    elapsed = time.perf_counter() - started
+    counts = sync.counts
+    logger.info(f"Done in {elapsed:.0f}s: {counts['downloaded']} downloaded ({counts['bytes'] / 1e6:.1f} MB), "
+                f"{counts['cached']} already mirrored, {counts['failed']} failed")
+    if failed_tickers:
+        logger.info(f"No CIK for: {', '.join(failed_tickers)}")
+    return 1 if counts['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,531 @@
+#!/usr/bin/env python3
+"""
+Single-pass validation of all investment CSVs.
+
+Reads every *_investments.csv in the output directory once and feeds each
+row to a registry of checks (duplicates, type/industry swaps, HTML
+entities, numeric anomalies, field coverage and per-file status), instead
+of running check_duplicates.py, check_all_duplicates.py,
+check_investment_industry_consistency.py, calc_coverage.py and
+summarize_status.py separately.
+
+Writes a machine-readable JSON report (default: output/validation_report.json).
+
+Usage:
+    python scripts/validate_holdings.py
+    python scripts/validate_holdings.py --check duplicates --check coverage
+    python scripts/validate_holdings.py --report qa.json --fail-on-alert
+"""
+
+import os
+import sys
+import csv
+import json
+import glob
+import argparse
+from abc import ABC, abstractmethod
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.calc_coverage import DEFAULT_FIELDS
+from scripts.check_investment_industry_consistency import KNOWN_INDUSTRIES, KNOWN_INVESTMENT_TYPES
+
+# The repo-root output/ the parsers write their CSVs to
+DEFAULT_OUTPUT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'output')
+REPORT_FILENAME = 'validation_report.json'
+
+HTML_ENTITY_MARKERS = ('&#', '&amp;', '&lt;', '&gt;', '&nbsp;')
+REF_RATE_KEYWORDS = ('LIBOR', 'SOFR', 'PRIME', 'EURIBOR', 'FED FUNDS', 'CDOR', 'BASE RATE')
+INSTRUMENT_KEYWORDS = ('DEBT', 'LOAN', 'NOTE', 'EQUITY', 'WARRANT')
+AMOUNT_FIELDS = ('principal_amount', 'cost', 'fair_value')
+RATE_FIELDS = ('interest_rate', 'spread', 'floor_rate', 'pik_rate')
+
+# Number of offending rows kept per issue in the report
+MAX_EXAMPLES = 10
+
+CHECK_REGISTRY: Dict[str, type] = {}
+
+
+def register_check(cls):
+    """Class decorator adding a check to CHECK_REGISTRY under cls.name."""
+    CHECK_REGISTRY[cls.name] = cls
+    return cls
+
+
+def _to_float(value: Optional[str]) -> Optional[float]:
+    """Parse an amount or rate ('1,234', '$5', '7.5%'); None if blank or unparseable."""
+    if value is None:
+        return None
+    value = value.strip().replace(',', '').replace('$', '')
+    if value.endswith('%'):
+        value = value[:-1]
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def _example(row: Dict, **extra) -> Dict:
+    example = {
+        'company': row.get('company_name', ''),
+        'investment_type': row.get('investment_type', ''),
+        'industry': row.get('industry', ''),
+    }
+    example.update(extra)
+    return example
+
+
+class Check(ABC):
+    """
+    Base class for validation checks.
+
+    The engine calls start_file() before the first row of each CSV,
+    observe() for every row and finish_file() after the last one.
+    finish_file() returns the per-file result; summarize() returns the
+    universe-wide result from everything seen.
+    """
+
+    name = ''
+
+    def start_file(self, ticker: str, fieldnames: List[str]):
+        pass
+
+    @abstractmethod
+    def observe(self, row: Dict):
+        """Feed one CSV row to the check."""
+
+    def finish_file(self) -> Dict:
+        return {}
+
+    def summarize(self) -> Dict:
+        return {}
+
+    def alerts(self, file_result: Dict) -> List[str]:
+        """Issues in a per-file result severe enough to fail QA."""
+        return []
+
+
+def _duplicate_rows(counter: Counter) -> int:
+    """Rows belonging to a key that occurs more than once (pandas keep=False)."""
+    return sum(count for count in counter.values() if count > 1)
+
+
+@register_check
+class DuplicatesCheck(Check):
+    """Exact duplicates and duplicates by company/type plus amounts or dates."""
+
+    name = 'duplicates'
+    KEYS = {
+        'by_principal': ('principal_amount',),
+        'by_fair_value': ('fair_value',),
+        'by_dates': ('acquisition_date', 'maturity_date'),
+        'by_financials': AMOUNT_FIELDS,
+    }
+
+    def __init__(self):
+        self.files_with = Counter()
+
+    def start_file(self, ticker: str, fieldnames: List[str]):
+        self.fieldnames = fieldnames
+        self.exact = Counter()
+        self.keyed = {key: Counter() for key in self.KEYS}
+        self.tranches = Counter()
+
+    def observe(self, row: Dict):
+        self.exact[tuple(row.get(f) or '' for f in self.fieldnames)] += 1
+        base = (row.get('company_name') or '', row.get('investment_type') or '')
+        for key, cols in self.KEYS.items():
+            values = tuple(row.get(c) or '' for c in cols)
+            # Amount-keyed checks ignore rows without that amount
+            if key in ('by_principal', 'by_fair_value') and not values[0]:
+                continue
+            self.keyed[key][base + values] += 1
+        if row.get('principal_amount') or row.get('fair_value'):
+            self.tranches[base] += 1
+
+    def finish_file(self) -> Dict:
+        result = {'exact': _duplicate_rows(self.exact)}
+        for key in self.KEYS:
+            result[key] = _duplicate_rows(self.keyed[key])
+        result['multi_tranche_companies'] = sum(1 for count in self.tranches.values() if count > 1)
+        for key, value in result.items():
+            if value and key != 'multi_tranche_companies':
+                self.files_with[key] += 1
+        return result
+
+    def summarize(self) -> Dict:
+        return {'files_with': dict(self.files_with)}
+
+    def alerts(self, file_result: Dict) -> List[str]:
+        alerts = []
+        if file_result.get('exact'):
+            alerts.append(f"{file_result['exact']} exact duplicate rows")
+        if file_result.get('by_financials'):
+            alerts.append(f"{file_result['by_financials']} rows duplicate company + type + all financial values")
+        return alerts
+
+
+@register_check
+class TypeIndustryCheck(Check):
+    """Investment types and industries swapped, numeric or holding a reference rate."""
+
+    name = 'type_industry'
+    ISSUES = ('industry_as_investment_type', 'investment_type_as_industry',
+              'numeric_investment_types', 'reference_rate_as_investment_type')
+
+    def __init__(self):
+        self.totals = Counter()
+        self.investment_types = Counter()
+        self.industries = Counter()
+
+    def start_file(self, ticker: str, fieldnames: List[str]):
+        self.issues = {issue: [] for issue in self.ISSUES}
+        self.counts = Counter()
+        self.file_types = set()
+        self.file_industries = set()
+
+    def _flag(self, issue: str, row: Dict):
+        self.counts[issue] += 1
+        if len(self.issues[issue]) < MAX_EXAMPLES:
+            self.issues[issue].append(_example(row))
+
+    def observe(self, row: Dict):
+        inv_type = (row.get('investment_type') or '').strip()
+        industry = (row.get('industry') or '').strip()
+        if inv_type:
+            self.file_types.add(inv_type)
+            self.investment_types[inv_type] += 1
+            if inv_type in KNOWN_INDUSTRIES:
+                self._flag('industry_as_investment_type', row)
+            if inv_type.isdigit():
+                self._flag('numeric_investment_types', row)
+            upper = inv_type.upper()
+            if (any(k in upper for k in REF_RATE_KEYWORDS)
+                    and not any(k in upper for k in INSTRUMENT_KEYWORDS)):
+                self._flag('reference_rate_as_investment_type', row)
+        if industry:
+            self.file_industries.add(industry)
+            self.industries[industry] += 1
+            if industry in KNOWN_INVESTMENT_TYPES:
+                self._flag('investment_type_as_industry', row)
+
+    def finish_file(self) -> Dict:
+        self.totals.update(self.counts)
+        return {
+            'investment_type_count': len(self.file_types),
+            'industry_count': len(self.file_industries),
+            'counts': dict(self.counts),
+            'examples': {k: v for k, v in self.issues.items() if v},
+        }
+
+    def summarize(self) -> Dict:
+        return {
+            'counts': dict(self.totals),
+            'top_investment_types': self.investment_types.most_common(20),
+            'top_industries': self.industries.most_common(20),
+        }
+
+
+@register_check
+class HTMLEntitiesCheck(Check):
+    """Unescaped HTML entities left in text fields."""
+
+    name = 'html_entities'
+    FIELDS = ('company_name', 'investment_type', 'industry', 'business_description')
+
+    def __init__(self):
+        self.total = 0
+
+    def start_file(self, ticker: str, fieldnames: List[str]):
+        self.count = 0
+        self.examples = []
+
+    def observe(self, row: Dict):
+        fields = [f for f in self.FIELDS if any(m in (row.get(f) or '') for m in HTML_ENTITY_MARKERS)]
+        if fields:
+            self.count += 1
+            if len(self.examples) < MAX_EXAMPLES:
+                self.examples.append(_example(row, fields=fields))
+
+    def finish_file(self) -> Dict:
+        self.total += self.count
+        return {'count': self.count, 'examples': self.examples}
+
+    def summarize(self) -> Dict:
+        return {'count': self.total}
+
+
+@register_check
+class NumericAnomaliesCheck(Check):
+    """Unparseable or negative amounts and implausible rates."""
+
+    name = 'numeric_anomalies'
+    MAX_RATE_PCT = 100.0
+    # Fair value above this multiple of cost is almost always a scaling error
+    MAX_FAIR_VALUE_TO_COST = 20.0
+
+    def __init__(self):
+        self.totals = Counter()
+
+    def start_file(self, ticker: str, fieldnames: List[str]):
+        self.counts = Counter()
+        self.examples = defaultdict(list)
+
+    def _flag(self, issue: str, row: Dict, field: str):
+        self.counts[issue] += 1
+        if len(self.examples[issue]) < MAX_EXAMPLES:
+            self.examples[issue].append(_example(row, field=field, value=row.get(field)))
+
+    def observe(self, row: Dict):
+        amounts = {}
+        for field in AMOUNT_FIELDS:
+            raw = (row.get(field) or '').strip()
+            if not raw:
+                continue
+            value = _to_float(raw)
+            if value is None:
+                self._flag('unparseable_amount', row, field)
+            elif value < 0 and field != 'fair_value':
+                self._flag('negative_amount', row, field)
+            amounts[field] = value
+        cost, fair_value = amounts.get('cost'), amounts.get('fair_value')
+        if cost and fair_value and cost > 0 and fair_value / cost > self.MAX_FAIR_VALUE_TO_COST:
+            self._flag('fair_value_outlier', row, 'fair_value')
+        for field in RATE_FIELDS:
+            raw = (row.get(field) or '').strip()
+            if not raw:
+                continue
+            value = _to_float(raw)
+            if value is None:
+                self._flag('unparseable_rate', row, field)
+            elif value < 0 or value > self.MAX_RATE_PCT:
+                self._flag('rate_out_of_range', row, field)
+
+    def finish_file(self) -> Dict:
+        self.totals.update(self.counts)
+        return {'counts': dict(self.counts), 'examples': dict(self.examples)}
+
+    def summarize(self) -> Dict:
+        return {'counts': dict(self.totals)}
+
+
+@register_check
+class CoverageCheck(Check):
+    """Share of rows with each field populated (as calc_coverage.py)."""
+
+    name = 'coverage'
+    FIELDS = tuple(DEFAULT_FIELDS) + ('company_name', 'industry', 'investment_type')
+
+    def __init__(self):
+        self.total_rows = 0
+        self.total_counts = Counter()
+
+    def start_file(self, ticker: str, fieldnames: List[str]):
+        self.rows = 0
+        self.counts = Counter()
+
+    def observe(self, row: Dict):
+        self.rows += 1
+        for field in self.FIELDS:
+            if (row.get(field) or '').strip():
+                self.counts[field] += 1
+
+    def _percentages(self, counts: Counter, rows: int) -> Dict[str, float]:
+        return {f: round(counts[f] / rows * 100, 1) if rows else 0.0 for f in self.FIELDS}
+
+    def finish_file(self) -> Dict:
+        self.total_rows += self.rows
+        self.total_counts.update(self.counts)
+        return self._percentages(self.counts, self.rows)
+
+    def summarize(self) -> Dict:
+        return self._percentages(self.total_counts, self.total_rows)
+
+
+@register_check
+class StatusCheck(Check):
+    """Per-file positions, totals, unknown types and date gaps (as summarize_status.py)."""
+
+    name = 'status'
+
+    def __init__(self):
+        self.needs_follow_up = []
+
+    def start_file(self, ticker: str, fieldnames: List[str]):
+        self.ticker = ticker
+        self.status = {
+            'positions': 0,
+            'total_principal': 0.0,
+            'total_cost': 0.0,
+            'total_fair_value': 0.0,
+            'unknown_positions': 0,
+            'missing_investment_type': 0,
+            'missing_acquisition_dates': 0,
+            'missing_maturity_dates': 0,
+        }
+        self.date_ranges = {'acquisition_date': [None, None], 'maturity_date': [None, None]}
+
+    def observe(self, row: Dict):
+        status = self.status
+        status['positions'] += 1
+        for field in AMOUNT_FIELDS:
+            value = _to_float(row.get(field))
+            if value is not None:
+                status[f"total_{field.replace('_amount', '')}"] += value
+        inv_type = (row.get('investment_type') or '').strip()
+        if not inv_type:
+            status['missing_investment_type'] += 1
+        elif inv_type.lower() == 'unknown':
+            status['unknown_positions'] += 1
+        for field, rng in self.date_ranges.items():
+            value = (row.get(field) or '').strip()
+            if not value:
+                status[f"missing_{field.replace('_date', '')}_dates"] += 1
+                continue
+            if rng[0] is None or value < rng[0]:
+                rng[0] = value
+            if rng[1] is None or value > rng[1]:
+                rng[1] = value
+
+    def finish_file(self) -> Dict:
+        result = dict(self.status)
+        for field, (start, end) in self.date_ranges.items():
+            prefix = field.replace('_date', '')
+            result[f'{prefix}_start'] = start
+            result[f'{prefix}_end'] = end
+        if (result['unknown_positions'] or result['missing_investment_type']
+                or result['missing_acquisition_dates'] or result['missing_maturity_dates']):
+            self.needs_follow_up.append(self.ticker)
+        return result
+
+    def summarize(self) -> Dict:
+        return {'needs_follow_up': sorted(set(self.needs_follow_up))}
+
+
+class ValidationEngine:
+    """Reads each investment CSV once and runs every selected check on it."""
+
+    def __init__(self, check_names: Optional[List[str]] = None):
+        names = check_names or list(CHECK_REGISTRY)
+        unknown = [n for n in names if n not in CHECK_REGISTRY]
+        if unknown:
+            raise ValueError(f"Unknown checks: {', '.join(unknown)} (available: {', '.join(CHECK_REGISTRY)})")
+        self.checks = [CHECK_REGISTRY[name]() for name in names]
+
+    def validate_file(self, csv_path: str) -> Dict:
+        """Run all checks over one CSV and return its per-check results."""
+        ticker = os.path.basename(csv_path).split('_')[0].upper()
+        rows = 0
+        with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.DictReader(f)
+            fieldnames = reader.fieldnames or []
+            for check in self.checks:
+                check.start_file(ticker, fieldnames)
+            for row in reader:
+                rows += 1
+                for check in self.checks:
+                    check.observe(row)
+        results = {check.name: check.finish_file() for check in self.checks}
+        alerts = [a for check in self.checks for a in check.alerts(results[check.name])]
+        return {'ticker': ticker, 'rows': rows, 'alerts': alerts, 'checks': results}
+
+    def run(self, csv_paths: List[str]) -> Dict:
+        """Validate every CSV and return the full report."""
+        files = {}
+        errors = {}
+        for csv_path in csv_paths:
+            name = os.path.basename(csv_path)
+            try:
+                files[name] = self.validate_file(csv_path)
+            except Exception as e:
+                errors[name] = str(e)
+        return {
+            'generated_at': datetime.now().isoformat(),
+            'file_count': len(files),
+            'row_count': sum(f['rows'] for f in files.values()),
+            'files_with_alerts': sorted(n for n, f in files.items() if f['alerts']),
+            'errors': errors,
+            'summary': {check.name: check.summarize() for check in self.checks},
+            'files': files,
+        }
+
+
+def print_report(report: Dict):
+    """Print a compact console view of a validation report."""
+    print("=" * 80)
+    print("HOLDINGS VALIDATION")
+    print("=" * 80)
+    print(f"Files: {report['file_count']}  Rows: {report['row_count']}")
+
+    for name, file_report in sorted(report['files'].items()):
+        if file_report['alerts']:
+            print(f"\n{name}:")
+            for alert in file_report['alerts']:
+                print(f"  [ALERT] {alert}")
+
+    for name, error in sorted(report['errors'].items()):
+        print(f"\n{name}:\n  [ERROR] {error}")
+
+    summary = report['summary']
+    if 'type_industry' in summary and summary['type_industry']['counts']:
+        print("\nType/industry issues:")
+        for issue, count in sorted(summary['type_industry']['counts'].items()):
+            print(f"  {issue}: {count}")
+    if 'html_entities' in summary:
+        print(f"\nRows with HTML entities: {summary['html_entities']['count']}")
+    if 'numeric_anomalies' in summary and summary['numeric_anomalies']['counts']:
+        print("\nNumeric anomalies:")
+        for issue, count in sorted(summary['numeric_anomalies']['counts'].items()):
+            print(f"  {issue}: {count}")
+    if 'coverage' in summary:
+        print("\nCoverage (all files):")
+        for field, pct in summary['coverage'].items():
+            print(f"  {field}: {pct:.1f}%")
+    if 'status' in summary and summary['status']['needs_follow_up']:
+        print(f"\nFiles needing follow-up: {', '.join(summary['status']['needs_follow_up'])}")
+    print("=" * 80)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Validate all investment CSVs in one pass')
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR,
+                        help='Directory containing *_investments.csv files')
+    parser.add_argument('--report', help=f'Report path (default: <output-dir>/{REPORT_FILENAME})')
+    parser.add_argument('--check', action='append', dest='checks', choices=sorted(CHECK_REGISTRY),
+                        help='Run only this check (can be repeated)')
+    parser.add_argument('--quiet', action='store_true', help='Only write the report')
+    parser.add_argument('--fail-on-alert', action='store_true',
+                        help='Exit with status 1 if any file has alerts')
+    args = parser.parse_args()
+
+    csv_paths = sorted(glob.glob(os.path.join(args.output_dir, '*_investments.csv')))
+    if not csv_paths:
+        print(f"No *_investments.csv files found in {args.output_dir}")
+        return 1
+
+    report = ValidationEngine(args.checks).run(csv_paths)
+
+    report_path = args.report or os.path.join(args.output_dir, REPORT_FILENAME)
+    tmp_path = f"{report_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, report_path)
+
+    if not args.quiet:
+        print_report(report)
+        print(f"Report written to {report_path}")
+
+    if args.fail_on_alert and report['files_with_alerts']:
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -7,8 +7,11 @@ from the EDGAR database. It supports various filing types, company lookups,
 and text extraction with proper rate limiting and error handling.
 """
 
+import io
 import os
+import time
 import logging
+import threading
 import requests
 from bs4 import BeautifulSoup
 from typing import Dict, Any, Optional, List, Union
@@ -16,10 +19,65 @@ from datetime import date, datetime, timedelta
 import re
 import json
 from dataclasses import dataclass
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlsplit
+from xml.etree import ElementTree
+
+from instrumentation import timed
+from edgar_mirror import EdgarMirror, SEC_HOSTS, install_from_env, installed_mirror
 
 logger = logging.getLogger(__name__)
 
+# company_tickers.json, shared by every client in the process (keyed by mirror root)
+_company_tickers_cache: Dict[Optional[str], Dict[str, Any]] = {}
+_company_tickers_lock = threading.Lock()
+
+
+class RateLimiter:
+    """Spaces calls to at most max_per_second, across threads."""
+
+    def __init__(self, max_per_second: float):
+        self.min_interval = 1.0 / max_per_second if max_per_second > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+_sec_rate_limiter: Optional[RateLimiter] = None
+
+
+def throttle_sec_requests(max_per_second: float = 8.0) -> RateLimiter:
+    """
+    Cap live requests to SEC hosts made through `requests`, across threads.
+
+    SEC fair access allows 10 requests per second. Parsers call requests.get
+    directly as well as through SECAPIClient, so the hook sits on
+    requests.Session.request; files served from the EDGAR mirror are not
+    throttled. Only the first call installs the hook.
+    """
+    global _sec_rate_limiter
+    if _sec_rate_limiter is not None:
+        return _sec_rate_limiter
+    limiter = RateLimiter(max_per_second)
+    original_request = requests.Session.request
+
+    def request(session, method, url, *args, **kwargs):
+        if urlsplit(url).netloc.lower() in SEC_HOSTS:
+            mirror = installed_mirror()
+            if mirror is None or not mirror.serves(url):
+                limiter.wait()
+        return original_request(session, method, url, *args, **kwargs)
+
+    requests.Session.request = request
+    _sec_rate_limiter = limiter
+    return limiter
+
 @dataclass
 class FilingDocument:
     """Represents a document within an SEC filing."""
@@ -66,7 +124,8 @@ class SECAPIClient:
     def __init__(self, 
                  data_dir: str = "data",
                  user_agent: str = None,
-                 rate_limit_delay: float = 0.1):
+                 rate_limit_delay: float = 0.1,
+                 mirror: Optional[EdgarMirror] = None):
         """
         Initialize the SEC API client.
         
@@ -74,6 +133,7 @@ class SECAPIClient:
             data_dir: Directory to store downloaded filings
             user_agent: Custom user agent string (required by SEC)
             rate_limit_delay: Delay between requests in seconds
+            mirror: Local EDGAR mirror to read from (default: BDC_EDGAR_MIRROR, if set)
         """
         self.data_dir = data_dir
         self.rate_limit_delay = rate_limit_delay
@@ -84,16 +144,36 @@ class SECAPIClient:
             user_agent = "SEC-API-Client/1.0 (your-email@domain.com)"
         self.headers = {'User-Agent': user_agent}
         
+        # Local EDGAR mirror; one configured in the environment also covers
+        # the requests parsers make without going through this client
+        self.mirror = mirror if mirror is not None else install_from_env()
+        
         # Load company data
         self._company_tickers = self._load_company_tickers()
 
+    def _get(self, url: str) -> requests.Response:
+        """GET an SEC URL, from the local mirror when one is configured."""
+        if self.mirror is not None:
+            return self.mirror.get(url, headers=self.headers)
+        return requests.get(url, headers=self.headers)
+
     def _load_company_tickers(self) -> Dict[str, Any]:
-        """Load the SEC's company ticker to CIK mapping."""
+        """Load the SEC's company ticker to CIK mapping (once per process)."""
+        cache_key = self.mirror.root if self.mirror is not None else None
+        with _company_tickers_lock:
+            if cache_key in _company_tickers_cache:
+                return _company_tickers_cache[cache_key]
+            ticker_map = self._fetch_company_tickers()
+            if ticker_map:
+                _company_tickers_cache[cache_key] = ticker_map
+            return ticker_map
+
+    def _fetch_company_tickers(self) -> Dict[str, Any]:
         url = "https://www.sec.gov/files/company_tickers.json"
         logger.info(f"Loading company tickers from {url}")
         
         try:
-            response = requests.get(url, headers=self.headers)
+            response = self._get(url)
             response.raise_for_status()
             company_data = response.json()
             
@@ -118,7 +198,7 @@ class SECAPIClient:
         
         try:
             logger.info(f"Attempting dynamic CIK lookup for {ticker}")
-            response = requests.get(search_url, headers=self.headers)
+            response = self._get(search_url)
             response.raise_for_status()
             
             # Try XML parsing first
@@ -222,7 +302,7 @@ class SECAPIClient:
 
         try:
             submissions_url = f"https://data.sec.gov/submissions/CIK{cik}.json"
-            response = requests.get(submissions_url, headers=self.headers)
+            response = self._get(submissions_url)
             response.raise_for_status()
             submissions = response.json()
 
@@ -291,6 +371,20 @@ class SECAPIClient:
             logger.error(f"Error fetching filing URL for {ticker}: {e}")
             return None
 
+    def get_submissions(self, cik: str) -> Dict[str, Any]:
+        """
+        Fetch a company's submissions JSON (filing history).
+        
+        Args:
+            cik: 10-digit CIK
+            
+        Returns:
+            Parsed submissions JSON
+        """
+        response = self._get(f"https://data.sec.gov/submissions/CIK{cik}.json")
+        response.raise_for_status()
+        return response.json()
+
     def get_latest_filing_date(self, ticker: str, filing_types: List[str], 
                               cik: Optional[str] = None) -> Optional[date]:
         """
@@ -311,7 +405,7 @@ class SECAPIClient:
 
         try:
             submissions_url = f"https://data.sec.gov/submissions/CIK{cik}.json"
-            response = requests.get(submissions_url, headers=self.headers)
+            response = self._get(submissions_url)
             response.raise_for_status()
             submissions = response.json()
 
@@ -338,6 +432,7 @@ class SECAPIClient:
             logger.error(f"Error fetching latest filing date for {ticker}: {e}")
             return None
 
+    @timed('sec.index')
     def get_documents_from_index(self, index_url: str) -> List[FilingDocument]:
         """
         Parse a filing's index page to get all document URLs and metadata.
@@ -353,7 +448,7 @@ class SECAPIClient:
             return []
             
         try:
-            response = requests.get(index_url, headers=self.headers)
+            response = self._get(index_url)
             response.raise_for_status()
             soup = BeautifulSoup(response.content, 'html.parser')
             
@@ -439,92 +534,115 @@ class SECAPIClient:
             logger.error(f"Could not parse document URLs from index {index_url}: {e}")
             return []
 
-    def _extract_xbrl_text(self, xml_soup) -> str:
-        """Extract meaningful text content from XBRL XML files with better structure preservation."""
-        if not xml_soup:
+    @timed('sec.xbrl_text')
+    def _extract_xbrl_text(self, xml_source) -> str:
+        """
+        Extract meaningful text content from an XBRL instance in a single streaming pass.
+
+        Only leaf facts are read, and elements are released as soon as they
+        are handled, so time is linear in the instance size and the element
+        tree is never held in memory.
+
+        Args:
+            xml_source: Instance document as bytes or str
+
+        Returns:
+            Cleaned text of the facts, with financial facts also grouped by category
+        """
+        if not xml_source:
             return ""
+        if isinstance(xml_source, str):
+            xml_source = xml_source.encode('utf-8')
 
         extracted_text = []
         structured_data = {}
-
-        # First pass: collect structured data by context
-        contexts = xml_soup.find_all(['context', 'xbrli:context'])
         context_map = {}
-        for context in contexts:
-            context_id = context.get('id', '')
-            if context_id:
-                # Extract entity and period information from context
-                entity_info = context.find(['entity', 'xbrli:entity'])
-                period_info = context.find(['period', 'xbrli:period'])
-                if entity_info and period_info:
-                    context_map[context_id] = {
-                        'entity': entity_info.get_text(strip=True),
-                        'period': period_info.get_text(strip=True)
-                    }
-
-        # Second pass: extract facts with context
-        for element in xml_soup.find_all():
-            # Skip schema elements and metadata
-            if element.name and element.name.startswith(('xs:', 'xsd:', 'link:', 'xbrli:', 'xbrldi:')):
-                continue
-
-            # Special handling for DEI (Document and Entity Information) elements
-            # These contain important security descriptions and identifiers
-            is_dei_element = element.name and element.name.startswith('dei:')
-            if is_dei_element:
-                # DEI elements often contain security descriptions with dividend rates
-                text_content = element.get_text(strip=True)
-                if text_content and len(text_content) > 5:  # DEI content is usually descriptive
-                    extracted_text.append(f"{element.name}: {text_content}")
+        # Financial facts are formatted once all contexts are known
+        pending = []
+        prefixes = {}
+        qnames = {}
+        root = None
+        depth = 0
+
+        for event, item in ElementTree.iterparse(io.BytesIO(xml_source), events=('start-ns', 'start', 'end')):
+            if event == 'start-ns':
+                prefix, uri = item
+                prefixes[uri] = prefix
                 continue
-
-            # Get text content
-            text_content = element.get_text(strip=True)
-            if not text_content or len(text_content) <= 1:
+            if event == 'start':
+                if root is None:
+                    root = item
+                depth += 1
                 continue
 
-            element_name = element.name or ""
-
-            # Get context reference
-            context_ref = element.get('contextRef', '')
-            unit_ref = element.get('unitRef', '')
-
-            # Format structured data
-            if any(keyword in element_name.lower() for keyword in [
-                'preferred', 'stock', 'series', 'dividend', 'rate', 'share',
-                'outstanding', 'par', 'value', 'cumulative', 'callable', 'redemption',
-                'depositary', 'perpetual', 'liquidation'
-            ]):
-                # Financial data - format with context
-                formatted = f"{element_name}"
-                if context_ref and context_ref in context_map:
-                    ctx = context_map[context_ref]
-                    formatted += f" [{ctx['period']}]"
-                if unit_ref:
-                    formatted += f" ({unit_ref})"
-                formatted += f": {text_content}"
-
-                # Group by category for better extraction
-                category = 'other'
-                if 'preferred' in element_name.lower() and 'share' in element_name.lower():
-                    category = 'preferred_shares'
-                elif 'dividend' in element_name.lower():
-                    category = 'dividends'
-                elif 'outstanding' in element_name.lower():
-                    category = 'outstanding'
-                elif 'rate' in element_name.lower():
-                    category = 'rates'
-
-                if category not in structured_data:
-                    structured_data[category] = []
-                structured_data[category].append(formatted)
-
-                extracted_text.append(formatted)
-
-            elif 'us-gaap:' in element_name or 'rily:' in element_name:
-                # XBRL taxonomy elements - include for context
-                formatted = f"{element_name}: {text_content}"
-                extracted_text.append(formatted)
+            depth -= 1
+            element = item
+            element_name = qnames.get(element.tag)
+            if element_name is None:
+                element_name = qnames[element.tag] = self._xbrl_qname(element.tag, prefixes)
+
+            if element_name in ('context', 'xbrli:context'):
+                context_id = element.get('id', '')
+                entity_info = period_info = None
+                for child in element:
+                    child_name = self._xbrl_qname(child.tag, prefixes)
+                    if child_name in ('entity', 'xbrli:entity'):
+                        entity_info = child
+                    elif child_name in ('period', 'xbrli:period'):
+                        period_info = child
+                if context_id and entity_info is not None and period_info is not None:
+                    context_map[context_id] = {
+                        'entity': ''.join(s.strip() for s in entity_info.itertext()),
+                        'period': ''.join(s.strip() for s in period_info.itertext())
+                    }
+            elif len(element) == 0 and not element_name.startswith(('xs:', 'xsd:', 'link:', 'xbrli:', 'xbrldi:')):
+                text_content = (element.text or '').strip()
+
+                if element_name.startswith('dei:'):
+                    # DEI elements often contain security descriptions with dividend rates
+                    if len(text_content) > 5:
+                        extracted_text.append(f"{element_name}: {text_content}")
+                elif len(text_content) > 1:
+                    name_lower = element_name.lower()
+                    if any(keyword in name_lower for keyword in [
+                        'preferred', 'stock', 'series', 'dividend', 'rate', 'share',
+                        'outstanding', 'par', 'value', 'cumulative', 'callable', 'redemption',
+                        'depositary', 'perpetual', 'liquidation'
+                    ]):
+                        # Placeholder, replaced once the fact's context period is known
+                        pending.append((len(extracted_text), element_name, element.get('contextRef', ''),
+                                        element.get('unitRef', ''), text_content))
+                        extracted_text.append(None)
+                    elif 'us-gaap:' in element_name or 'rily:' in element_name:
+                        # XBRL taxonomy elements - include for context
+                        extracted_text.append(f"{element_name}: {text_content}")
+
+            # Release handled subtrees as soon as their top-level element ends
+            if depth == 1 and root is not None:
+                root.clear()
+
+        for position, element_name, context_ref, unit_ref, text_content in pending:
+            # Financial data - format with context
+            formatted = f"{element_name}"
+            if context_ref and context_ref in context_map:
+                formatted += f" [{context_map[context_ref]['period']}]"
+            if unit_ref:
+                formatted += f" ({unit_ref})"
+            formatted += f": {text_content}"
+            extracted_text[position] = formatted
+
+            # Group by category for better extraction
+            name_lower = element_name.lower()
+            category = 'other'
+            if 'preferred' in name_lower and 'share' in name_lower:
+                category = 'preferred_shares'
+            elif 'dividend' in name_lower:
+                category = 'dividends'
+            elif 'outstanding' in name_lower:
+                category = 'outstanding'
+            elif 'rate' in name_lower:
+                category = 'rates'
+            structured_data.setdefault(category, []).append(formatted)
 
         # Add structured sections for better parsing
         for category, items in structured_data.items():
@@ -538,6 +656,16 @@ class SECAPIClient:
         # Clean the combined text
         return self.clean_text(combined_text)
 
+    @staticmethod
+    def _xbrl_qname(tag: str, prefixes: Dict[str, str]) -> str:
+        """'{uri}local' -> 'prefix:local' using the document's own prefixes ('local' for the default namespace)."""
+        if not tag.startswith('{'):
+            return tag
+        uri, local = tag[1:].split('}', 1)
+        prefix = prefixes.get(uri)
+        return f"{prefix}:{local}" if prefix else local
+
+    @timed('sec.clean_text')
     def clean_text(self, text: str) -> str:
         """Clean and normalize text content."""
         if not text:
@@ -566,6 +694,7 @@ class SECAPIClient:
 
         return text.strip()
 
+    @timed('sec.fetch_filing')
     def fetch_filing(self, ticker: str, filing_type: str = "10-K", 
                     cik: Optional[str] = None, save_to_file: bool = True) -> Optional[FilingResult]:
         """
@@ -596,7 +725,7 @@ class SECAPIClient:
             for doc in documents:
                 try:
                     logger.info(f"Fetching document: {doc.filename}")
-                    response = requests.get(doc.url, headers=self.headers)
+                    response = self._get(doc.url)
                     response.raise_for_status()
                     
                     # Add document separator
@@ -621,22 +750,18 @@ class SECAPIClient:
                     if is_xbrl_file:
                         # Process XBRL XML files - they contain valuable financial data
                         try:
-                            # Parse as XML and extract text content
                             if response.encoding is None:
                                 response.encoding = 'utf-8'
 
-                            xml_content = response.text
-                            # Parse XML and extract all text content
-                            xml_soup = BeautifulSoup(xml_content, 'xml')
-                            # Extract text from all elements, preserving structure
-                            xbrl_text = self._extract_xbrl_text(xml_soup)
+                            # Stream the instance's facts straight from the response bytes
+                            xbrl_text = self._extract_xbrl_text(response.content)
                             full_text += xbrl_text
 
                         except Exception as e:
                             logger.warning(f"Failed to process XBRL file {doc.filename}: {e}")
                             # Fallback: try to extract raw text
                             try:
-                                raw_text = self.clean_text(xml_content)
+                                raw_text = self.clean_text(response.text)
                                 if raw_text.strip():
                                     full_text += raw_text
                             except Exception as e2:
@@ -812,7 +937,7 @@ class SECAPIClient:
         
         try:
             submissions_url = f"https://data.sec.gov/submissions/CIK{cik}.json"
-            response = requests.get(submissions_url, headers=self.headers)
+            response = self._get(submissions_url)
             response.raise_for_status()
             submissions = response.json()
             
@@ -905,7 +1030,7 @@ class SECAPIClient:
         
         try:
             submissions_url = f"https://data.sec.gov/submissions/CIK{cik}.json"
-            response = requests.get(submissions_url, headers=self.headers)
+            response = self._get(submissions_url)
             response.raise_for_status()
             submissions = response.json()
             
@@ -985,7 +1110,7 @@ class SECAPIClient:
         submissions_url = f"https://data.sec.gov/submissions/CIK{cik}.json"
         
         try:
-            response = requests.get(submissions_url, headers=self.headers)
+            response = self._get(submissions_url)
             response.raise_for_status()
             submissions = response.json()
             
@@ -1032,6 +1157,7 @@ class SECAPIClient:
             logger.error(f"Error downloading filings for {ticker}: {e}")
             return [] 
 
+    @timed('sec.fetch_filing')
     def fetch_filing_by_index_url(self, index_url: str, ticker: str, filing_type: str,
                                   save_to_file: bool = True) -> Optional[FilingResult]:
         """Fetch a filing given a specific index URL, avoiding extra lookups."""
@@ -1044,7 +1170,7 @@ class SECAPIClient:
             for doc in documents:
                 try:
                     logger.info(f"Fetching document: {doc.filename}")
-                    response = requests.get(doc.url, headers=self.headers)
+                    response = self._get(doc.url)
                     response.raise_for_status()
                     label = doc.filename
                     if doc.exhibit_type:
@@ -1065,22 +1191,18 @@ class SECAPIClient:
                     if is_xbrl_file:
                         # Process XBRL XML files - they contain valuable financial data
                         try:
-                            # Parse as XML and extract text content
                             if response.encoding is None:
                                 response.encoding = 'utf-8'
 
-                            xml_content = response.text
-                            # Parse XML and extract all text content
-                            xml_soup = BeautifulSoup(xml_content, 'xml')
-                            # Extract text from all elements, preserving structure
-                            xbrl_text = self._extract_xbrl_text(xml_soup)
+                            # Stream the instance's facts straight from the response bytes
+                            xbrl_text = self._extract_xbrl_text(response.content)
                             full_text += xbrl_text
 
                         except Exception as e:
                             logger.warning(f"Failed to process XBRL file {doc.filename}: {e}")
                             # Fallback: try to extract raw text
                             try:
-                                raw_text = self.clean_text(xml_content)
+                                raw_text = self.clean_text(response.text)
                                 if raw_text.strip():
                                     full_text += raw_text
                             except Exception as e2:
@@ -1201,7 +1323,6 @@ class SECAPIClient:
         Download all non-image, non-XML exhibits for a given filing index URL.
         Returns a list of file paths for the downloaded exhibits.
         """
-        import requests
         from urllib.parse import urljoin
         import os
         exhibit_paths = []
@@ -1214,7 +1335,7 @@ class SECAPIClient:
             if doc.filename.endswith('.xml') or any(doc.filename.endswith(ext) for ext in ['.jpg', '.jpeg', '.png', '.gif']):
                 continue
             try:
-                response = requests.get(doc.url, headers=self.headers)
+                response = self._get(doc.url)
                 response.raise_for_status()
                 # Save to temp_filings with a clear filename
                 ext = '.htm' if doc.filename.endswith('.htm') else '.txt'
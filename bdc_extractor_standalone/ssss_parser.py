@@ -10,13 +10,13 @@ from typing import List, Dict, Optional
 from collections import defaultdict
 from dataclasses import dataclass
 import os
-import csv
 import requests
 
 from sec_api_client import SECAPIClient
 # from flexible_table_parser import FlexibleTableParser  # Removed - module doesn't exist
 from bs4 import BeautifulSoup
 from standardization import standardize_investment_type, standardize_industry, standardize_reference_rate
+from output_writer import InvestmentCSVWriter
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -250,13 +250,11 @@ class SSSSExtractor:
         # write
         out_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'output'); os.makedirs(out_dir, exist_ok=True)
         out_file = os.path.join(out_dir, 'SSSS_SuRo_Capital_Corp_investments.csv')
-        with open(out_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=[
+        with InvestmentCSVWriter(out_file, fieldnames=[
                 'company_name','industry','business_description','investment_type','acquisition_date','maturity_date',
                 'principal_amount','cost','fair_value','interest_rate','reference_rate','spread','floor_rate','pik_rate',
                 'shares_units','percent_net_assets','currency','commitment_limit','undrawn_commitment'
-            ])
-            writer.writeheader()
+            ]) as writer:
             for inv in investments:
                 # Apply standardization
                 standardized_inv_type = standardize_investment_type(inv.investment_type)
@@ -828,9 +826,7 @@ def main():
     fieldnames = [
         "company_name","investment_type","industry","interest_rate","reference_rate","spread","floor_rate","pik_rate","acquisition_date","maturity_date","principal_amount","amortized_cost","fair_value","percent_of_net_assets",
     ]
-    with open(out_csv, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
+    with InvestmentCSVWriter(out_csv, fieldnames=fieldnames) as writer:
         for rec in records:
             # Apply standardization
             if 'investment_type' in rec:
@@ -889,10 +885,8 @@ def main():
         })
 
     inv_out = os.path.join(out_dir, 'SSSS_SuRo_Capital_Corp_investments.csv')
-    with open(inv_out, 'w', newline='', encoding='utf-8') as f:
-        inv_fields = ['company_name','industry','business_description','investment_type','acquisition_date','maturity_date','principal_amount','cost','fair_value','interest_rate','reference_rate','spread','floor_rate','pik_rate']
-        w = csv.DictWriter(f, fieldnames=inv_fields)
-        w.writeheader()
+    inv_fields = ['company_name','industry','business_description','investment_type','acquisition_date','maturity_date','principal_amount','cost','fair_value','interest_rate','reference_rate','spread','floor_rate','pik_rate']
+    with InvestmentCSVWriter(inv_out, fieldnames=inv_fields) as w:
         for r in inv_rows:
             # Apply standardization
             if 'investment_type' in r:
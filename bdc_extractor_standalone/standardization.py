@@ -7,6 +7,7 @@ for investment types, industries, and reference rates.
 """
 
 import re
+from functools import lru_cache
 from typing import Optional, Dict, List, Tuple
 
 # Investment Type Mappings
@@ -352,6 +353,7 @@ REFERENCE_RATE_MAPPINGS: List[Tuple[str, str]] = [
 ]
 
 
+@lru_cache(maxsize=4096)
 def standardize_investment_type(raw_type: Optional[str]) -> str:
     """
     Map raw investment type to standard name.
@@ -380,6 +382,7 @@ def standardize_investment_type(raw_type: Optional[str]) -> str:
     return raw_type
 
 
+@lru_cache(maxsize=4096)
 def standardize_industry(raw_industry: Optional[str]) -> str:
     """
     Map raw industry name to standard name.
@@ -412,6 +415,7 @@ def standardize_industry(raw_industry: Optional[str]) -> str:
     return raw_industry
 
 
+@lru_cache(maxsize=4096)
 def standardize_reference_rate(raw_rate: Optional[str]) -> Optional[str]:
     """
     Map raw reference rate to standard name.
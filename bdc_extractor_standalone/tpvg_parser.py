@@ -1,10 +1,11 @@
 #!/usr/bin/env python3
-import re, os, csv, logging, requests
+import re, os, logging, requests
 from dataclasses import dataclass
 from typing import List, Dict, Optional
 from collections import defaultdict
 from sec_api_client import SECAPIClient
 from standardization import standardize_investment_type, standardize_industry, standardize_reference_rate
+from output_writer import InvestmentCSVWriter
 
 logger = logging.getLogger(__name__)
 
@@ -98,9 +99,7 @@ class TPVGExtractor:
         out_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'output')
         os.makedirs(out_dir, exist_ok=True)
         out_file = os.path.join(out_dir, 'TPVG_TriplePoint_Venture_Growth_BDC_investments.csv')
-        with open(out_file, 'w', newline='', encoding='utf-8') as f:
-            w = csv.DictWriter(f, fieldnames=['company_name','industry','business_description','investment_type','acquisition_date','maturity_date','principal_amount','cost','fair_value','interest_rate','reference_rate','spread','floor_rate','pik_rate'])
-            w.writeheader()
+        with InvestmentCSVWriter(out_file, fieldnames=['company_name','industry','business_description','investment_type','acquisition_date','maturity_date','principal_amount','cost','fair_value','interest_rate','reference_rate','spread','floor_rate','pik_rate']) as w:
             for x in invs:
                 # Apply standardization
                 standardized_inv_type = standardize_investment_type(x.investment_type)
@@ -859,9 +858,7 @@ def main():
     out_dir = os.path.join(os.path.dirname(__file__), 'output'); os.makedirs(out_dir, exist_ok=True)
     out_csv = os.path.join(out_dir, 'TPVG_Schedule_Continued_latest.csv')
     fieldnames = ['company_name','investment_type','industry','interest_rate','reference_rate','spread','acquisition_date','maturity_date','principal_amount','amortized_cost','fair_value','floor_rate','pik_rate','eot_payment','percent_of_net_assets']
-    with open(out_csv, 'w', newline='', encoding='utf-8') as f:
-        w = csv.DictWriter(f, fieldnames=fieldnames)
-        w.writeheader()
+    with InvestmentCSVWriter(out_csv, fieldnames=fieldnames) as w:
         for r in records:
             # Apply standardization
             if 'investment_type' in r:
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+One fetched and parsed XBRL instance per filing, shared by enrichment passes.
+
+Hybrid parsers read the schedule of investments from HTML and then enrich
+it from the filing's XBRL (industries from the industry axis, rates from
+per-investment facts). Each pass used to download the full submission
+.txt and re-scan it; an XBRLArtifact does the download and the context and
+fact scans once and indexes them by investment context.
+"""
+
+import re
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional
+
+import requests
+
+from instrumentation import timed
+
+logger = logging.getLogger(__name__)
+
+CONTEXT_RE = re.compile(r'<context id="([^"]+)">(.*?)</context>', re.DOTALL)
+INVESTMENT_IDENTIFIER_RE = re.compile(
+    r'<xbrldi:typedMember[^>]*dimension="us-gaap:InvestmentIdentifierAxis"[^>]*>'
+    r'\s*<us-gaap:InvestmentIdentifierAxis\.domain>([^<]+)</us-gaap:InvestmentIdentifierAxis\.domain>'
+    r'\s*</xbrldi:typedMember>', re.DOTALL)
+EXPLICIT_MEMBER_RE = re.compile(
+    r'<xbrldi:explicitMember[^>]*dimension="([^"]+)"[^>]*>([^<]+)</xbrldi:explicitMember>', re.DOTALL)
+FACT_RE = re.compile(
+    r'<([^>\s:]+:[^>\s]+)[^>]*contextRef="([^"]*)"[^>]*(?:unitRef="([^"]*)")?[^>]*>([^<]*)</\1>', re.DOTALL)
+INLINE_FACT_RE = re.compile(
+    r'<ix:nonFraction[^>]*?name="([^"]+)"[^>]*?contextRef="([^"]+)"[^>]*?(?:unitRef="([^"]*)")?[^>]*?>(.*?)</ix:nonFraction>',
+    re.DOTALL | re.IGNORECASE)
+TAG_RE = re.compile(r'<[^>]+>')
+
+
+@dataclass
+class InvestmentContext:
+    """An XBRL context on the InvestmentIdentifierAxis."""
+    context_id: str
+    identifier: str
+    members: Dict[str, str] = field(default_factory=dict)  # lowercased axis name (no prefix) -> member QName
+
+    def member(self, *axes: str) -> Optional[str]:
+        """Member on the first of the given axes (e.g. 'EquitySecuritiesByIndustryAxis') present."""
+        for axis in axes:
+            value = self.members.get(axis.lower())
+            if value:
+                return value
+        return None
+
+
+class XBRLArtifact:
+    """Investment contexts and their facts from one filing's XBRL, parsed once."""
+
+    def __init__(self, content: str, url: Optional[str] = None):
+        """
+        Parse an XBRL instance (or full submission text containing one).
+
+        Args:
+            content: Instance document or full submission .txt
+            url: Where the content came from (for logging)
+        """
+        self.url = url
+        self.contexts: Dict[str, InvestmentContext] = {}
+        self.facts: Dict[str, List[Dict[str, str]]] = defaultdict(list)
+        self.context_count = 0
+        self._parse(content)
+
+    @classmethod
+    def fetch(cls, url: str, headers: Optional[Dict[str, str]] = None) -> 'XBRLArtifact':
+        """Download and parse a filing's XBRL."""
+        logger.info(f"Fetching XBRL from {url}")
+        response = requests.get(url, headers=headers)
+        response.raise_for_status()
+        return cls(response.text, url)
+
+    @timed('parse.xbrl')
+    def _parse(self, content: str):
+        for m in CONTEXT_RE.finditer(content):
+            self.context_count += 1
+            body = m.group(2)
+            tm = INVESTMENT_IDENTIFIER_RE.search(body)
+            if not tm:
+                continue
+            members = {}
+            for em in EXPLICIT_MEMBER_RE.finditer(body):
+                axis = em.group(1).split(':')[-1].lower()
+                members.setdefault(axis, em.group(2).strip())
+            self.contexts[m.group(1)] = InvestmentContext(m.group(1), tm.group(1).strip(), members)
+
+        # Only facts reported against investment contexts are kept
+        for m in FACT_RE.finditer(content):
+            cref, value = m.group(2), m.group(4)
+            if value and cref in self.contexts:
+                self.facts[cref].append({'concept': m.group(1), 'value': value.strip()})
+        for m in INLINE_FACT_RE.finditer(content):
+            cref = m.group(2)
+            if cref not in self.contexts:
+                continue
+            text = TAG_RE.sub('', m.group(4)).strip()
+            if text:
+                self.facts[cref].append({'concept': m.group(1), 'value': text})
+
+        logger.info(f"XBRL: {self.context_count} contexts, {len(self.contexts)} investment contexts, "
+                    f"{sum(len(f) for f in self.facts.values())} investment facts")
+
+    def investment_contexts(self) -> Iterator[InvestmentContext]:
+        """Investment contexts in document order."""
+        return iter(self.contexts.values())
+
+    def facts_for(self, context_id: str) -> List[Dict[str, str]]:
+        """Facts ({'concept', 'value'}) reported against a context."""
+        return self.facts.get(context_id, [])
@@ -14,7 +14,8 @@ from core.sec_api_client import SECAPIClient
 logger = logging.getLogger(__name__)
 
 
-def match_series_to_424b(ticker: str, series_names: List[str], max_filings: int = 20) -> List[Dict]:
+def match_series_to_424b(ticker: str, series_names: List[str], max_filings: int = 20,
+                         client: Optional[SECAPIClient] = None) -> List[Dict]:
     """
     Find the BEST 424B filing for each series.
     
@@ -22,13 +23,14 @@ def match_series_to_424b(ticker: str, series_names: List[str], max_filings: int
         ticker: Company ticker
         series_names: List of series names (e.g., ["A", "B", "Series C"])
         max_filings: Maximum number of filings to check
+        client: SEC client to reuse (a new one is created if omitted)
     
     Returns:
         List of best matched filings - one per series
     """
     logger.info(f"Finding best 424B filings for {ticker} series: {series_names}")
     
-    client = SECAPIClient()
+    client = client or SECAPIClient()
     
     # Get recent 424B filings
     filings = client.get_all_424b_filings(
@@ -46,13 +48,14 @@ def match_series_to_424b(ticker: str, series_names: List[str], max_filings: int
 
     for filing in filings:
         try:
-            # Get filing content
-            content = client.get_filing_by_accession(ticker, filing['accession'], filing['form'])
-            if not content:
+            # Fetch and clean the filing once; the artifact travels with the match into extraction
+            artifact = client.get_filing_artifact(ticker, filing['accession'], filing['form'], filing.get('date'))
+            if not artifact:
                 continue
+            content = artifact.text
 
             # Lower-cased content and header slice for quick checks
-            content_lower = content.lower()
+            content_lower = artifact.lower
             header_text = content_lower[:2000]
 
             for series in series_names:
@@ -103,6 +106,7 @@ def match_series_to_424b(ticker: str, series_names: List[str], max_filings: int
                     existing = best_filings_per_series.get(series)
                     candidate = filing.copy()
                     candidate['content'] = content
+                    candidate['artifact'] = artifact
                     candidate['matched_series'] = [series]
                     candidate['_score'] = score
                     candidate['_has_series_section'] = has_series_section
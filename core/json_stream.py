@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Incremental parsing of JSON object arrays returned by the LLM.
+
+The extraction prompt asks for a JSON array of security objects. Parsing the
+whole response with json.loads means nothing is usable until the last token
+arrives, and one malformed or truncated element loses the entire call.
+JSONObjectStream is fed the response text chunk by chunk and yields each
+top-level object as soon as its closing brace arrives; markdown fences and
+the surrounding array brackets are skipped.
+"""
+
+import json
+import logging
+from typing import Dict, Iterable, Iterator, List
+
+logger = logging.getLogger(__name__)
+
+
+class JSONObjectStream:
+    """Splits streamed text into the top-level JSON objects it contains."""
+
+    def __init__(self):
+        self._buffer = ''
+        self._pos = 0          # next character of _buffer to scan
+        self._start = None     # offset of the '{' opening the current object
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self.objects = 0       # objects emitted so far
+        self.errors = 0        # complete objects that failed to decode
+
+    def feed(self, text: str) -> List[Dict]:
+        """
+        Add response text and return the objects it completed.
+
+        Args:
+            text: Next chunk of the response
+
+        Returns:
+            Objects (dicts) whose closing brace is in this chunk
+        """
+        self._buffer += text
+        completed = []
+        buffer = self._buffer
+        i = self._pos
+        n = len(buffer)
+
+        while i < n:
+            if self._start is None:
+                # Between objects: skip fences, brackets, commas and whitespace
+                i = buffer.find('{', i)
+                if i < 0:
+                    i = n
+                    break
+                self._start = i
+                self._depth = 1
+                i += 1
+                continue
+
+            ch = buffer[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == '\\':
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == '{':
+                self._depth += 1
+            elif ch == '}':
+                self._depth -= 1
+                if self._depth == 0:
+                    obj = self._decode(buffer[self._start:i + 1])
+                    if obj is not None:
+                        completed.append(obj)
+                    self._start = None
+            i += 1
+
+        # Drop consumed text; keep only the object still being received
+        if self._start is None:
+            self._buffer = ''
+            self._pos = 0
+        else:
+            self._buffer = buffer[self._start:]
+            self._pos = i - self._start
+            self._start = 0
+        return completed
+
+    def _decode(self, text: str):
+        try:
+            obj = json.loads(text)
+        except ValueError as e:
+            self.errors += 1
+            logger.warning(f"Skipping malformed object in LLM response: {e}")
+            return None
+        if not isinstance(obj, dict):
+            return None
+        self.objects += 1
+        return obj
+
+    @property
+    def truncated(self) -> bool:
+        """True if the text ended inside an object."""
+        return self._start is not None
+
+
+def iter_json_objects(chunks: Iterable[str]) -> Iterator[Dict]:
+    """
+    Yield each top-level JSON object in a stream of text chunks as it completes.
+
+    A trailing object cut off by truncation is logged and dropped; everything
+    before it has already been yielded.
+    """
+    stream = JSONObjectStream()
+    for chunk in chunks:
+        for obj in stream.feed(chunk):
+            yield obj
+    if stream.truncated:
+        logger.warning(f"LLM response ended mid-object; kept {stream.objects} complete object(s)")
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Token, latency and budget accounting for LLM calls.
+
+Every Gemini call made by SecuritiesFeaturesExtractor is recorded here:
+prompt and response tokens (from the response's usage metadata, or
+estimated from character counts when the SDK doesn't report them),
+latency, and whether part of the prompt was served from the model's
+context cache. Usage is aggregated per ticker and per run, and optional
+token budgets tell the extractor when to stop calling the model and fall
+back to regex-only extraction.
+
+One LLMAccountant can be shared by extractors on several threads (see
+scripts/batch_extract_preferred.py) so the run budget covers the whole batch.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass, asdict
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Rough characters per token for English filing text, used when the
+# response carries no usage metadata
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text_or_chars) -> int:
+    """Approximate token count for a string or a character count."""
+    chars = text_or_chars if isinstance(text_or_chars, int) else len(text_or_chars or '')
+    return (chars + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+@dataclass
+class LLMUsage:
+    """Aggregated usage for a ticker or a run."""
+    calls: int = 0
+    prompt_tokens: int = 0
+    response_tokens: int = 0
+    cached_tokens: int = 0      # prompt tokens served from the model's context cache
+    cache_hits: int = 0
+    cache_misses: int = 0
+    latency: float = 0.0        # seconds spent waiting on the model
+    estimated: int = 0          # calls whose token counts are estimates
+    skipped: int = 0            # calls not made because a budget was exhausted
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.response_tokens
+
+    def add(self, prompt_tokens: int, response_tokens: int, cached_tokens: int, latency: float, estimated: bool):
+        self.calls += 1
+        self.prompt_tokens += prompt_tokens
+        self.response_tokens += response_tokens
+        self.cached_tokens += cached_tokens
+        if cached_tokens:
+            self.cache_hits += 1
+        else:
+            self.cache_misses += 1
+        self.latency += latency
+        if estimated:
+            self.estimated += 1
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data['total_tokens'] = self.total_tokens
+        data['latency'] = round(self.latency, 3)
+        return data
+
+
+class LLMAccountant:
+    """Records LLM calls and enforces per-run and per-ticker token budgets."""
+
+    def __init__(self, token_budget: Optional[int] = None, ticker_token_budget: Optional[int] = None,
+                 input_cost_per_million: float = 0.0, output_cost_per_million: float = 0.0):
+        """
+        Initialize the accountant.
+
+        Args:
+            token_budget: Total tokens (prompt + response) allowed for the run; None for no limit
+            ticker_token_budget: Tokens allowed per ticker; None for no limit
+            input_cost_per_million: Price per million prompt tokens, for cost estimates
+            output_cost_per_million: Price per million response tokens, for cost estimates
+        """
+        self.token_budget = token_budget
+        self.ticker_token_budget = ticker_token_budget
+        self.input_cost_per_million = input_cost_per_million
+        self.output_cost_per_million = output_cost_per_million
+        self.run = LLMUsage()
+        self.tickers: Dict[str, LLMUsage] = {}
+        self._lock = threading.Lock()
+
+    def has_budget(self, ticker: str, prompt_tokens: int = 0) -> bool:
+        """
+        Whether a call for this ticker fits the remaining budgets.
+
+        Args:
+            ticker: Ticker the call is for
+            prompt_tokens: Tokens the call's prompt will use
+
+        Returns:
+            False if the prompt would take the run or the ticker over budget
+        """
+        with self._lock:
+            if self.token_budget is not None and self.run.total_tokens + prompt_tokens > self.token_budget:
+                return False
+            if self.ticker_token_budget is not None:
+                used = self.tickers[ticker].total_tokens if ticker in self.tickers else 0
+                if used + prompt_tokens > self.ticker_token_budget:
+                    return False
+        return True
+
+    def record_call(self, ticker: str, prompt_chars: int, response_chars: int, latency: float,
+                    usage_metadata=None):
+        """
+        Record one model call.
+
+        Args:
+            ticker: Ticker the call was for
+            prompt_chars: Prompt length, used when usage_metadata is missing
+            response_chars: Response length, used when usage_metadata is missing
+            latency: Seconds from request to last response chunk
+            usage_metadata: The response's usage_metadata, if the SDK provides it
+        """
+        prompt_tokens = getattr(usage_metadata, 'prompt_token_count', None)
+        response_tokens = getattr(usage_metadata, 'candidates_token_count', None)
+        cached_tokens = getattr(usage_metadata, 'cached_content_token_count', None) or 0
+        estimated = not prompt_tokens
+        if estimated:
+            prompt_tokens = estimate_tokens(prompt_chars)
+            response_tokens = estimate_tokens(response_chars)
+        response_tokens = response_tokens or 0
+
+        with self._lock:
+            self.run.add(prompt_tokens, response_tokens, cached_tokens, latency, estimated)
+            self.tickers.setdefault(ticker, LLMUsage()).add(
+                prompt_tokens, response_tokens, cached_tokens, latency, estimated)
+        logger.debug(f"{ticker}: LLM call {prompt_tokens}+{response_tokens} tokens "
+                     f"({cached_tokens} cached) in {latency:.1f}s")
+
+    def record_skip(self, ticker: str):
+        """Record a call that was not made because a budget was exhausted."""
+        with self._lock:
+            self.run.skipped += 1
+            self.tickers.setdefault(ticker, LLMUsage()).skipped += 1
+
+    def ticker_usage(self, ticker: str) -> LLMUsage:
+        with self._lock:
+            return LLMUsage(**asdict(self.tickers.get(ticker, LLMUsage())))
+
+    def estimated_cost(self, usage: Optional[LLMUsage] = None) -> float:
+        usage = usage or self.run
+        return (usage.prompt_tokens * self.input_cost_per_million
+                + usage.response_tokens * self.output_cost_per_million) / 1_000_000
+
+    def summary(self) -> Dict:
+        """Run totals, budgets and per-ticker usage as a JSON-serializable dict."""
+        with self._lock:
+            run = self.run.to_dict()
+            tickers = {t: u.to_dict() for t, u in sorted(self.tickers.items())}
+        run['estimated_cost'] = round(self.estimated_cost(), 4)
+        return {
+            'token_budget': self.token_budget,
+            'ticker_token_budget': self.ticker_token_budget,
+            'run': run,
+            'tickers': tickers,
+        }
+
+    def describe(self, usage: Optional[LLMUsage] = None) -> str:
+        """One-line usage summary for logs."""
+        usage = usage or self.run
+        text = (f"{usage.calls} LLM calls, {usage.prompt_tokens:,} prompt + {usage.response_tokens:,} response tokens, "
+                f"{usage.cache_hits} cache hits, {usage.latency:.1f}s")
+        if usage.skipped:
+            text += f", {usage.skipped} skipped (budget)"
+        if self.input_cost_per_million or self.output_cost_per_million:
+            text += f", ~${self.estimated_cost(usage):.2f}"
+        return text
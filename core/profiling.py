@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Per-ticker CPU and memory profiling for extraction runs.
+
+Used by the --profile flag of the run scripts. Each ticker's extraction is
+run under cProfile and tracemalloc; the profiler writes, per ticker:
+
+  <TICKER>.prof       cProfile stats (open with snakeviz or pstats)
+  <TICKER>.txt        top functions by cumulative and own time, top allocations
+
+and for the whole run:
+
+  summary.txt / summary.json   ranked hot functions across all tickers,
+                               plus wall time, CPU time and peak memory per ticker
+"""
+
+import os
+import io
+import json
+import time
+import pstats
+import cProfile
+import logging
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'output', 'profiles')
+
+
+def _func_label(func) -> str:
+    filename, lineno, name = func
+    return f"{os.path.basename(filename)}:{lineno}({name})" if lineno else name
+
+
+class ExtractionProfiler:
+    """Profiles named units of work (tickers) and writes per-ticker and summary reports."""
+
+    def __init__(self, output_dir: Optional[str] = None, top_n: int = 25, trace_memory: bool = True):
+        """
+        Initialize the profiler.
+
+        Args:
+            output_dir: Directory for profile files (default: output/profiles/<timestamp>)
+            top_n: Number of functions / allocation sites listed in reports
+            trace_memory: Also track allocations with tracemalloc (slower)
+        """
+        self.output_dir = output_dir or os.path.join(DEFAULT_PROFILE_DIR, datetime.now().strftime('%Y%m%d_%H%M%S'))
+        self.top_n = top_n
+        self.trace_memory = trace_memory
+        self.results: List[Dict] = []
+        self._prof_files: List[str] = []
+        os.makedirs(self.output_dir, exist_ok=True)
+
+    @contextmanager
+    def profile(self, name: str):
+        """Run the enclosed block under cProfile (and tracemalloc) and write <name>.prof/.txt."""
+        profiler = cProfile.Profile()
+        if self.trace_memory:
+            tracemalloc.start()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            peak_mb = None
+            top_allocations = []
+            if self.trace_memory:
+                _, peak = tracemalloc.get_traced_memory()
+                peak_mb = round(peak / (1024 * 1024), 1)
+                snapshot = tracemalloc.take_snapshot()
+                tracemalloc.stop()
+                for stat in snapshot.statistics('lineno')[:self.top_n]:
+                    frame = stat.traceback[0]
+                    top_allocations.append({
+                        'site': f"{os.path.basename(frame.filename)}:{frame.lineno}",
+                        'size_kb': round(stat.size / 1024, 1),
+                        'count': stat.count,
+                    })
+            try:
+                self._write_ticker_report(name, profiler, wall, cpu, peak_mb, top_allocations)
+            except Exception as e:
+                logger.warning(f"Could not write profile for {name}: {e}")
+
+    def _write_ticker_report(self, name: str, profiler: cProfile.Profile, wall: float, cpu: float,
+                             peak_mb: Optional[float], top_allocations: List[Dict]):
+        prof_path = os.path.join(self.output_dir, f"{name}.prof")
+        profiler.dump_stats(prof_path)
+        self._prof_files.append(prof_path)
+
+        stream = io.StringIO()
+        stats = pstats.Stats(profiler, stream=stream).strip_dirs()
+        stream.write(f"{name}: wall {wall:.2f}s, cpu {cpu:.2f}s"
+                     + (f", peak traced memory {peak_mb} MB" if peak_mb is not None else "") + "\n\n")
+        stream.write("=== By cumulative time ===\n")
+        stats.sort_stats('cumulative').print_stats(self.top_n)
+        stream.write("=== By own time ===\n")
+        stats.sort_stats('tottime').print_stats(self.top_n)
+        if top_allocations:
+            stream.write("=== Top allocations (live at end) ===\n")
+            for alloc in top_allocations:
+                stream.write(f"  {alloc['size_kb']:>10.1f} KB  {alloc['count']:>8}  {alloc['site']}\n")
+        with open(os.path.join(self.output_dir, f"{name}.txt"), 'w', encoding='utf-8') as f:
+            f.write(stream.getvalue())
+
+        self.results.append({
+            'name': name,
+            'wall_seconds': round(wall, 3),
+            'cpu_seconds': round(cpu, 3),
+            'peak_memory_mb': peak_mb,
+            'top_functions': self._top_functions(pstats.Stats(profiler)),
+            'top_allocations': top_allocations,
+        })
+
+    def _top_functions(self, stats: pstats.Stats) -> List[Dict]:
+        """Top-N functions by own time from a Stats object."""
+        rows = []
+        for func, (cc, nc, tottime, cumtime, _) in stats.stats.items():
+            rows.append({'function': _func_label(func), 'calls': nc,
+                         'own_seconds': round(tottime, 4), 'cumulative_seconds': round(cumtime, 4)})
+        rows.sort(key=lambda r: -r['own_seconds'])
+        return rows[:self.top_n]
+
+    def write_summary(self) -> Optional[str]:
+        """
+        Write summary.txt and summary.json ranking hot functions across all profiled tickers.
+
+        Returns:
+            Path of summary.txt, or None if nothing was profiled
+        """
+        if not self._prof_files:
+            return None
+        combined = pstats.Stats(*self._prof_files)
+        top = self._top_functions(combined)
+
+        summary_json = os.path.join(self.output_dir, 'summary.json')
+        with open(summary_json, 'w', encoding='utf-8') as f:
+            json.dump({
+                'generated_at': datetime.now().isoformat(),
+                'top_functions': top,
+                'tickers': self.results,
+            }, f, indent=2)
+
+        lines = [f"Profiled {len(self.results)} tickers", "", "Top functions by own time (all tickers):"]
+        for i, row in enumerate(top, 1):
+            lines.append(f"{i:>3}. {row['own_seconds']:>9.3f}s own  {row['cumulative_seconds']:>9.3f}s cum  "
+                         f"{row['calls']:>9} calls  {row['function']}")
+        lines += ["", f"{'Ticker':<10} {'Wall s':>9} {'CPU s':>9} {'Peak MB':>9}  Hottest function"]
+        for result in sorted(self.results, key=lambda r: -r['cpu_seconds']):
+            hottest = result['top_functions'][0]['function'] if result['top_functions'] else ''
+            peak = f"{result['peak_memory_mb']:.1f}" if result['peak_memory_mb'] is not None else '-'
+            lines.append(f"{result['name']:<10} {result['wall_seconds']:>9.2f} {result['cpu_seconds']:>9.2f} "
+                         f"{peak:>9}  {hottest}")
+
+        summary_txt = os.path.join(self.output_dir, 'summary.txt')
+        with open(summary_txt, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+        logger.info(f"Profiles written to {self.output_dir}")
+        return summary_txt
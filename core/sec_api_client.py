@@ -7,19 +7,69 @@ from the EDGAR database. It supports various filing types, company lookups,
 and text extraction with proper rate limiting and error handling.
 """
 
+import io
 import os
+import gzip
 import logging
+import tempfile
+import threading
+import time
 import requests
 from bs4 import BeautifulSoup
-from typing import Dict, Any, Optional, List, Union
+from typing import Callable, Dict, Any, Optional, List, Union
 from datetime import date, datetime, timedelta
 import re
 import json
-from dataclasses import dataclass
+from dataclasses import dataclass, field, asdict
 from urllib.parse import urljoin
+from xml.etree import ElementTree
 
 logger = logging.getLogger(__name__)
 
+# Version of the text pipeline (document assembly, BeautifulSoup extraction,
+# _extract_xbrl_text, clean_text). Bump it whenever that output changes so
+# cached processed text from the old pipeline is ignored.
+TEXT_PIPELINE_VERSION = 3
+
+
+class RateLimiter:
+    """Spaces calls at least min_interval seconds apart, across threads."""
+
+    def __init__(self, min_interval: float):
+        self.min_interval = max(min_interval, 0.0)
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+_sec_rate_limiter: Optional[RateLimiter] = None
+_sec_rate_limiter_lock = threading.Lock()
+
+
+def sec_rate_limiter(min_interval: float = 0.1) -> RateLimiter:
+    """
+    The limiter shared by every SECAPIClient in the process.
+
+    SEC fair access allows 10 requests per second per host, and the batch
+    scripts run several clients on worker threads, so a per-client delay
+    would multiply the rate. The first call creates the limiter; a later
+    client asking for a longer delay widens it, never narrows it.
+    """
+    global _sec_rate_limiter
+    with _sec_rate_limiter_lock:
+        if _sec_rate_limiter is None:
+            _sec_rate_limiter = RateLimiter(min_interval)
+        elif min_interval > _sec_rate_limiter.min_interval:
+            _sec_rate_limiter.min_interval = min_interval
+        return _sec_rate_limiter
+
 @dataclass
 class FilingDocument:
     """Represents a document within an SEC filing."""
@@ -40,6 +90,57 @@ class FilingResult:
     documents: List[FilingDocument] = None
     metadata: Dict[str, Any] = None
 
+DOCUMENT_MARKER_RE = re.compile(r'\n\n--- DOCUMENT: (.+?) ---\n\n')
+
+@dataclass
+class FilingSection:
+    """Span of one document within a filing's combined text."""
+    label: str
+    start: int
+    end: int
+
+@dataclass
+class FilingArtifact:
+    """
+    A filing fetched and cleaned once, passed from matching through extraction.
+
+    Holds the combined cleaned text (as built by fetch_filing_by_index_url),
+    the index's document list and where each document's text starts and ends.
+    """
+    ticker: str
+    filing_type: str
+    accession_number: str
+    text: str
+    filing_date: Optional[str] = None
+    documents: List[FilingDocument] = None
+    sections: List[FilingSection] = None
+    _lower: Optional[str] = field(default=None, repr=False, compare=False)
+
+    @classmethod
+    def from_result(cls, result: FilingResult, filing_date: Optional[str] = None) -> 'FilingArtifact':
+        markers = list(DOCUMENT_MARKER_RE.finditer(result.text))
+        sections = [
+            FilingSection(m.group(1), m.end(), markers[i + 1].start() if i + 1 < len(markers) else len(result.text))
+            for i, m in enumerate(markers)
+        ]
+        return cls(ticker=result.ticker, filing_type=result.filing_type,
+                   accession_number=result.accession_number, text=result.text,
+                   filing_date=filing_date, documents=result.documents or [], sections=sections)
+
+    @property
+    def lower(self) -> str:
+        """Lower-cased text, computed once."""
+        if self._lower is None:
+            self._lower = self.text.lower()
+        return self._lower
+
+    def section_text(self, name: str) -> Optional[str]:
+        """Text of the first document whose label contains `name` (e.g. 'EX-4.1' or a filename)."""
+        for section in self.sections or []:
+            if name.lower() in section.label.lower():
+                return self.text[section.start:section.end]
+        return None
+
 class SECAPIClient:
     """
     A generic client for fetching data from the SEC EDGAR API.
@@ -66,17 +167,27 @@ class SECAPIClient:
     def __init__(self, 
                  data_dir: str = "data",
                  user_agent: str = None,
-                 rate_limit_delay: float = 0.1):
+                 rate_limit_delay: float = 0.1,
+                 use_processed_cache: bool = True,
+                 compress_processed: bool = True):
         """
         Initialize the SEC API client.
         
         Args:
             data_dir: Directory to store downloaded filings
             user_agent: Custom user agent string (required by SEC)
-            rate_limit_delay: Delay between requests in seconds
+            rate_limit_delay: Minimum delay between SEC requests in seconds, shared by
+                all clients in the process (see sec_rate_limiter)
+            use_processed_cache: Reuse the cleaned text of filings already processed
+                (data_dir/processed, keyed by accession and TEXT_PIPELINE_VERSION)
+            compress_processed: Gzip processed text written to the cache
         """
         self.data_dir = data_dir
         self.rate_limit_delay = rate_limit_delay
+        self.rate_limiter = sec_rate_limiter(rate_limit_delay)
+        self.use_processed_cache = use_processed_cache
+        self.compress_processed = compress_processed
+        self.processed_dir = os.path.join(data_dir, 'processed')
         os.makedirs(data_dir, exist_ok=True)
         
         # Set user agent - SEC requires this
@@ -87,13 +198,18 @@ class SECAPIClient:
         # Load company data
         self._company_tickers = self._load_company_tickers()
 
+    def _get(self, url: str) -> requests.Response:
+        """GET an SEC URL with the client's headers, waiting for the shared rate limiter."""
+        self.rate_limiter.wait()
+        return requests.get(url, headers=self.headers)
+
     def _load_company_tickers(self) -> Dict[str, Any]:
         """Load the SEC's company ticker to CIK mapping."""
         url = "https://www.sec.gov/files/company_tickers.json"
         logger.info(f"Loading company tickers from {url}")
         
         try:
-            response = requests.get(url, headers=self.headers)
+            response = self._get(url)
             response.raise_for_status()
             company_data = response.json()
             
@@ -118,7 +234,7 @@ class SECAPIClient:
         
         try:
             logger.info(f"Attempting dynamic CIK lookup for {ticker}")
-            response = requests.get(search_url, headers=self.headers)
+            response = self._get(search_url)
             response.raise_for_status()
             
             # Try XML parsing first
@@ -219,7 +335,7 @@ class SECAPIClient:
 
         try:
             submissions_url = f"https://data.sec.gov/submissions/CIK{cik}.json"
-            response = requests.get(submissions_url, headers=self.headers)
+            response = self._get(submissions_url)
             response.raise_for_status()
             submissions = response.json()
 
@@ -256,7 +372,7 @@ class SECAPIClient:
             return []
             
         try:
-            response = requests.get(index_url, headers=self.headers)
+            response = self._get(index_url)
             response.raise_for_status()
             soup = BeautifulSoup(response.content, 'html.parser')
             
@@ -342,92 +458,127 @@ class SECAPIClient:
             logger.error(f"Could not parse document URLs from index {index_url}: {e}")
             return []
 
-    def _extract_xbrl_text(self, xml_soup) -> str:
-        """Extract meaningful text content from XBRL XML files with better structure preservation."""
-        if not xml_soup:
+    def _extract_xbrl_text(self, xml_source, fact_filter: Optional[Callable[[str], bool]] = None) -> str:
+        """
+        Extract meaningful text content from an XBRL instance in a single streaming pass.
+
+        Only leaf facts are read, and elements are released as soon as they
+        are handled, so time is linear in the instance size and the element
+        tree is never held in memory.
+
+        Args:
+            xml_source: Instance document as bytes or str
+            fact_filter: Only include facts whose prefixed name (e.g. 'dei:Security12bTitle') it accepts
+
+        Returns:
+            Cleaned text of the facts, with financial facts also grouped by category
+        """
+        if not xml_source:
             return ""
+        if isinstance(xml_source, str):
+            xml_source = xml_source.encode('utf-8')
 
         extracted_text = []
         structured_data = {}
-
-        # First pass: collect structured data by context
-        contexts = xml_soup.find_all(['context', 'xbrli:context'])
         context_map = {}
-        for context in contexts:
-            context_id = context.get('id', '')
-            if context_id:
-                # Extract entity and period information from context
-                entity_info = context.find(['entity', 'xbrli:entity'])
-                period_info = context.find(['period', 'xbrli:period'])
-                if entity_info and period_info:
+        # Financial facts are formatted once all contexts are known
+        pending = []
+        prefixes = {}
+        qnames = {}
+        root = None
+        depth = 0
+
+        for event, item in ElementTree.iterparse(io.BytesIO(xml_source), events=('start-ns', 'start', 'end')):
+            if event == 'start-ns':
+                prefix, uri = item
+                prefixes[uri] = prefix
+                continue
+            if event == 'start':
+                if root is None:
+                    root = item
+                depth += 1
+                continue
+
+            depth -= 1
+            element = item
+            element_name = qnames.get(element.tag)
+            if element_name is None:
+                element_name = qnames[element.tag] = self._xbrl_qname(element.tag, prefixes)
+
+            if element_name in ('context', 'xbrli:context'):
+                context_id = element.get('id', '')
+                entity_info = period_info = None
+                for child in element:
+                    child_name = self._xbrl_qname(child.tag, prefixes)
+                    if child_name in ('entity', 'xbrli:entity'):
+                        entity_info = child
+                    elif child_name in ('period', 'xbrli:period'):
+                        period_info = child
+                if context_id and entity_info is not None and period_info is not None:
+                    # Axis members (segment or scenario) carry the series, e.g. SeriesAPreferredStockMember
+                    members = []
+                    for member in element.iter():
+                        member_name = self._xbrl_qname(member.tag, prefixes)
+                        if member_name in ('explicitMember', 'xbrldi:explicitMember'):
+                            members.append(self._xbrl_member_label((member.text or '').strip()))
+                        elif member_name in ('typedMember', 'xbrldi:typedMember'):
+                            members.append(''.join(s.strip() for s in member.itertext()))
                     context_map[context_id] = {
-                        'entity': entity_info.get_text(strip=True),
-                        'period': period_info.get_text(strip=True)
+                        'entity': ''.join(s.strip() for s in entity_info.itertext()),
+                        'period': ''.join(s.strip() for s in period_info.itertext()),
+                        'members': [m for m in members if m]
                     }
+            elif len(element) == 0 and not element_name.startswith(('xs:', 'xsd:', 'link:', 'xbrli:', 'xbrldi:')) \
+                    and (fact_filter is None or fact_filter(element_name)):
+                text_content = (element.text or '').strip()
 
-        # Second pass: extract facts with context
-        for element in xml_soup.find_all():
-            # Skip schema elements and metadata
-            if element.name and element.name.startswith(('xs:', 'xsd:', 'link:', 'xbrli:', 'xbrldi:')):
-                continue
+                if element_name.startswith('dei:'):
+                    # DEI elements often contain security descriptions with dividend rates
+                    if len(text_content) > 5:
+                        extracted_text.append(f"{element_name}: {text_content}")
+                elif len(text_content) > 1:
+                    name_lower = element_name.lower()
+                    if any(keyword in name_lower for keyword in [
+                        'preferred', 'stock', 'series', 'dividend', 'rate', 'share',
+                        'outstanding', 'par', 'value', 'cumulative', 'callable', 'redemption',
+                        'depositary', 'perpetual', 'liquidation'
+                    ]):
+                        # Placeholder, replaced once the fact's context period is known
+                        pending.append((len(extracted_text), element_name, element.get('contextRef', ''),
+                                        element.get('unitRef', ''), text_content))
+                        extracted_text.append(None)
+                    elif 'us-gaap:' in element_name or 'rily:' in element_name:
+                        # XBRL taxonomy elements - include for context
+                        extracted_text.append(f"{element_name}: {text_content}")
 
-            # Special handling for DEI (Document and Entity Information) elements
-            # These contain important security descriptions and identifiers
-            is_dei_element = element.name and element.name.startswith('dei:')
-            if is_dei_element:
-                # DEI elements often contain security descriptions with dividend rates
-                text_content = element.get_text(strip=True)
-                if text_content and len(text_content) > 5:  # DEI content is usually descriptive
-                    extracted_text.append(f"{element.name}: {text_content}")
-                continue
+            # Release handled subtrees as soon as their top-level element ends
+            if depth == 1 and root is not None:
+                root.clear()
 
-            # Get text content
-            text_content = element.get_text(strip=True)
-            if not text_content or len(text_content) <= 1:
-                continue
+        for position, element_name, context_ref, unit_ref, text_content in pending:
+            # Financial data - format with context
+            formatted = f"{element_name}"
+            if context_ref and context_ref in context_map:
+                formatted += f" [{context_map[context_ref]['period']}]"
+                if context_map[context_ref]['members']:
+                    formatted += f" [{'; '.join(context_map[context_ref]['members'])}]"
+            if unit_ref:
+                formatted += f" ({unit_ref})"
+            formatted += f": {text_content}"
+            extracted_text[position] = formatted
 
-            element_name = element.name or ""
-
-            # Get context reference
-            context_ref = element.get('contextRef', '')
-            unit_ref = element.get('unitRef', '')
-
-            # Format structured data
-            if any(keyword in element_name.lower() for keyword in [
-                'preferred', 'stock', 'series', 'dividend', 'rate', 'share',
-                'outstanding', 'par', 'value', 'cumulative', 'callable', 'redemption',
-                'depositary', 'perpetual', 'liquidation'
-            ]):
-                # Financial data - format with context
-                formatted = f"{element_name}"
-                if context_ref and context_ref in context_map:
-                    ctx = context_map[context_ref]
-                    formatted += f" [{ctx['period']}]"
-                if unit_ref:
-                    formatted += f" ({unit_ref})"
-                formatted += f": {text_content}"
-
-                # Group by category for better extraction
-                category = 'other'
-                if 'preferred' in element_name.lower() and 'share' in element_name.lower():
-                    category = 'preferred_shares'
-                elif 'dividend' in element_name.lower():
-                    category = 'dividends'
-                elif 'outstanding' in element_name.lower():
-                    category = 'outstanding'
-                elif 'rate' in element_name.lower():
-                    category = 'rates'
-
-                if category not in structured_data:
-                    structured_data[category] = []
-                structured_data[category].append(formatted)
-
-                extracted_text.append(formatted)
-
-            elif 'us-gaap:' in element_name or 'rily:' in element_name:
-                # XBRL taxonomy elements - include for context
-                formatted = f"{element_name}: {text_content}"
-                extracted_text.append(formatted)
+            # Group by category for better extraction
+            name_lower = element_name.lower()
+            category = 'other'
+            if 'preferred' in name_lower and 'share' in name_lower:
+                category = 'preferred_shares'
+            elif 'dividend' in name_lower:
+                category = 'dividends'
+            elif 'outstanding' in name_lower:
+                category = 'outstanding'
+            elif 'rate' in name_lower:
+                category = 'rates'
+            structured_data.setdefault(category, []).append(formatted)
 
         # Add structured sections for better parsing
         for category, items in structured_data.items():
@@ -441,6 +592,34 @@ class SECAPIClient:
         # Clean the combined text
         return self.clean_text(combined_text)
 
+    @staticmethod
+    def _is_xbrl_instance(filename: str, content_type: str = '') -> bool:
+        """Whether a filing document is an XBRL instance (as opposed to a schema/linkbase or HTML)."""
+        filename = filename.lower()
+        return bool(
+            ('xml' in content_type or filename.endswith('.xml'))
+            # XBRL instance documents typically have date patterns like 20240930
+            and re.search(r'\d{8}', filename)
+            and ('htm' in filename or 'xbrl' in filename or '_' in filename)
+        )
+
+    @staticmethod
+    def _xbrl_qname(tag: str, prefixes: Dict[str, str]) -> str:
+        """'{uri}local' -> 'prefix:local' using the document's own prefixes ('local' for the default namespace)."""
+        if not tag.startswith('{'):
+            return tag
+        uri, local = tag[1:].split('}', 1)
+        prefix = prefixes.get(uri)
+        return f"{prefix}:{local}" if prefix else local
+
+    @staticmethod
+    def _xbrl_member_label(member: str) -> str:
+        """'rily:SeriesAPreferredStockMember' -> 'Series A Preferred Stock', so series regexes match it."""
+        local = member.split(':', 1)[-1]
+        if local.endswith('Member'):
+            local = local[:-len('Member')]
+        return re.sub(r'(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])|(?<=[A-Za-z])(?=[0-9])', ' ', local)
+
     def clean_text(self, text: str) -> str:
         """Clean and normalize text content."""
         if not text:
@@ -469,6 +648,71 @@ class SECAPIClient:
 
         return text.strip()
 
+    def _processed_paths(self, accession_number: str) -> Dict[str, str]:
+        base = os.path.join(self.processed_dir, f"{accession_number}.v{TEXT_PIPELINE_VERSION}")
+        return {'meta': f"{base}.json", 'gz': f"{base}.txt.gz", 'txt': f"{base}.txt"}
+
+    def _load_processed(self, accession_number: str, ticker: str, filing_type: str,
+                        index_url: str) -> Optional[FilingResult]:
+        """Cleaned text of an already-processed filing from the processed-text cache, if present."""
+        if not self.use_processed_cache:
+            return None
+        paths = self._processed_paths(accession_number)
+        try:
+            with open(paths['meta'], 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if os.path.exists(paths['gz']):
+                with gzip.open(paths['gz'], 'rt', encoding='utf-8') as f:
+                    text = f.read()
+            else:
+                with open(paths['txt'], 'r', encoding='utf-8') as f:
+                    text = f.read()
+        except (OSError, ValueError):
+            return None
+        logger.info(f"Using processed text for {accession_number} (pipeline v{TEXT_PIPELINE_VERSION})")
+        return FilingResult(
+            ticker=ticker,
+            filing_type=filing_type,
+            filing_date=date.today().isoformat(),
+            accession_number=accession_number,
+            text=text,
+            documents=[FilingDocument(**doc) for doc in meta.get('documents', [])],
+            metadata={'index_url': index_url, 'processed_cache': True}
+        )
+
+    def _store_processed(self, result: FilingResult):
+        """Write a filing's cleaned text and document list to the processed-text cache."""
+        if not self.use_processed_cache:
+            return
+        paths = self._processed_paths(result.accession_number)
+        text_path = paths['gz'] if self.compress_processed else paths['txt']
+        meta = {
+            'pipeline_version': TEXT_PIPELINE_VERSION,
+            'accession_number': result.accession_number,
+            'filing_type': result.filing_type,
+            'index_url': (result.metadata or {}).get('index_url'),
+            'documents': [asdict(doc) for doc in result.documents or []],
+        }
+        try:
+            os.makedirs(self.processed_dir, exist_ok=True)
+            # Text first, metadata last: the metadata file marks a complete entry
+            for path, data in ((text_path, result.text.encode('utf-8')),
+                               (paths['meta'], json.dumps(meta).encode('utf-8'))):
+                fd, tmp_path = tempfile.mkstemp(dir=self.processed_dir, prefix='.tmp_')
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(gzip.compress(data) if path.endswith('.gz') else data)
+                os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not cache processed text for {result.accession_number}: {e}")
+
+    def _save_filing_text(self, ticker: str, filing_type: str, accession_number: str, text: str) -> str:
+        # Sanitize filing_type for filename (replace "/" with "_")
+        safe_filing_type = filing_type.replace("/", "_")
+        file_path = os.path.join(self.data_dir, f"{ticker}_{safe_filing_type}_{accession_number}.txt")
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return file_path
+
     def fetch_filing(self, ticker: str, filing_type: str = "10-K", 
                     cik: Optional[str] = None, save_to_file: bool = True) -> Optional[FilingResult]:
         """
@@ -487,19 +731,26 @@ class SECAPIClient:
         if not index_url:
             return None
             
+        accession_number = index_url.split('/')[-1].replace('-index.html', '')
+        cached = self._load_processed(accession_number, ticker, filing_type, index_url)
+        if cached:
+            if save_to_file:
+                cached.file_path = self._save_filing_text(ticker, filing_type, accession_number, cached.text)
+            return cached
+            
         documents = self.get_documents_from_index(index_url)
         if not documents:
             logger.warning(f"No documents found for filing {index_url}")
             return None
             
         full_text = ""
-        accession_number = index_url.split('/')[-1].replace('-index.html', '')
-        
+        failed_documents = []  # documents whose text is missing from full_text
+
         try:
             for doc in documents:
                 try:
                     logger.info(f"Fetching document: {doc.filename}")
-                    response = requests.get(doc.url, headers=self.headers)
+                    response = self._get(doc.url)
                     response.raise_for_status()
                     
                     # Add document separator
@@ -513,37 +764,28 @@ class SECAPIClient:
                     filename = doc.filename.lower()
 
                     # Check if this is an XBRL file (contains structured financial data)
-                    is_xbrl_file = (
-                        'xml' in content_type or filename.endswith('.xml')
-                    ) and (
-                        # XBRL instance documents typically have date patterns like 20240930
-                        re.search(r'\d{8}', filename) and
-                        ('htm' in filename or 'xbrl' in filename or '_' in filename)
-                    )
+                    is_xbrl_file = self._is_xbrl_instance(filename, content_type)
 
                     if is_xbrl_file:
                         # Process XBRL XML files - they contain valuable financial data
                         try:
-                            # Parse as XML and extract text content
                             if response.encoding is None:
                                 response.encoding = 'utf-8'
 
-                            xml_content = response.text
-                            # Parse XML and extract all text content
-                            xml_soup = BeautifulSoup(xml_content, 'xml')
-                            # Extract text from all elements, preserving structure
-                            xbrl_text = self._extract_xbrl_text(xml_soup)
+                            # Stream the instance's facts straight from the response bytes
+                            xbrl_text = self._extract_xbrl_text(response.content)
                             full_text += xbrl_text
 
                         except Exception as e:
                             logger.warning(f"Failed to process XBRL file {doc.filename}: {e}")
                             # Fallback: try to extract raw text
                             try:
-                                raw_text = self.clean_text(xml_content)
+                                raw_text = self.clean_text(response.text)
                                 if raw_text.strip():
                                     full_text += raw_text
                             except Exception as e2:
                                 logger.warning(f"Failed to extract raw text from XBRL file {doc.filename}: {e2}")
+                                failed_documents.append(doc.filename)
                                 continue
 
                     elif 'xml' in content_type or filename.endswith('.xml'):
@@ -575,10 +817,12 @@ class SECAPIClient:
                                 full_text += cleaned_text
                             except Exception as e:
                                 logger.warning(f"Failed to decode document {doc.filename}: {e}")
+                                failed_documents.append(doc.filename)
                                 continue
                     
                 except Exception as e:
                     logger.warning(f"Failed to download document {doc.url}: {e}")
+                    failed_documents.append(doc.filename)
                     continue
                     
             if not full_text.strip():
@@ -590,13 +834,9 @@ class SECAPIClient:
             file_path = None
             
             if save_to_file:
-                # Sanitize filing_type for filename (replace "/" with "_")
-                safe_filing_type = filing_type.replace("/", "_")
-                file_path = os.path.join(self.data_dir, f"{ticker}_{safe_filing_type}_{accession_number}.txt")
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(full_text)
+                file_path = self._save_filing_text(ticker, filing_type, accession_number, full_text)
                     
-            return FilingResult(
+            result = FilingResult(
                 ticker=ticker,
                 filing_type=filing_type,
                 filing_date=filing_date,
@@ -604,8 +844,14 @@ class SECAPIClient:
                 text=full_text,
                 file_path=file_path,
                 documents=documents,
-                metadata={'index_url': index_url}
+                metadata={'index_url': index_url, 'failed_documents': failed_documents}
             )
+            # A partial filing (e.g. an exhibit hit a 429) must not be cached as the accession's text
+            if failed_documents:
+                logger.warning(f"Not caching {accession_number}: {len(failed_documents)} document(s) failed")
+            else:
+                self._store_processed(result)
+            return result
             
         except Exception as e:
             logger.error(f"Unexpected error during filing fetch for {ticker}: {e}")
@@ -627,6 +873,42 @@ class SECAPIClient:
         result = self.fetch_filing(ticker, filing_type, cik=cik, save_to_file=False)
         return result.text if result else None
 
+    def get_xbrl_facts_text(self, ticker: str, filing_type: str = "10-Q",
+                            fact_filter: Optional[Callable[[str], bool]] = None,
+                            cik: Optional[str] = None) -> Optional[str]:
+        """
+        Get the text of selected facts from the latest filing's XBRL instance only.
+
+        Downloads the index page and the one instance document instead of
+        every document and exhibit of the filing.
+
+        Args:
+            ticker: Company ticker symbol
+            filing_type: Type of filing
+            fact_filter: Only include facts whose prefixed name it accepts
+            cik: Optional CIK number to use directly
+
+        Returns:
+            Text in the same format as the XBRL part of get_filing_text, or
+            None if the filing has no XBRL instance
+        """
+        index_url = self.get_filing_index_url(ticker, filing_type, cik=cik)
+        if not index_url:
+            return None
+        instance = next((doc for doc in self.get_documents_from_index(index_url)
+                         if self._is_xbrl_instance(doc.filename)), None)
+        if not instance:
+            logger.info(f"No XBRL instance in {filing_type} for {ticker}: {index_url}")
+            return None
+        try:
+            logger.info(f"Fetching XBRL instance: {instance.filename}")
+            response = self._get(instance.url)
+            response.raise_for_status()
+            return self._extract_xbrl_text(response.content, fact_filter)
+        except Exception as e:
+            logger.warning(f"Failed to read XBRL instance {instance.url}: {e}")
+            return None
+
     def get_filing_with_fallback(self, ticker: str, primary_filing_type: str = "10-K", 
                                 fallback_filing_types: List[str] = None, 
                                 cik: Optional[str] = None) -> Optional[FilingResult]:
@@ -715,7 +997,7 @@ class SECAPIClient:
         
         try:
             submissions_url = f"https://data.sec.gov/submissions/CIK{cik}.json"
-            response = requests.get(submissions_url, headers=self.headers)
+            response = self._get(submissions_url)
             response.raise_for_status()
             submissions = response.json()
             
@@ -760,6 +1042,11 @@ class SECAPIClient:
         Returns:
             Filing text content, or None if not found
         """
+        result = self.fetch_filing_by_accession(ticker, accession, filing_type)
+        return result.text if result else None
+
+    def fetch_filing_by_accession(self, ticker: str, accession: str, filing_type: str) -> Optional[FilingResult]:
+        """Like get_filing_by_accession, but returns the FilingResult (text plus document list)."""
         cik = self.get_cik(ticker)
         if not cik:
             return None
@@ -772,14 +1059,29 @@ class SECAPIClient:
             logger.debug(f"Fetching filing by accession: {accession} from {index_url}")
             
             # Use existing method to fetch by index URL
-            result = self.fetch_filing_by_index_url(index_url, ticker, filing_type, save_to_file=False)
-            
-            return result.text if result else None
+            return self.fetch_filing_by_index_url(index_url, ticker, filing_type, save_to_file=False)
             
         except Exception as e:
             logger.error(f"Error fetching filing by accession {accession}: {e}")
             return None
 
+    def get_filing_artifact(self, ticker: str, accession: str, filing_type: str,
+                            filing_date: Optional[str] = None) -> Optional[FilingArtifact]:
+        """
+        Fetch a filing by accession as a FilingArtifact, for reuse across matching and extraction.
+
+        Args:
+            ticker: Company ticker symbol
+            accession: Accession number
+            filing_type: Type of filing (e.g., "424B5")
+            filing_date: Filing date to record on the artifact
+
+        Returns:
+            FilingArtifact, or None if not found
+        """
+        result = self.fetch_filing_by_accession(ticker, accession, filing_type)
+        return FilingArtifact.from_result(result, filing_date) if result else None
+
     def download_filings_by_date_range(self, ticker: str, filing_types: List[str],
                                      months_back: int = 3,
                                      max_results: Optional[int] = None) -> List[str]:
@@ -803,7 +1105,7 @@ class SECAPIClient:
         submissions_url = f"https://data.sec.gov/submissions/CIK{cik}.json"
         
         try:
-            response = requests.get(submissions_url, headers=self.headers)
+            response = self._get(submissions_url)
             response.raise_for_status()
             submissions = response.json()
             
@@ -854,15 +1156,22 @@ class SECAPIClient:
                                   save_to_file: bool = True) -> Optional[FilingResult]:
         """Fetch a filing given a specific index URL, avoiding extra lookups."""
         try:
+            accession_number = index_url.split('/')[-1].replace('-index.html', '')
+            cached = self._load_processed(accession_number, ticker, filing_type, index_url)
+            if cached:
+                if save_to_file:
+                    cached.file_path = self._save_filing_text(ticker, filing_type, accession_number, cached.text)
+                return cached
             documents = self.get_documents_from_index(index_url)
             if not documents:
                 logger.warning(f"No documents found for filing {index_url}")
                 return None
             full_text = ""
+            failed_documents = []  # documents whose text is missing from full_text
             for doc in documents:
                 try:
                     logger.info(f"Fetching document: {doc.filename}")
-                    response = requests.get(doc.url, headers=self.headers)
+                    response = self._get(doc.url)
                     response.raise_for_status()
                     label = doc.filename
                     if doc.exhibit_type:
@@ -872,37 +1181,28 @@ class SECAPIClient:
                     filename = doc.filename.lower()
 
                     # Check if this is an XBRL file (contains structured financial data)
-                    is_xbrl_file = (
-                        'xml' in content_type or filename.endswith('.xml')
-                    ) and (
-                        # XBRL instance documents typically have date patterns like 20240930
-                        re.search(r'\d{8}', filename) and
-                        ('htm' in filename or 'xbrl' in filename or '_' in filename)
-                    )
+                    is_xbrl_file = self._is_xbrl_instance(filename, content_type)
 
                     if is_xbrl_file:
                         # Process XBRL XML files - they contain valuable financial data
                         try:
-                            # Parse as XML and extract text content
                             if response.encoding is None:
                                 response.encoding = 'utf-8'
 
-                            xml_content = response.text
-                            # Parse XML and extract all text content
-                            xml_soup = BeautifulSoup(xml_content, 'xml')
-                            # Extract text from all elements, preserving structure
-                            xbrl_text = self._extract_xbrl_text(xml_soup)
+                            # Stream the instance's facts straight from the response bytes
+                            xbrl_text = self._extract_xbrl_text(response.content)
                             full_text += xbrl_text
 
                         except Exception as e:
                             logger.warning(f"Failed to process XBRL file {doc.filename}: {e}")
                             # Fallback: try to extract raw text
                             try:
-                                raw_text = self.clean_text(xml_content)
+                                raw_text = self.clean_text(response.text)
                                 if raw_text.strip():
                                     full_text += raw_text
                             except Exception as e2:
                                 logger.warning(f"Failed to extract raw text from XBRL file {doc.filename}: {e2}")
+                                failed_documents.append(doc.filename)
                                 continue
 
                     elif 'xml' in content_type or filename.endswith('.xml'):
@@ -920,18 +1220,15 @@ class SECAPIClient:
                         full_text += cleaned_text
                 except Exception as e:
                     logger.warning(f"Failed to download document {doc.url}: {e}")
+                    failed_documents.append(doc.filename)
                     continue
             if not full_text.strip():
                 logger.error(f"Failed to extract any text from filing {index_url}")
                 return None
-            accession_number = index_url.split('/')[-1].replace('-index.html', '')
             file_path = None
             if save_to_file:
-                safe_filing_type = filing_type.replace("/", "_")
-                file_path = os.path.join(self.data_dir, f"{ticker}_{safe_filing_type}_{accession_number}.txt")
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(full_text)
-            return FilingResult(
+                file_path = self._save_filing_text(ticker, filing_type, accession_number, full_text)
+            result = FilingResult(
                 ticker=ticker,
                 filing_type=filing_type,
                 filing_date=date.today().isoformat(),
@@ -939,8 +1236,14 @@ class SECAPIClient:
                 text=full_text,
                 file_path=file_path,
                 documents=documents,
-                metadata={'index_url': index_url}
+                metadata={'index_url': index_url, 'failed_documents': failed_documents}
             )
+            # A partial filing (e.g. an exhibit hit a 429) must not be cached as the accession's text
+            if failed_documents:
+                logger.warning(f"Not caching {accession_number}: {len(failed_documents)} document(s) failed")
+            else:
+                self._store_processed(result)
+            return result
         except Exception as e:
             logger.error(f"Unexpected error during filing fetch by URL for {ticker}: {e}")
             return None
@@ -1019,7 +1322,6 @@ class SECAPIClient:
         Download all non-image, non-XML exhibits for a given filing index URL.
         Returns a list of file paths for the downloaded exhibits.
         """
-        import requests
         from urllib.parse import urljoin
         import os
         exhibit_paths = []
@@ -1032,7 +1334,7 @@ class SECAPIClient:
             if doc.filename.endswith('.xml') or any(doc.filename.endswith(ext) for ext in ['.jpg', '.jpeg', '.png', '.gif']):
                 continue
             try:
-                response = requests.get(doc.url, headers=self.headers)
+                response = self._get(doc.url)
                 response.raise_for_status()
                 # Save to temp_filings with a clear filename
                 ext = '.htm' if doc.filename.endswith('.htm') else '.txt'
@@ -10,9 +10,12 @@ import os
 import json
 import logging
 import re
-from typing import List, Dict, Optional
+import time
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime, date
-from core.sec_api_client import SECAPIClient
+from core.sec_api_client import SECAPIClient, FilingArtifact
+from core.json_stream import iter_json_objects
+from core.llm_accounting import LLMAccountant, estimate_tokens
 from core.models import (
     SecurityFeatures, SecuritiesFeaturesResult, SecurityType, 
     ConversionTerms, RedemptionTerms, SpecialFeatures, Covenants,
@@ -26,7 +29,181 @@ try:
 except ImportError:
         pass
 
-import google.generativeai as genai
+# Instructions and example output shared by the single-filing and batched prompts
+EXTRACTION_INSTRUCTIONS = """        **IMPORTANT INSTRUCTIONS:**
+        - Extract ALL information from the filing content provided below
+        - USE THE PRE-EXTRACTED INFORMATION section above - it contains reliable data found via text analysis
+        - If the pre-extracted information has values for fields, use those as the primary source
+        - Fill in any missing fields by searching the filing text carefully
+        - For preferred stocks, pay special attention to tax treatment and dividend restrictions
+
+        **CRITICAL EXTRACTION TARGETS FOR PREFERRED STOCK:**
+        1. **Dividend Rates**: Use pre-extracted if available, otherwise look for "8.25% Series D", "Series B 7.375%" patterns
+        2. **Original Offering Info**: Use pre-extracted size/price/date if available, verify from filing
+        3. **Tax Treatment**: Use pre-extracted if available, otherwise search for "Tier 1 capital", "qualified dividend", "regulatory capital"
+        4. **Dividend Restrictions**: Use pre-extracted if available, search for "non-cumulative", "dividends not mandatory", "no obligation to pay"
+        5. **Regulatory Capital**: Critical for bank preferreds - search for "qualifies as Tier 1 capital", "additional Tier 1 capital"
+        6. **Covenants**: Extract dividend restrictions, events of default, change of control provisions
+
+        **For PREFERRED SHARES, extract these CRITICAL investment features:**
+
+        **Core Terms:**
+        1. Series name/identifier (e.g., "Series A", "Series B")
+        2. Description (full name like "8.125% Non-Cumulative Preferred Stock, Series A")
+        3. Par value (stated as "$X.XX per share" or "par value $X.XX")
+        4. Liquidation preference (stated as "$X.XX per share" or "liquidation preference $X.XX")
+        
+        **Dividend Features:**
+        5. Dividend rate (fixed or floating) - CRITICAL - extract from title/headers like "7.375% Series B"
+        6. Dividend calculation method (e.g., "360-day year", "actual/360", "quarterly at 8.125% per annum")
+        7. Is cumulative or non-cumulative - SEARCH for "non-cumulative", "cumulative", "dividends not mandatory"
+        8. Dividend stopper clause (restrictions on common dividends if preferred dividends not paid)
+        9. Dividend payment obligations - "may declare dividends", "no obligation to pay", "discretionary dividends"
+        10. Dividend payment schedule (e.g., ["Jan 15","Apr 15","Jul 15","Oct 15"])
+        11. First dividend date (parse to ISO if a date is given) and first dividend amount (numeric)
+
+        **Offering Information:**
+        10. Original offering details: size of offering, offering date, offering price - SEARCH CAREFULLY
+        11. Is this a new issuance or refinancing of existing debt?
+        
+        **Conversion Features:**
+        12. Is convertible to common stock? If yes:
+           - Conversion ratio or price
+           - Conversion type: Choose from ["mandatory", "optional", "change_of_control", "fundamental_change"]
+           - Conversion triggers: List only the trigger types as simple strings (e.g., ["mandatory", "optional"]) - DO NOT include full legal text
+           - Conversion conditions: Brief 1-2 sentence summary of when/how conversion works
+           - Adjustment formulas (anti-dilution provisions)
+           - Earliest conversion date
+           - Share cap (numeric), if a cap like 7.39645 is specified
+        
+        **Redemption/Call Features:**
+        13. Is callable by company? If yes:
+            - Earliest call date
+            - Call price or premium - INCLUDE RELEVANT PARAGRAPH TEXT
+            - Notice period required
+            - Optional vs mandatory redemption
+        14. Holder put rights (can holders force redemption?)
+        
+        **Governance Rights:**
+        15. Voting rights (conditions under which preferred holders can vote)
+        16. Board appointment rights (can elect directors?)
+        17. Protective provisions (veto rights over major decisions like M&A, new senior debt, etc.)
+        
+        **Special Provisions:**
+        18. Change of control provisions (what happens on acquisition) - INCLUDE RELEVANT PARAGRAPH TEXT
+        19. Rate reset terms (for floating rate preferreds)
+        20. Ranking/priority (senior vs junior vs pari passu with other securities)
+        21. Tax treatment notes (qualified dividend status, dividend received deduction) - SEARCH FOR "Tier", "regulatory", "qualified", "dividend received"
+        22. Regulatory capital treatment (Tier 1, additional Tier 1, Tier 2 capital) - CRITICAL for bank preferreds
+        23. Mandatory conversion triggers (e.g., IPO, change of control)
+        24. Sinking fund provisions
+        25. REIT ownership and transfer restrictions (short summary if present)
+
+        **Covenants and Restrictions:**
+        25. Financial covenants: interest coverage ratios, debt-to-EBITDA limits, minimum EBITDA
+        26. Negative covenants: restrictions on dividends, new debt, asset sales, mergers
+        27. Affirmative covenants: reporting requirements, maintenance obligations
+        28. Events of default: payment defaults, bankruptcy, covenant breaches
+        29. Cross-default provisions: default on other debt
+        30. Change of control covenants: what triggers on ownership changes
+        
+        Return ONLY valid JSON (no markdown, no explanations) as a list of securities:
+        [
+          {
+            "security_id": "SOHO Series D Preferred",
+            "security_type": "preferred_stock",
+            "description": "8.25% Series D Cumulative Redeemable Perpetual Preferred Stock",
+            "par_value": 0.01,
+            "liquidation_preference": 25.00,
+            "dividend_rate": 8.25,
+            "dividend_type": "fixed-to-floating",
+            "dividend_calculation_method": "360-day year",
+            "is_cumulative": false,
+            "payment_frequency": "quarterly",
+            "is_perpetual": true,
+
+            "original_offering_size": 109054,
+            "original_offering_date": "2024-06-24",
+            "original_offering_price": 16.0,
+            "is_new_issuance": true,
+            "voting_rights": "Can elect 2 directors if dividends not paid for 6 quarters",
+            "can_elect_directors": true,
+            "director_election_trigger": "6 quarterly dividend periods unpaid",
+            "protective_provisions": ["Amendment requires 2/3 vote", "Senior stock issuance requires 2/3 vote"],
+            "conversion_terms": {
+              "conversion_price": null,
+              "conversion_ratio": null,
+              "is_conditional": true,
+              "conversion_triggers": ["change_of_control"],
+              "earliest_conversion_date": null,
+              "conversion_details": "Holders may convert upon change of control at fundamental change conversion rate"
+            },
+            "redemption_terms": {
+              "is_callable": true,
+              "call_price": 25000.0,
+              "earliest_call_date": "2028-03-30",
+              "notice_period_days": 30,
+              "has_make_whole": false,
+              "redemption_details": null
+            },
+            "special_redemption_events": {
+              "has_rating_agency_event": true,
+              "rating_agency_event_price": 25500.0,
+              "rating_agency_event_window": "90 days after occurrence",
+              "rating_agency_event_definition": "any nationally recognized statistical rating organization lowers rating below investment grade",
+              "has_regulatory_capital_event": true,
+              "regulatory_capital_event_price": 25000.0,
+              "regulatory_capital_event_window": "90 days after occurrence",
+              "regulatory_capital_event_definition": "Company becomes subject to capital requirements such that preferred stock ceases to qualify as Tier 1 capital",
+              "has_tax_event": false,
+              "tax_event_details": null,
+              "tax_treatment_notes": "Qualifies as Tier 1 capital for regulatory purposes. Qualified dividends eligible for 23.8% tax rate for individuals."
+            },
+            "partial_redemption_allowed": true,
+            "rate_reset_terms": {
+              "has_rate_reset": true,
+              "reset_frequency": "5 years",
+              "reset_dates": ["2028-03-30"],
+              "initial_fixed_period_end": "2028-03-30",
+              "reset_spread": 3.728,
+              "reset_benchmark": "Five-year U.S. Treasury Rate",
+              "reset_floor": null,
+              "reset_cap": null
+            },
+            "depositary_shares_info": {
+              "is_depositary_shares": true,
+              "depositary_ratio": "1/1,000th interest",
+              "depositary_shares_issued": 22000000,
+              "underlying_preferred_shares": 22000,
+              "depositary_symbol": "JXN PR A",
+              "depositary_institution": "Equiniti Trust Company",
+              "price_per_depositary_share": 25.0
+            },
+            "ranking": "senior to common stock and junior stock, pari passu with other preferred series",
+            "special_features": {
+              "has_change_of_control": false,
+              "change_of_control_protection": null,
+              "change_of_control_details": null,
+              "has_anti_dilution": false,
+              "has_vwap_pricing": false,
+              "covenants": {
+                "has_financial_covenants": false,
+                "restricted_payments_covenant": "No dividends may be paid on common stock if preferred dividends are in arrears",
+                "events_of_default": ["Payment default", "Bankruptcy", "Covenant breach"],
+                "cross_default_provision": "Default on other debt obligations",
+                "covenant_summary": "Standard preferred stock covenants including dividend restrictions and change of control provisions"
+              }
+            }
+          }
+        ]"""
+
+# Batching of small filings (batch_small_filings): a filing qualifies when its
+# main document is at most BATCH_ITEM_MAX_CHARS; a batch holds up to
+# BATCH_MAX_ITEMS filings and BATCH_MAX_CHARS of filing text (the content
+# budget of one single-filing prompt)
+BATCH_ITEM_MAX_CHARS = 15000
+BATCH_MAX_ITEMS = 6
+BATCH_MAX_CHARS = 60000
 
 # Simple logging setup
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -36,16 +213,28 @@ logger = logging.getLogger(__name__)
 class SecuritiesFeaturesExtractor:
     """Main class for extracting securities features from SEC filings."""
 
-    def __init__(self, google_api_key: str = None):
+    def __init__(self, google_api_key: str = None, stream_responses: bool = True,
+                 accountant: Optional[LLMAccountant] = None, batch_small_filings: bool = False):
         self.sec_client = SECAPIClient()
         self.google_api_key = google_api_key or os.getenv('GOOGLE_API_KEY')
+        self.stream_responses = stream_responses
+        # Pack small filings (pricing supplements) several to a request
+        self.batch_small_filings = batch_small_filings
+        # Token/latency accounting and budgets; pass a shared accountant to budget a whole batch
+        self.accountant = accountant or LLMAccountant()
+        self._model = None
+
+        if not self.google_api_key:
+            logger.warning("No Google API key provided - running in demo mode")
 
-        if self.google_api_key:
+    @property
+    def model(self):
+        """Gemini model, created on first use so demo mode and save-only callers never import the SDK."""
+        if self._model is None and self.google_api_key:
+            import google.generativeai as genai
             genai.configure(api_key=self.google_api_key)
-            self.model = genai.GenerativeModel('gemini-2.0-flash-exp')
-        else:
-            logger.warning("No Google API key provided - running in demo mode")
-            self.model = None
+            self._model = genai.GenerativeModel('gemini-2.0-flash-exp')
+        return self._model
 
     def extract_securities_features(self, ticker: str, matched_filings: List[Dict] = None) -> SecuritiesFeaturesResult:
         """Extract securities features for a given ticker from pre-matched filings."""
@@ -61,14 +250,24 @@ class SecuritiesFeaturesExtractor:
             return SecuritiesFeaturesResult(ticker=ticker, extraction_date=date.today())
 
         securities = []
+        small_filings = []
 
         for filing in matched_filings:
-            # Filing should already have content from matcher
-            filing_content = filing.get('content')
-            if filing_content:
+            # Filings from the matcher already carry their content; others are fetched once here
+            filing_content = self._get_filing_content(filing)
+            if not filing_content:
+                continue
+            batch_content = self._batch_content(filing, filing_content) if self.batch_small_filings else None
+            if batch_content is not None:
+                small_filings.append((ticker, filing, batch_content))
+            else:
                 extracted_securities = self._extract_from_filing(filing_content, filing, ticker)
                 securities.extend(extracted_securities)
 
+        for batch in self._pack_batches(small_filings):
+            for extracted_securities in self.extract_filing_batch(batch):
+                securities.extend(extracted_securities)
+
         # Deduplicate securities - keep the most complete/recent filing for each unique security_id
         unique_securities = {}
         for security in securities:
@@ -106,6 +305,10 @@ class SecuritiesFeaturesExtractor:
         if len(securities) > len(deduplicated_securities):
             logger.info(f"Deduplicated {len(securities)} securities down to {len(deduplicated_securities)}")
 
+        usage = self.accountant.ticker_usage(ticker)
+        if usage.calls or usage.skipped:
+            logger.info(f"{ticker}: {self.accountant.describe(usage)}")
+
         return SecuritiesFeaturesResult(
             ticker=ticker,
             extraction_date=date.today(),
@@ -131,12 +334,18 @@ class SecuritiesFeaturesExtractor:
                        f"{[sec.get('series_name') for sec in known_securities]}")
             
             # Step 2: Match 424B filings to known securities
-            from core.filing_matcher import match_all_filings_to_securities
+            from core.filing_matcher import match_series_to_424b
+            
+            series_names = []
+            for sec in known_securities:
+                series = re.sub(r'^series\s+', '', str(sec.get('series_name') or ''), flags=re.IGNORECASE).strip()
+                if series and series not in series_names:
+                    series_names.append(series)
             
             logger.info(f"Matching 424B filings to securities...")
-            matched_filings = match_all_filings_to_securities(
+            matched_filings = match_series_to_424b(
                 ticker, 
-                known_securities, 
+                series_names, 
                 max_filings=50  # Check up to 50 most recent 424Bs
             )
             
@@ -154,10 +363,13 @@ class SecuritiesFeaturesExtractor:
                     'filingDate': filing['date'],
                     'linkToFilingDetails': filing.get('url', ''),
                     'matched_series': filing['matched_series'],
-                    'security_type': filing['security_type'],
-                    'match_confidence': filing['match_confidence'],
-                    'series_mention_count': filing['series_mention_count'],
-                    'accession': filing['accession']
+                    'security_type': filing.get('security_type'),
+                    'match_confidence': filing.get('match_confidence', ''),
+                    'series_mention_count': filing.get('series_mention_count', 0),
+                    'accession': filing['accession'],
+                    # Carry the matcher's fetched filing so extraction doesn't download it again
+                    'content': filing.get('content'),
+                    'artifact': filing.get('artifact')
                 })
             
             logger.info(f"Matched {len(filings_data)} 424B filings to securities")
@@ -168,10 +380,20 @@ class SecuritiesFeaturesExtractor:
             return []
 
     def _get_filing_content(self, filing: Dict) -> Optional[str]:
-        """Get the content of a filing by accession number."""
+        """
+        Get the content of a filing, fetching it by accession number only if needed.
+
+        Uses the FilingArtifact (or content) the matcher attached; otherwise
+        fetches the filing once and attaches the artifact to the filing dict.
+        """
+        artifact = filing.get('artifact')
+        if isinstance(artifact, FilingArtifact):
+            return artifact.text
+        if filing.get('content'):
+            return filing['content']
         try:
             accession = filing.get('accession')
-            filing_type = filing.get('formType', '')
+            filing_type = filing.get('formType') or filing.get('form', '')
             ticker = filing.get('ticker', '')
             
             if not accession:
@@ -179,9 +401,13 @@ class SecuritiesFeaturesExtractor:
                 return None
             
             # Fetch content using the accession number (not the most recent filing)
-            content = self.sec_client.get_filing_by_accession(ticker, accession, filing_type)
+            artifact = self.sec_client.get_filing_artifact(ticker, accession, filing_type,
+                                                           filing.get('filingDate') or filing.get('date'))
             
-            if content:
+            if artifact:
+                content = artifact.text
+                filing['artifact'] = artifact
+                filing['content'] = content
                 logger.info(f"Fetched {len(content):,} characters from {filing_type} ({accession})")
                 return content
             else:
@@ -562,6 +788,204 @@ class SecuritiesFeaturesExtractor:
             filing_date_obj = date.today()
         
         # Include extracted terms in the prompt
+        extracted_text = self._format_pre_extracted(extracted_rates, extracted_terms)
+
+        prompt = f"""
+        Analyze this {filing_type} filing for {ticker} and extract information about PREFERRED SHARES and other securities.{extracted_text}
+
+        **TARGET SERIES FOCUS:** This filing was specifically matched to Series {target_series}. Extract information PRIMARILY for Series {target_series} preferred stock. If other series are mentioned, only extract them if they are the main subject of this filing.
+
+{EXTRACTION_INSTRUCTIONS}
+
+        Filing content (first 60000 characters):
+        {content[:60000]}
+
+        Return ONLY the JSON array, no other text.
+"""
+        
+        if not self.accountant.has_budget(ticker, estimate_tokens(prompt)):
+            logger.warning(f"{ticker}: LLM token budget exhausted, using regex-only extraction for "
+                           f"{filing_accession or filing_url}")
+            self.accountant.record_skip(ticker)
+            return self._extract_from_key_terms(
+                extracted_terms, target_series, ticker, filing_date_obj, filing_type, filing_url,
+                filing_accession, match_confidence, series_mention_count, extracted_rates
+            )
+
+        securities = []
+        seen_securities = set()  # Track unique securities to avoid duplicates
+        try:
+            # Each security is parsed as soon as its object closes in the response
+            for item in self._generate_security_items(prompt, ticker):
+                try:
+                    security = self._parse_security_data(
+                        item, ticker, filing_date_obj, filing_type, filing_url,
+                        filing_accession, match_confidence, series_mention_count, extracted_rates
+                    )
+                    if not security:
+                        continue
+                    # Create a unique key for this security to detect duplicates
+                    security_key = self._get_security_key(security)
+                    if security_key not in seen_securities:
+                        seen_securities.add(security_key)
+                        securities.append(security)
+                    else:
+                        logger.info(f"Skipping duplicate security: {security.security_id}")
+                except Exception as e:
+                    logger.warning(f"Error parsing security data: {e}")
+
+        except Exception as e:
+            if securities:
+                logger.warning(f"Error extracting from filing after {len(securities)} securities, keeping them: {e}")
+                return securities
+            logger.error(f"Error extracting from filing: {e}")
+            return self._extract_mock_securities(ticker, filing)
+
+        return securities
+
+    def _batch_content(self, filing: Dict, content: str) -> Optional[str]:
+        """
+        The filing's main document if it is small enough to batch, else None.
+
+        Exhibits after the main document (legal opinions, fee tables) are
+        left out when the filing's section layout is known.
+        """
+        artifact = filing.get('artifact')
+        if isinstance(artifact, FilingArtifact) and artifact.sections:
+            main = artifact.sections[0]
+            content = artifact.text[main.start:main.end]
+        content = content.strip()
+        return content if len(content) <= BATCH_ITEM_MAX_CHARS else None
+
+    def _pack_batches(self, items: List[Tuple[str, Dict, str]]) -> List[List[Tuple[str, Dict, str]]]:
+        """Group (ticker, filing, content) items into batches within BATCH_MAX_ITEMS / BATCH_MAX_CHARS."""
+        batches = []
+        current, size = [], 0
+        for item in items:
+            if current and (len(current) >= BATCH_MAX_ITEMS or size + len(item[2]) > BATCH_MAX_CHARS):
+                batches.append(current)
+                current, size = [], 0
+            current.append(item)
+            size += len(item[2])
+        if current:
+            batches.append(current)
+        return batches
+
+    def _filing_metadata(self, filing: Dict) -> Dict:
+        """Per-filing keyword arguments for _parse_security_data."""
+        try:
+            filing_date_obj = datetime.strptime(filing.get('filingDate', ''), '%Y-%m-%d').date()
+        except ValueError:
+            filing_date_obj = date.today()
+        return {
+            'filing_date': filing_date_obj,
+            'filing_type': filing.get('formType', 'Unknown'),
+            'filing_url': filing.get('url', filing.get('linkToFilingDetails', '')),
+            'filing_accession': filing.get('accession', ''),
+            'match_confidence': filing.get('match_confidence', ''),
+            'series_mention_count': filing.get('series_mention_count', 0),
+        }
+
+    def extract_filing_batch(self, items: List[Tuple[str, Dict, str]]) -> List[List[SecurityFeatures]]:
+        """
+        Extract securities from several small filings with one LLM request.
+
+        Each filing goes into the prompt under its own id ("f1", "f2", ...)
+        with its issuer, target series and pre-extracted terms; the
+        instructions are sent once. The model tags every security with the
+        id of its filing, which routes it back. Filings the response leaves
+        without securities (or a failed request) fall back to a request of
+        their own.
+
+        Args:
+            items: (ticker, filing, content) per filing; the issuers may differ
+
+        Returns:
+            Securities for each item, in the order given
+        """
+        if len(items) == 1 or not self.model:
+            return [self._extract_from_filing(content, filing, ticker) for ticker, filing, content in items]
+
+        parse_args = []
+        sections = ""
+        for n, (ticker, filing, content) in enumerate(items, 1):
+            extracted_rates = self._extract_dividend_rates_from_text(content)
+            extracted_terms = self._extract_key_terms_from_text(content)
+            metadata = self._filing_metadata(filing)
+            target_series = filing.get('matched_series', [''])[0]
+            parse_args.append((ticker, extracted_rates, extracted_terms, target_series, metadata))
+            sections += f"""
+        === FILING f{n} ===
+        Issuer: {ticker}
+        Form: {metadata['filing_type']}, filed {filing.get('filingDate', '')}
+        Target series: Series {target_series}{self._format_pre_extracted(extracted_rates, extracted_terms)}
+
+        Filing content:
+        {content}
+        === END FILING f{n} ===
+"""
+
+        prompt = f"""
+        Analyze each of the {len(items)} SEC filings below and extract information about PREFERRED SHARES and other securities.
+
+        Every filing is delimited by "=== FILING <id> ===" and "=== END FILING <id> ===" and has its own issuer, target series and pre-extracted information. Treat the filings independently: report each security only from the filing it appears in, using only that filing's text and pre-extracted information.
+
+        **TARGET SERIES FOCUS:** Each filing was specifically matched to the series in its header. Extract information PRIMARILY for that series. If other series are mentioned, only extract them if they are the main subject of that filing.
+
+{EXTRACTION_INSTRUCTIONS}
+
+        **BATCH OUTPUT:** Return ONE flat JSON array covering all filings. Every security object MUST include "filing_id" set to the id of the filing it came from (e.g. "f1").
+{sections}
+        Return ONLY the JSON array, no other text.
+"""
+
+        account = ','.join(sorted({ticker for ticker, _, _ in items}))
+        if not self.accountant.has_budget(account, estimate_tokens(prompt)):
+            logger.warning(f"{account}: LLM token budget exhausted, using regex-only extraction for {len(items)} filings")
+            self.accountant.record_skip(account)
+            return [
+                self._extract_from_key_terms(extracted_terms, target_series, ticker,
+                                             extracted_rates=extracted_rates, **metadata)
+                for ticker, extracted_rates, extracted_terms, target_series, metadata in parse_args
+            ]
+
+        logger.info(f"Extracting {len(items)} small filings in one request ({account})")
+        results: List[List[SecurityFeatures]] = [[] for _ in items]
+        seen = [set() for _ in items]
+        try:
+            for item in self._generate_security_items(prompt, account):
+                index = self._batch_index(item.pop('filing_id', None), len(items))
+                if index is None:
+                    logger.warning(f"Dropping security without a valid filing_id: {item.get('security_id')}")
+                    continue
+                ticker, extracted_rates, _, _, metadata = parse_args[index]
+                security = self._parse_security_data(item, ticker, extracted_rates=extracted_rates, **metadata)
+                if not security:
+                    continue
+                security_key = self._get_security_key(security)
+                if security_key not in seen[index]:
+                    seen[index].add(security_key)
+                    results[index].append(security)
+        except Exception as e:
+            logger.warning(f"Batched extraction of {len(items)} filings stopped early: {e}")
+
+        for n, (ticker, filing, content) in enumerate(items):
+            if not results[n]:
+                logger.info(f"No securities for {ticker} {filing.get('accession', '')} in batch response, extracting it alone")
+                results[n] = self._extract_from_filing(content, filing, ticker)
+        return results
+
+    @staticmethod
+    def _batch_index(filing_id, count: int) -> Optional[int]:
+        """Index of the batch item a "filing_id" like "f2" refers to."""
+        try:
+            index = int(str(filing_id).strip().lower().lstrip('f')) - 1
+        except ValueError:
+            return None
+        return index if 0 <= index < count else None
+
+    def _format_pre_extracted(self, extracted_rates: Dict[str, float], extracted_terms: Dict[str, Dict]) -> str:
+        """PRE-EXTRACTED INFORMATION block for a prompt, from the regex-extracted terms."""
         extracted_text = ""
         if extracted_rates or extracted_terms:
             extracted_text = "\n\nPRE-EXTRACTED INFORMATION (from text analysis):"
@@ -595,222 +1019,77 @@ class SecuritiesFeaturesExtractor:
                     extracted_text += f" listing_status: {terms['listing_status']}"
                 if 'ownership_restrictions' in terms:
                     extracted_text += f" ownership_restrictions: {terms['ownership_restrictions']}"
+        return extracted_text
 
-        prompt = f"""
-        Analyze this {filing_type} filing for {ticker} and extract information about PREFERRED SHARES and other securities.{extracted_text}
-
-        **TARGET SERIES FOCUS:** This filing was specifically matched to Series {target_series}. Extract information PRIMARILY for Series {target_series} preferred stock. If other series are mentioned, only extract them if they are the main subject of this filing.
-
-        **IMPORTANT INSTRUCTIONS:**
-        - Extract ALL information from the filing content provided below
-        - USE THE PRE-EXTRACTED INFORMATION section above - it contains reliable data found via text analysis
-        - If the pre-extracted information has values for fields, use those as the primary source
-        - Fill in any missing fields by searching the filing text carefully
-        - For preferred stocks, pay special attention to tax treatment and dividend restrictions
-
-        **CRITICAL EXTRACTION TARGETS FOR PREFERRED STOCK:**
-        1. **Dividend Rates**: Use pre-extracted if available, otherwise look for "8.25% Series D", "Series B 7.375%" patterns
-        2. **Original Offering Info**: Use pre-extracted size/price/date if available, verify from filing
-        3. **Tax Treatment**: Use pre-extracted if available, otherwise search for "Tier 1 capital", "qualified dividend", "regulatory capital"
-        4. **Dividend Restrictions**: Use pre-extracted if available, search for "non-cumulative", "dividends not mandatory", "no obligation to pay"
-        5. **Regulatory Capital**: Critical for bank preferreds - search for "qualifies as Tier 1 capital", "additional Tier 1 capital"
-        6. **Covenants**: Extract dividend restrictions, events of default, change of control provisions
-
-        **For PREFERRED SHARES, extract these CRITICAL investment features:**
-
-        **Core Terms:**
-        1. Series name/identifier (e.g., "Series A", "Series B")
-        2. Description (full name like "8.125% Non-Cumulative Preferred Stock, Series A")
-        3. Par value (stated as "$X.XX per share" or "par value $X.XX")
-        4. Liquidation preference (stated as "$X.XX per share" or "liquidation preference $X.XX")
-        
-        **Dividend Features:**
-        5. Dividend rate (fixed or floating) - CRITICAL - extract from title/headers like "7.375% Series B"
-        6. Dividend calculation method (e.g., "360-day year", "actual/360", "quarterly at 8.125% per annum")
-        7. Is cumulative or non-cumulative - SEARCH for "non-cumulative", "cumulative", "dividends not mandatory"
-        8. Dividend stopper clause (restrictions on common dividends if preferred dividends not paid)
-        9. Dividend payment obligations - "may declare dividends", "no obligation to pay", "discretionary dividends"
-        10. Dividend payment schedule (e.g., ["Jan 15","Apr 15","Jul 15","Oct 15"])
-        11. First dividend date (parse to ISO if a date is given) and first dividend amount (numeric)
-
-        **Offering Information:**
-        10. Original offering details: size of offering, offering date, offering price - SEARCH CAREFULLY
-        11. Is this a new issuance or refinancing of existing debt?
-        
-        **Conversion Features:**
-        12. Is convertible to common stock? If yes:
-           - Conversion ratio or price
-           - Conversion type: Choose from ["mandatory", "optional", "change_of_control", "fundamental_change"]
-           - Conversion triggers: List only the trigger types as simple strings (e.g., ["mandatory", "optional"]) - DO NOT include full legal text
-           - Conversion conditions: Brief 1-2 sentence summary of when/how conversion works
-           - Adjustment formulas (anti-dilution provisions)
-           - Earliest conversion date
-           - Share cap (numeric), if a cap like 7.39645 is specified
-        
-        **Redemption/Call Features:**
-        13. Is callable by company? If yes:
-            - Earliest call date
-            - Call price or premium - INCLUDE RELEVANT PARAGRAPH TEXT
-            - Notice period required
-            - Optional vs mandatory redemption
-        14. Holder put rights (can holders force redemption?)
-        
-        **Governance Rights:**
-        15. Voting rights (conditions under which preferred holders can vote)
-        16. Board appointment rights (can elect directors?)
-        17. Protective provisions (veto rights over major decisions like M&A, new senior debt, etc.)
-        
-        **Special Provisions:**
-        18. Change of control provisions (what happens on acquisition) - INCLUDE RELEVANT PARAGRAPH TEXT
-        19. Rate reset terms (for floating rate preferreds)
-        20. Ranking/priority (senior vs junior vs pari passu with other securities)
-        21. Tax treatment notes (qualified dividend status, dividend received deduction) - SEARCH FOR "Tier", "regulatory", "qualified", "dividend received"
-        22. Regulatory capital treatment (Tier 1, additional Tier 1, Tier 2 capital) - CRITICAL for bank preferreds
-        23. Mandatory conversion triggers (e.g., IPO, change of control)
-        24. Sinking fund provisions
-        25. REIT ownership and transfer restrictions (short summary if present)
-
-        **Covenants and Restrictions:**
-        25. Financial covenants: interest coverage ratios, debt-to-EBITDA limits, minimum EBITDA
-        26. Negative covenants: restrictions on dividends, new debt, asset sales, mergers
-        27. Affirmative covenants: reporting requirements, maintenance obligations
-        28. Events of default: payment defaults, bankruptcy, covenant breaches
-        29. Cross-default provisions: default on other debt
-        30. Change of control covenants: what triggers on ownership changes
-        
-        Return ONLY valid JSON (no markdown, no explanations) as a list of securities:
-        [
-          {{
-            "security_id": "SOHO Series D Preferred",
-            "security_type": "preferred_stock",
-            "description": "8.25% Series D Cumulative Redeemable Perpetual Preferred Stock",
-            "par_value": 0.01,
-            "liquidation_preference": 25.00,
-            "dividend_rate": 8.25,
-            "dividend_type": "fixed-to-floating",
-            "dividend_calculation_method": "360-day year",
-            "is_cumulative": false,
-            "payment_frequency": "quarterly",
-            "is_perpetual": true,
+    def _generate_security_items(self, prompt: str, ticker: str):
+        """
+        Security objects from the model's JSON array response, as they complete.
 
-            "original_offering_size": 109054,
-            "original_offering_date": "2024-06-24",
-            "original_offering_price": 16.0,
-            "is_new_issuance": true,
-            "voting_rights": "Can elect 2 directors if dividends not paid for 6 quarters",
-            "can_elect_directors": true,
-            "director_election_trigger": "6 quarterly dividend periods unpaid",
-            "protective_provisions": ["Amendment requires 2/3 vote", "Senior stock issuance requires 2/3 vote"],
-            "conversion_terms": {{
-              "conversion_price": null,
-              "conversion_ratio": null,
-              "is_conditional": true,
-              "conversion_triggers": ["change_of_control"],
-              "earliest_conversion_date": null,
-              "conversion_details": "Holders may convert upon change of control at fundamental change conversion rate"
-            }},
-            "redemption_terms": {{
-              "is_callable": true,
-              "call_price": 25000.0,
-              "earliest_call_date": "2028-03-30",
-              "notice_period_days": 30,
-              "has_make_whole": false,
-              "redemption_details": null
-            }},
-            "special_redemption_events": {{
-              "has_rating_agency_event": true,
-              "rating_agency_event_price": 25500.0,
-              "rating_agency_event_window": "90 days after occurrence",
-              "rating_agency_event_definition": "any nationally recognized statistical rating organization lowers rating below investment grade",
-              "has_regulatory_capital_event": true,
-              "regulatory_capital_event_price": 25000.0,
-              "regulatory_capital_event_window": "90 days after occurrence",
-              "regulatory_capital_event_definition": "Company becomes subject to capital requirements such that preferred stock ceases to qualify as Tier 1 capital",
-              "has_tax_event": false,
-              "tax_event_details": null,
-              "tax_treatment_notes": "Qualifies as Tier 1 capital for regulatory purposes. Qualified dividends eligible for 23.8% tax rate for individuals."
-            }},
-            "partial_redemption_allowed": true,
-            "rate_reset_terms": {{
-              "has_rate_reset": true,
-              "reset_frequency": "5 years",
-              "reset_dates": ["2028-03-30"],
-              "initial_fixed_period_end": "2028-03-30",
-              "reset_spread": 3.728,
-              "reset_benchmark": "Five-year U.S. Treasury Rate",
-              "reset_floor": null,
-              "reset_cap": null
-            }},
-            "depositary_shares_info": {{
-              "is_depositary_shares": true,
-              "depositary_ratio": "1/1,000th interest",
-              "depositary_shares_issued": 22000000,
-              "underlying_preferred_shares": 22000,
-              "depositary_symbol": "JXN PR A",
-              "depositary_institution": "Equiniti Trust Company",
-              "price_per_depositary_share": 25.0
-            }},
-            "ranking": "senior to common stock and junior stock, pari passu with other preferred series",
-            "special_features": {{
-              "has_change_of_control": false,
-              "change_of_control_protection": null,
-              "change_of_control_details": null,
-              "has_anti_dilution": false,
-              "has_vwap_pricing": false,
-              "covenants": {{
-                "has_financial_covenants": false,
-                "restricted_payments_covenant": "No dividends may be paid on common stock if preferred dividends are in arrears",
-                "events_of_default": ["Payment default", "Bankruptcy", "Covenant breach"],
-                "cross_default_provision": "Default on other debt obligations",
-                "covenant_summary": "Standard preferred stock covenants including dividend restrictions and change of control provisions"
-              }}
-            }}
-          }}
-        ]
+        With stream_responses the response is consumed chunk by chunk, so the
+        first securities are available before generation finishes and a
+        malformed or truncated tail only loses the objects it contains.
+        The call is recorded with the accountant once the response ends.
+        """
+        started = time.perf_counter()
+        received = {'chars': 0, 'usage': None}
 
-        Filing content (first 60000 characters):
-        {content[:60000]}
+        def chunks():
+            if self.stream_responses:
+                responses = self.model.generate_content(prompt, stream=True)
+            else:
+                responses = [self.model.generate_content(prompt)]
+            for response in responses:
+                # Usage metadata is complete on the last chunk of a stream
+                received['usage'] = getattr(response, 'usage_metadata', None) or received['usage']
+                text = response.text
+                received['chars'] += len(text)
+                yield text
 
-        Return ONLY the JSON array, no other text.
-"""
-        
         try:
-            response = self.model.generate_content(prompt)
-            result_text = response.text.strip()
-
-            # Extract JSON from response
-            if '```json' in result_text:
-                result_text = result_text.split('```json')[1].split('```')[0]
-            elif '```' in result_text:
-                result_text = result_text.split('```')[1]
-
-            data = json.loads(result_text)
-
-            securities = []
-            seen_securities = set()  # Track unique securities to avoid duplicates
-
-            for item in data:
-                try:
-                    security = self._parse_security_data(
-                        item, ticker, filing_date_obj, filing_type, filing_url,
-                        filing_accession, match_confidence, series_mention_count, extracted_rates
-                    )
-                    if security:
-                        # Create a unique key for this security to detect duplicates
-                        security_key = self._get_security_key(security)
-                        if security_key not in seen_securities:
-                            seen_securities.add(security_key)
-                            securities.append(security)
-                    else:
-                        logger.info(f"Skipping duplicate security: {security.security_id}")
-                except Exception as e:
-                    logger.warning(f"Error parsing security data: {e}")
-
-            return securities
-            
-        except Exception as e:
-            logger.error(f"Error extracting from filing: {e}")
-            return self._extract_mock_securities(ticker, filing)
+            yield from iter_json_objects(chunks())
+        finally:
+            self.accountant.record_call(ticker, len(prompt), received['chars'],
+                                        time.perf_counter() - started, received['usage'])
+
+    def _extract_from_key_terms(
+        self, extracted_terms: Dict[str, Dict], target_series: str, ticker: str, filing_date: date,
+        filing_type: str, filing_url: str = "", filing_accession: str = "", match_confidence: str = "",
+        series_mention_count: int = 0, extracted_rates: Dict[str, float] = None
+    ) -> List[SecurityFeatures]:
+        """Build securities from the regex-extracted terms alone (no LLM call)."""
+        series_list = [target_series] if target_series in extracted_terms else sorted(extracted_terms)
+        securities = []
+        for series in series_list:
+            terms = extracted_terms[series]
+            item = {
+                'security_id': f"{ticker} Series {series} Preferred",
+                'series_name': series,
+                'security_type': 'preferred_stock',
+                'description': 'Extracted from filing text without LLM (token budget exhausted)',
+                'dividend_rate': terms.get('dividend_rate'),
+                'par_value': terms.get('par_value'),
+                'liquidation_preference': terms.get('liquidation_preference'),
+                'payment_frequency': terms.get('payment_frequency'),
+                'dividend_payment_schedule': terms.get('dividend_payment_schedule', []),
+                'first_dividend_date': terms.get('first_dividend_date'),
+                'first_dividend_amount': terms.get('first_dividend_amount'),
+                'dividend_stopper_clause': terms.get('dividend_restrictions'),
+                'original_offering_size': terms.get('offering_size'),
+                'original_offering_price': terms.get('offering_price'),
+                'original_offering_date': terms.get('offering_date'),
+                'exchange_listed': terms.get('exchange_listed'),
+                'trading_symbol': terms.get('trading_symbol'),
+                'listing_status': terms.get('listing_status'),
+                'ownership_restrictions': terms.get('ownership_restrictions'),
+            }
+            security = self._parse_security_data(
+                item, ticker, filing_date, filing_type, filing_url,
+                filing_accession, match_confidence, series_mention_count, extracted_rates
+            )
+            if security:
+                security.extraction_confidence = 0.5
+                securities.append(security)
+        return securities
 
     def _parse_security_data(
         self, data: Dict, ticker: str, filing_date: date, filing_type: str,
@@ -1265,26 +1544,23 @@ def extract_securities_features(ticker: str, api_key: str = None, matched_filing
     return extractor.extract_securities_features(ticker, matched_filings)
 
 
-def extract_preferred_stocks_simple(ticker: str, api_key: str = None) -> SecuritiesFeaturesResult:
+def find_preferred_series(ticker: str, client: Optional[SECAPIClient] = None) -> List[str]:
     """
-    Simplified preferred stock extraction pipeline:
+    Find preferred stock series letters mentioned in the latest 10-Q.
 
-    1. Get basic data from 10-Q (series names, outstanding shares)
-    2. Find matching 424B filings via simple regex
-    3. Extract detailed features from matched 424Bs
-    """
-    logger.info(f"Starting simplified preferred stock extraction for {ticker}")
+    Args:
+        ticker: Company ticker
+        client: SEC client to reuse (a new one is created if omitted)
 
-    # Step 1: Get series names from 10-Q via simple regex
-    client = SECAPIClient()
+    Returns:
+        Series letters (e.g. ["A", "C"]); empty if no 10-Q or no series found
+    """
+    client = client or SECAPIClient()
     filing_content = client.get_filing_text(ticker, '10-Q')
 
     if not filing_content:
         logger.warning(f"No 10-Q filing found for {ticker}")
-        return SecuritiesFeaturesResult(ticker=ticker, extraction_date=date.today())
-
-    # Simple regex to find preferred stock series in 10-Q
-    import re
+        return []
 
     # Look for specific patterns: "Series X Preferred Stock" where X is a single letter
     series_pattern = r'Series\s+([A-Z])\s+Preferred\s+Stock'
@@ -1300,7 +1576,22 @@ def extract_preferred_stocks_simple(ticker: str, api_key: str = None) -> Securit
 
     # Combine and deduplicate series names (only single letters)
     all_matches = series_matches + reverse_matches + combined_matches
-    series_names = list(set([match for match in all_matches if len(match) == 1 and match.isalpha()]))
+    return list(set([match for match in all_matches if len(match) == 1 and match.isalpha()]))
+
+
+def extract_preferred_stocks_simple(ticker: str, api_key: str = None) -> SecuritiesFeaturesResult:
+    """
+    Simplified preferred stock extraction pipeline:
+
+    1. Get basic data from 10-Q (series names, outstanding shares)
+    2. Find matching 424B filings via simple regex
+    3. Extract detailed features from matched 424Bs
+    """
+    logger.info(f"Starting simplified preferred stock extraction for {ticker}")
+
+    # Step 1: Get series names from 10-Q via simple regex
+    client = SECAPIClient()
+    series_names = find_preferred_series(ticker, client)
 
     if not series_names:
         logger.warning(f"No preferred stock series found in 10-Q for {ticker}")
@@ -1310,7 +1601,7 @@ def extract_preferred_stocks_simple(ticker: str, api_key: str = None) -> Securit
 
     # Step 2: Find matching 424B filings
     from core.filing_matcher import match_series_to_424b
-    matched_filings = match_series_to_424b(ticker, series_names, max_filings=20)
+    matched_filings = match_series_to_424b(ticker, series_names, max_filings=20, client=client)
 
     if not matched_filings:
         logger.warning(f"No matching 424B filings found for {ticker}")
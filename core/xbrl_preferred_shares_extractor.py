@@ -19,6 +19,15 @@ from core.models import XBRLPreferredSharesData, XBRLSummary, DataFusionResult
 
 logger = logging.getLogger(__name__)
 
+# XBRL facts that identify preferred series: PreferredStock* concepts, series
+# and dividend terms, and dei security descriptions (Security12bTitle etc.)
+PREFERRED_FACT_KEYWORDS = ('preferred', 'series', 'depositary', 'liquidation', 'dividend')
+
+
+def is_preferred_fact(name: str) -> bool:
+    """Whether an XBRL fact name is relevant to preferred series identification."""
+    return name.startswith('dei:') or any(keyword in name.lower() for keyword in PREFERRED_FACT_KEYWORDS)
+
 
 class XBRLPreferredSharesExtractor:
     """Extracts ONLY investment-relevant preferred shares data from XBRL filings."""
@@ -43,12 +52,22 @@ class XBRLPreferredSharesExtractor:
         logger.info(f"Extracting investment-relevant preferred shares data for {ticker}")
 
         try:
-            filing_content = self.sec_client.get_filing_text(ticker, '10-Q')
-            if not filing_content:
-                return {"error": "No 10-Q filing found", "ticker": ticker}
-
-            # Extract only investment-relevant data
-            investment_data = self.extractor.extract_investment_relevant_data(filing_content)
+            # Fast path: preferred-stock facts from the 10-Q's XBRL instance alone
+            source = "xbrl_instance"
+            investment_data = []
+            facts_text = self.sec_client.get_xbrl_facts_text(ticker, '10-Q', fact_filter=is_preferred_fact)
+            if facts_text:
+                investment_data = self.extractor.extract_investment_relevant_data(facts_text)
+
+            if not investment_data:
+                # Nothing structured: fall back to the full text of every document
+                source = "full_text"
+                filing_content = self.sec_client.get_filing_text(ticker, '10-Q')
+                if not filing_content:
+                    return {"error": "No 10-Q filing found", "ticker": ticker}
+
+                # Extract only investment-relevant data
+                investment_data = self.extractor.extract_investment_relevant_data(filing_content)
 
             # Group by security (series/CUSIP combination)
             securities = self.processor.group_investment_data(investment_data)
@@ -56,6 +75,7 @@ class XBRLPreferredSharesExtractor:
             return {
                 "ticker": ticker,
                 "filing_type": "10-Q",
+                "source": source,
                 "extraction_date": date.today().isoformat(),
                 "securities_found": len(securities),
                 "securities": securities,
@@ -7,14 +7,30 @@ Simple FastAPI backend for securities features and corporate actions extraction.
 
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import os
+import json
+import asyncio
 import logging
 from datetime import date
 
-from core.securities_features_extractor import extract_securities_features, SecuritiesFeaturesResult
-from core.corporate_actions_extractor import extract_corporate_actions, CorporateActionsResult
-from core.xbrl_preferred_shares_extractor import extract_xbrl_preferred_shares
+from core.models import (
+    SecurityType, CorporateActionType, CorporateActionStatus,
+    ConversionTerms, RedemptionTerms, SpecialFeatures,
+)
+
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse as FastJSONResponse
+except ImportError:
+    orjson = None
+    from fastapi.responses import JSONResponse as FastJSONResponse
+
+# Extractors are imported inside the endpoints that use them, so startup
+# doesn't pay for the SEC client, LLM SDK or XBRL stack until first request.
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -24,7 +40,8 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="SEC Securities API",
     description="API for extracting securities features and corporate actions from SEC filings",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
 
 # Add CORS middleware
@@ -46,6 +63,86 @@ class ExtractionResponse(BaseModel):
     message: str
     result: Optional[dict] = None
 
+class BatchExtractionRequest(BaseModel):
+    tickers: List[str]
+    api_key: Optional[str] = None
+    use_stored: bool = True        # stream saved results from output/llm instead of re-extracting
+    compute_missing: bool = True   # extract tickers with no saved result (False: report them as missing)
+
+# GET response models. Handlers build these from the extractor results and
+# serialize them in one pass (pydantic-core), skipping jsonable_encoder.
+class SecuritySummary(BaseModel):
+    security_id: str
+    security_type: SecurityType
+    principal_amount: Optional[float] = None
+    interest_rate: Optional[float] = None
+    maturity_date: Optional[date] = None
+    conversion_terms: Optional[ConversionTerms] = None
+    redemption_terms: Optional[RedemptionTerms] = None
+    special_features: Optional[SpecialFeatures] = None
+
+class SecuritiesResponse(BaseModel):
+    ticker: str
+    extraction_date: date
+    total_securities: int
+    securities: List[SecuritySummary]
+
+class CorporateActionSummary(BaseModel):
+    action_id: str
+    action_type: CorporateActionType
+    title: str
+    description: str
+    announcement_date: Optional[date] = None
+    status: CorporateActionStatus
+    amount: Optional[float] = None
+    target_security: Optional[str] = None
+
+class CorporateActionsResponse(BaseModel):
+    ticker: str
+    extraction_date: date
+    total_actions: int
+    corporate_actions: List[CorporateActionSummary]
+
+class XBRLSummaryResponse(BaseModel):
+    has_preferred_shares: bool = False
+    xbrl_tags_found: int = 0
+    series_identified: List[Any] = []
+    cusips_identified: List[Any] = []
+    data_quality_score: float = 0.0
+    total_mentioned: int = 0
+
+class XBRLDataResponse(BaseModel):
+    ticker: str
+    filing_type: str = "10-Q"
+    extraction_date: Optional[str] = None
+    xbrl_available: bool = False
+    summary: XBRLSummaryResponse
+    tag_distribution: Dict[str, Any] = {}
+    numeric_values_found: List[Any] = []
+
+def _dumps(obj: Any) -> bytes:
+    """Compact JSON bytes (orjson when installed)."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str)
+    return json.dumps(obj, default=str, separators=(',', ':')).encode('utf-8')
+
+def _model_response(model: BaseModel) -> Response:
+    return Response(content=model.model_dump_json(), media_type="application/json")
+
+# Securities results saved by SecuritiesFeaturesExtractor.save_results
+SECURITIES_OUTPUT_DIR = "output/llm"
+
+# Batch extractions run here; a ticker already being extracted (by any batch)
+# with the same API key is awaited rather than started again. Requests with a
+# different key never share a result, so one caller's key can't serve another.
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "4"))
+_batch_executor = ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix="batch")
+_inflight_extractions: Dict[Tuple[str, Optional[str]], asyncio.Future] = {}
+
+# Saved results serialized once and served as bytes until the file changes:
+# ticker -> ((mtime_ns, size), compact JSON)
+_stored_payloads: Dict[str, Tuple[Tuple[int, int], bytes]] = {}
+
 @app.get("/")
 async def root():
     """Root endpoint - API status"""
@@ -56,6 +153,8 @@ async def root():
             "securities": "/extract/securities/{ticker}",
             "actions": "/extract/actions/{ticker}",
             "xbrl": "/extract/xbrl/{ticker}",
+            "batch": "/extract/batch",
+            "stored": "/results/securities/{ticker}",
             "health": "/health"
         }
     }
@@ -71,10 +170,10 @@ async def extract_securities(request: ExtractionRequest, background_tasks: Backg
     try:
         logger.info(f"Extracting securities features for {request.ticker}")
 
+        from core.securities_features_extractor import extract_securities_features, SecuritiesFeaturesExtractor
         result = extract_securities_features(request.ticker, request.api_key)
 
         # Save LLM data to organized directory
-        from core.securities_features_extractor import SecuritiesFeaturesExtractor
         extractor = SecuritiesFeaturesExtractor(request.api_key)
         extractor.save_results(result)
 
@@ -88,16 +187,105 @@ async def extract_securities(request: ExtractionRequest, background_tasks: Backg
         logger.error(f"Error extracting securities for {request.ticker}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def _stored_securities_payload(ticker: str) -> Optional[bytes]:
+    """
+    Saved securities result for a ticker as compact JSON, if there is one.
+
+    The file is parsed and re-serialized only when its mtime or size
+    changes; otherwise the cached bytes are returned as they are.
+    """
+    path = os.path.join(SECURITIES_OUTPUT_DIR, f"{ticker}_securities_features.json")
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _stored_payloads.get(ticker)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    try:
+        with open(path, 'rb') as f:
+            payload = _dumps(json.loads(f.read()))
+    except (OSError, ValueError):
+        return None
+    _stored_payloads[ticker] = (key, payload)
+    return payload
+
+def _compute_securities(ticker: str, api_key: Optional[str]) -> dict:
+    """Extract and save securities features for a ticker (runs in the batch executor)."""
+    from core.securities_features_extractor import extract_securities_features, SecuritiesFeaturesExtractor
+    result = extract_securities_features(ticker, api_key)
+    SecuritiesFeaturesExtractor(api_key).save_results(result, SECURITIES_OUTPUT_DIR)
+    return result.dict()
+
+def _shared_extraction(ticker: str, api_key: Optional[str]) -> asyncio.Future:
+    """The in-flight extraction for a ticker and API key, starting one if none is running."""
+    key = (ticker, api_key)
+    future = _inflight_extractions.get(key)
+    if future is None:
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(_batch_executor, _compute_securities, ticker, api_key)
+        _inflight_extractions[key] = future
+        future.add_done_callback(lambda _: _inflight_extractions.pop(key, None))
+    return future
+
+async def _batch_item(ticker: str, api_key: Optional[str]) -> dict:
+    try:
+        # Shielded so a client disconnecting doesn't cancel work other batches share
+        result = await asyncio.shield(_shared_extraction(ticker, api_key))
+        return {"ticker": ticker, "status": "computed", "result": result}
+    except Exception as e:
+        logger.error(f"Error extracting securities for {ticker} in batch: {e}")
+        return {"ticker": ticker, "status": "error", "error": str(e)}
+
+@app.post("/extract/batch")
+async def extract_batch(request: BatchExtractionRequest):
+    """
+    Extract securities features for many tickers, streamed as NDJSON.
+
+    One JSON object per line, in completion order: saved results first
+    ("stored"), then fresh extractions as they finish ("computed"), with
+    "error" or "missing" lines for tickers that produced no result.
+    """
+    tickers = list(dict.fromkeys(t.strip().upper() for t in request.tickers if t.strip()))
+    if not tickers:
+        raise HTTPException(status_code=400, detail="No tickers given")
+    logger.info(f"Batch extraction for {len(tickers)} tickers")
+
+    async def stream():
+        to_compute = []
+        for ticker in tickers:
+            stored = _stored_securities_payload(ticker) if request.use_stored else None
+            if stored is not None:
+                yield b'{"ticker":' + _dumps(ticker) + b',"status":"stored","result":' + stored + b'}\n'
+            elif request.compute_missing:
+                to_compute.append(ticker)
+            else:
+                yield _dumps({"ticker": ticker, "status": "missing"}) + b"\n"
+
+        for item in asyncio.as_completed([_batch_item(t, request.api_key) for t in to_compute]):
+            yield _dumps(await item) + b"\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@app.get("/results/securities/{ticker}")
+async def get_stored_securities(ticker: str):
+    """Saved securities result for a ticker, without re-extracting"""
+    payload = _stored_securities_payload(ticker.strip().upper())
+    if payload is None:
+        raise HTTPException(status_code=404, detail=f"No saved securities result for {ticker}")
+    return Response(content=payload, media_type="application/json")
+
 @app.post("/extract/actions")
 async def extract_actions(request: ExtractionRequest, background_tasks: BackgroundTasks):
     """Extract corporate actions for a ticker"""
     try:
         logger.info(f"Extracting corporate actions for {request.ticker}")
 
+        from core.corporate_actions_extractor import extract_corporate_actions, CorporateActionsExtractor
         result = extract_corporate_actions(request.ticker, request.api_key)
 
         # Save LLM data to organized directory
-        from core.corporate_actions_extractor import CorporateActionsExtractor
         extractor = CorporateActionsExtractor(request.api_key)
         extractor.save_results(result)
 
@@ -111,59 +299,38 @@ async def extract_actions(request: ExtractionRequest, background_tasks: Backgrou
         logger.error(f"Error extracting actions for {request.ticker}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/extract/securities/{ticker}")
+@app.get("/extract/securities/{ticker}", response_model=SecuritiesResponse)
 async def get_securities_features(ticker: str, api_key: Optional[str] = None):
     """Get securities features for a ticker (GET endpoint)"""
     try:
+        from core.securities_features_extractor import extract_securities_features
         result = extract_securities_features(ticker, api_key)
 
-        return {
-            "ticker": result.ticker,
-            "extraction_date": result.extraction_date.isoformat(),
-            "total_securities": result.total_securities,
-            "securities": [
-                {
-                    "security_id": s.security_id,
-                    "security_type": s.security_type.value,
-                    "principal_amount": s.principal_amount,
-                    "interest_rate": s.interest_rate,
-                    "maturity_date": s.maturity_date.isoformat() if s.maturity_date else None,
-                    "conversion_terms": s.conversion_terms.dict() if s.conversion_terms else None,
-                    "redemption_terms": s.redemption_terms.dict() if s.redemption_terms else None,
-                    "special_features": s.special_features.dict() if s.special_features else None,
-                }
-                for s in result.securities
-            ]
-        }
+        return _model_response(SecuritiesResponse(
+            ticker=result.ticker,
+            extraction_date=result.extraction_date,
+            total_securities=result.total_securities,
+            securities=[SecuritySummary.model_validate(s, from_attributes=True) for s in result.securities]
+        ))
 
     except Exception as e:
         logger.error(f"Error getting securities for {ticker}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/extract/actions/{ticker}")
+@app.get("/extract/actions/{ticker}", response_model=CorporateActionsResponse)
 async def get_corporate_actions(ticker: str, api_key: Optional[str] = None):
     """Get corporate actions for a ticker (GET endpoint)"""
     try:
+        from core.corporate_actions_extractor import extract_corporate_actions
         result = extract_corporate_actions(ticker, api_key)
 
-        return {
-            "ticker": result.ticker,
-            "extraction_date": result.extraction_date.isoformat(),
-            "total_actions": result.total_actions,
-            "corporate_actions": [
-                {
-                    "action_id": a.action_id,
-                    "action_type": a.action_type.value,
-                    "title": a.title,
-                    "description": a.description,
-                    "announcement_date": a.announcement_date.isoformat() if a.announcement_date else None,
-                    "status": a.status.value,
-                    "amount": a.amount,
-                    "target_security": a.target_security,
-                }
-                for a in result.corporate_actions
-            ]
-        }
+        return _model_response(CorporateActionsResponse(
+            ticker=result.ticker,
+            extraction_date=result.extraction_date,
+            total_actions=result.total_actions,
+            corporate_actions=[CorporateActionSummary.model_validate(a, from_attributes=True)
+                               for a in result.corporate_actions]
+        ))
 
     except Exception as e:
         logger.error(f"Error getting actions for {ticker}: {e}")
@@ -175,6 +342,7 @@ async def extract_xbrl_data(request: ExtractionRequest):
     try:
         logger.info(f"Extracting XBRL data for {request.ticker}")
 
+        from core.xbrl_preferred_shares_extractor import extract_xbrl_preferred_shares
         result = extract_xbrl_preferred_shares(request.ticker)
 
         return ExtractionResponse(
@@ -187,31 +355,32 @@ async def extract_xbrl_data(request: ExtractionRequest):
         logger.error(f"Error extracting XBRL data for {request.ticker}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/extract/xbrl/{ticker}")
+@app.get("/extract/xbrl/{ticker}", response_model=XBRLDataResponse)
 async def get_xbrl_data(ticker: str):
     """Get XBRL preferred shares data for a ticker (GET endpoint)"""
     try:
+        from core.xbrl_preferred_shares_extractor import extract_xbrl_preferred_shares
         result = extract_xbrl_preferred_shares(ticker)
 
         if "error" in result:
             raise HTTPException(status_code=404, detail=result["error"])
 
-        return {
-            "ticker": result["ticker"],
-            "filing_type": result.get("filing_type", "10-Q"),
-            "extraction_date": result.get("extraction_date"),
-            "xbrl_available": result.get("xbrl_available", False),
-            "summary": {
-                "has_preferred_shares": result.get("has_preferred_shares", False),
-                "xbrl_tags_found": result.get("xbrl_tags_found", 0),
-                "series_identified": result.get("series_identified", []),
-                "cusips_identified": result.get("cusips_identified", []),
-                "data_quality_score": result.get("data_quality_score", 0.0),
-                "total_mentioned": result.get("total_mentioned", 0)
-            },
-            "tag_distribution": result.get("tag_distribution", {}),
-            "numeric_values_found": result.get("numeric_values_found", [])
-        }
+        return _model_response(XBRLDataResponse(
+            ticker=result["ticker"],
+            filing_type=result.get("filing_type", "10-Q"),
+            extraction_date=result.get("extraction_date"),
+            xbrl_available=result.get("xbrl_available", False),
+            summary=XBRLSummaryResponse(
+                has_preferred_shares=result.get("has_preferred_shares", False),
+                xbrl_tags_found=result.get("xbrl_tags_found", 0),
+                series_identified=result.get("series_identified", []),
+                cusips_identified=result.get("cusips_identified", []),
+                data_quality_score=result.get("data_quality_score", 0.0),
+                total_mentioned=result.get("total_mentioned", 0)
+            ),
+            tag_distribution=result.get("tag_distribution", {}),
+            numeric_values_found=result.get("numeric_values_found", [])
+        ))
 
     except Exception as e:
         logger.error(f"Error getting XBRL data for {ticker}: {e}")
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Universe-wide preferred stock extraction with checkpoint/resume.
+
+Runs the simplified pipeline for every ticker in a universe CSV
+(preferred_stocks_list.csv, convertibles.csv, or any CSV with a ticker or
+Symbol column):
+
+1. 10-Q → preferred series names            (--series-workers)
+2. Regex match 424B filings → prospectuses   (--match-workers)
+3. LLM extract features from the matches     (--llm-workers)
+
+Each stage has its own worker pool, so SEC downloads keep flowing while
+the LLM stage works. Every stage outcome is appended to a JSONL ledger
+(flushed and fsynced), and each ticker's results are saved to output/llm/
+as soon as it finishes, so an interrupted run picks up where it stopped:
+finished tickers are skipped and tickers whose series were already found
+restart at the matching stage.
+
+Every LLM call is accounted for (tokens, latency, context-cache hits) per
+ticker and for the run; with --token-budget / --ticker-token-budget the
+LLM stage falls back to regex-only extraction once a budget is spent.
+The run's usage is written next to the ledger (<ledger>.usage.json).
+With --batch-small-filings, short pricing supplements of a ticker are
+packed several to an LLM request.
+
+Usage:
+    python scripts/batch_extract_preferred.py preferred_stocks_list.csv
+    python scripts/batch_extract_preferred.py convertibles.csv --llm-workers 2 --retry-failed
+    python scripts/batch_extract_preferred.py preferred_stocks_list.csv --token-budget 5000000
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import csv
+import json
+import time
+import logging
+import argparse
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from core.sec_api_client import SECAPIClient
+from core.filing_matcher import match_series_to_424b
+from core.securities_features_extractor import SecuritiesFeaturesExtractor, find_preferred_series
+from core.llm_accounting import LLMAccountant
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEDGER_DIR = os.path.join('output', 'batch')
+TICKER_COLUMNS = ('ticker', 'Ticker', 'Symbol', 'symbol')
+
+STATUS_SERIES_FOUND = 'series_found'
+STATUS_DONE = 'done'
+STATUS_NO_SERIES = 'no_series'
+STATUS_NO_FILINGS = 'no_filings'
+STATUS_FAILED = 'failed'
+FINISHED_STATUSES = (STATUS_DONE, STATUS_NO_SERIES, STATUS_NO_FILINGS)
+
+
+def load_universe(path: str) -> List[str]:
+    """
+    Tickers from a universe CSV, in file order without duplicates.
+
+    Share-class symbols such as "EPR/PRC" are reduced to the issuer ticker.
+    """
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.DictReader(f)
+        column = next((c for c in TICKER_COLUMNS if c in (reader.fieldnames or [])), None)
+        if not column:
+            raise ValueError(f"{path} has no ticker column (expected one of {', '.join(TICKER_COLUMNS)})")
+        tickers = []
+        for row in reader:
+            ticker = (row.get(column) or '').split('/')[0].strip().upper()
+            if ticker and ticker not in tickers:
+                tickers.append(ticker)
+    return tickers
+
+
+class CheckpointLedger:
+    """Append-only JSONL record of per-ticker stage outcomes; the last record per ticker wins."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.entries: Dict[str, Dict] = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # a line cut short by an interrupted write
+                    self.entries[entry['ticker']] = entry
+
+    def record(self, ticker: str, status: str, **fields):
+        entry = {'ticker': ticker, 'status': status, 'time': datetime.now().isoformat(timespec='seconds'), **fields}
+        line = json.dumps(entry, default=str) + '\n'
+        with self._lock:
+            self.entries[ticker] = entry
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def status(self, ticker: str) -> Optional[str]:
+        entry = self.entries.get(ticker)
+        return entry['status'] if entry else None
+
+    def series(self, ticker: str) -> Optional[List[str]]:
+        entry = self.entries.get(ticker)
+        return entry.get('series') if entry and entry['status'] == STATUS_SERIES_FOUND else None
+
+
+class PreferredBatchRunner:
+    """Runs the three pipeline stages across tickers with a bounded pool per stage."""
+
+    def __init__(self, ledger: CheckpointLedger, api_key: Optional[str] = None, output_dir: str = "output/llm",
+                 series_workers: int = 4, match_workers: int = 4, llm_workers: int = 2, max_filings: int = 20,
+                 accountant: Optional[LLMAccountant] = None, batch_small_filings: bool = False):
+        self.ledger = ledger
+        self.api_key = api_key
+        # Shared by every LLM worker so budgets apply to the whole run
+        self.accountant = accountant or LLMAccountant()
+        self.batch_small_filings = batch_small_filings
+        self.output_dir = output_dir
+        self.max_filings = max_filings
+        self.sec_client = SECAPIClient()
+        self.pools = {
+            'series': ThreadPoolExecutor(series_workers, thread_name_prefix='series'),
+            'match': ThreadPoolExecutor(match_workers, thread_name_prefix='match'),
+            'extract': ThreadPoolExecutor(llm_workers, thread_name_prefix='llm'),
+        }
+        # Tickers admitted to the pipeline at once; keeps matched filing text from piling up
+        self.max_in_flight = 2 * (series_workers + match_workers + llm_workers)
+        self._local = threading.local()
+
+    def _extractor(self) -> SecuritiesFeaturesExtractor:
+        if not hasattr(self._local, 'extractor'):
+            self._local.extractor = SecuritiesFeaturesExtractor(self.api_key, accountant=self.accountant,
+                                                                batch_small_filings=self.batch_small_filings)
+        return self._local.extractor
+
+    def _find_series(self, ticker: str) -> List[str]:
+        return sorted(find_preferred_series(ticker, self.sec_client))
+
+    def _match(self, ticker: str, series: List[str]) -> List[Dict]:
+        return match_series_to_424b(ticker, series, max_filings=self.max_filings, client=self.sec_client)
+
+    def _extract(self, ticker: str, matched_filings: List[Dict]) -> int:
+        extractor = self._extractor()
+        result = extractor.extract_securities_features(ticker, matched_filings)
+        extractor.save_results(result, self.output_dir)
+        return result.total_securities
+
+    def run(self, tickers: List[str]) -> Counter:
+        """Process tickers, resuming from the ledger; returns outcome counts."""
+        pending = {}
+        queue = iter(tickers)
+        outcomes: Counter = Counter()
+
+        def admit():
+            while len(pending) < self.max_in_flight:
+                ticker = next(queue, None)
+                if ticker is None:
+                    return
+                series = self.ledger.series(ticker)
+                if series:
+                    pending[self.pools['match'].submit(self._match, ticker, series)] = ('match', ticker)
+                else:
+                    pending[self.pools['series'].submit(self._find_series, ticker)] = ('series', ticker)
+
+        try:
+            admit()
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, ticker = pending.pop(future)
+                    try:
+                        value = future.result()
+                    except Exception as e:
+                        logger.error(f"{ticker}: {stage} failed: {e}")
+                        self.ledger.record(ticker, STATUS_FAILED, stage=stage, error=str(e))
+                        outcomes[STATUS_FAILED] += 1
+                        continue
+
+                    if stage == 'series':
+                        if not value:
+                            self.ledger.record(ticker, STATUS_NO_SERIES)
+                            outcomes[STATUS_NO_SERIES] += 1
+                            continue
+                        self.ledger.record(ticker, STATUS_SERIES_FOUND, series=value)
+                        pending[self.pools['match'].submit(self._match, ticker, value)] = ('match', ticker)
+                    elif stage == 'match':
+                        if not value:
+                            self.ledger.record(ticker, STATUS_NO_FILINGS)
+                            outcomes[STATUS_NO_FILINGS] += 1
+                            continue
+                        pending[self.pools['extract'].submit(self._extract, ticker, value)] = ('extract', ticker)
+                    else:
+                        usage = self.accountant.ticker_usage(ticker)
+                        self.ledger.record(ticker, STATUS_DONE, securities=value, llm_calls=usage.calls,
+                                           llm_tokens=usage.total_tokens, llm_skipped=usage.skipped)
+                        outcomes[STATUS_DONE] += 1
+                        logger.info(f"{ticker}: {value} securities")
+                admit()
+        finally:
+            for pool in self.pools.values():
+                pool.shutdown(wait=True, cancel_futures=True)
+        return outcomes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run preferred stock extraction across a universe of tickers')
+    parser.add_argument('universe', help='CSV with a ticker or Symbol column (e.g. preferred_stocks_list.csv)')
+    parser.add_argument('--ledger', help=f'Checkpoint ledger path (default: {DEFAULT_LEDGER_DIR}/<universe>.ledger.jsonl)')
+    parser.add_argument('--output-dir', default='output/llm', help='Where per-ticker results are saved (default: output/llm)')
+    parser.add_argument('--api-key', default=os.getenv('GOOGLE_API_KEY'), help='Gemini API key (default: $GOOGLE_API_KEY)')
+    parser.add_argument('--series-workers', type=int, default=4, help='Concurrent 10-Q series lookups (default: 4)')
+    parser.add_argument('--match-workers', type=int, default=4, help='Concurrent 424B matching jobs (default: 4)')
+    parser.add_argument('--llm-workers', type=int, default=2, help='Concurrent LLM extractions (default: 2)')
+    parser.add_argument('--max-filings', type=int, default=20, help='424B filings checked per ticker (default: 20)')
+    parser.add_argument('--retry-failed', action='store_true', help='Also rerun tickers whose last attempt failed')
+    parser.add_argument('--limit', type=int, help='Only process the first N pending tickers')
+    parser.add_argument('--token-budget', type=int,
+                        help='LLM tokens (prompt + response) for this run; regex-only extraction after that')
+    parser.add_argument('--ticker-token-budget', type=int, help='LLM tokens allowed per ticker')
+    parser.add_argument('--batch-small-filings', action='store_true',
+                        help='Pack small 424B supplements several to an LLM request')
+    parser.add_argument('--input-cost', type=float, default=0.0, help='Price per million prompt tokens, for cost estimates')
+    parser.add_argument('--output-cost', type=float, default=0.0, help='Price per million response tokens, for cost estimates')
+    args = parser.parse_args()
+
+    universe = load_universe(args.universe)
+    ledger_path = args.ledger or os.path.join(
+        DEFAULT_LEDGER_DIR, f"{os.path.splitext(os.path.basename(args.universe))[0]}.ledger.jsonl")
+    ledger = CheckpointLedger(ledger_path)
+
+    skip = set(FINISHED_STATUSES) if args.retry_failed else set(FINISHED_STATUSES) | {STATUS_FAILED}
+    tickers = [t for t in universe if ledger.status(t) not in skip]
+    if args.limit is not None:
+        tickers = tickers[:args.limit]
+
+    logger.info(f"{len(universe)} tickers in {args.universe}; {len(universe) - len(tickers)} already processed, "
+                f"{len(tickers)} to run (ledger: {ledger_path})")
+    if not tickers:
+        return 0
+
+    started = time.perf_counter()
+    accountant = LLMAccountant(token_budget=args.token_budget, ticker_token_budget=args.ticker_token_budget,
+                               input_cost_per_million=args.input_cost, output_cost_per_million=args.output_cost)
+    runner = PreferredBatchRunner(ledger, api_key=args.api_key, output_dir=args.output_dir,
+                                  series_workers=args.series_workers, match_workers=args.match_workers,
+                                  llm_workers=args.llm_workers, max_filings=args.max_filings,
+                                  accountant=accountant, batch_small_filings=args.batch_small_filings)
+    outcomes = runner.run(tickers)
+
+    logger.info(f"Finished {sum(outcomes.values())} tickers in {time.perf_counter() - started:.0f}s: "
+                + ', '.join(f"{status} {count}" for status, count in sorted(outcomes.items())))
+    logger.info(f"LLM usage: {accountant.describe()}")
+    usage_path = os.path.splitext(ledger_path)[0] + '.usage.json'
+    with open(usage_path, 'w', encoding='utf-8') as f:
+        json.dump(accountant.summary(), f, indent=2)
+    return 1 if outcomes[STATUS_FAILED] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
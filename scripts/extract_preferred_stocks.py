@@ -12,21 +12,32 @@ import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+from contextlib import nullcontext
+
 from core.securities_features_extractor import extract_preferred_stocks_simple
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python extract_preferred_stocks.py <TICKER> [API_KEY]")
+    # --profile writes cProfile/tracemalloc reports to output/profiles/
+    profile = '--profile' in sys.argv
+    args = [arg for arg in sys.argv[1:] if arg != '--profile']
+    if len(args) < 1:
+        print("Usage: python extract_preferred_stocks.py <TICKER> [API_KEY] [--profile]")
         sys.exit(1)
 
-    ticker = sys.argv[1]
-    api_key = sys.argv[2] if len(sys.argv) > 2 else os.getenv('GOOGLE_API_KEY')
+    ticker = args[0]
+    api_key = args[1] if len(args) > 1 else os.getenv('GOOGLE_API_KEY')
 
     print(f"Extracting preferred stocks for {ticker}")
     print("=" * 50)
 
+    profiler = None
+    if profile:
+        from core.profiling import ExtractionProfiler
+        profiler = ExtractionProfiler()
+
     try:
-        result = extract_preferred_stocks_simple(ticker, api_key)
+        with profiler.profile(ticker) if profiler else nullcontext():
+            result = extract_preferred_stocks_simple(ticker, api_key)
 
         print("\nEXTRACTION COMPLETE")
         print(f"Found {result.total_securities} securities")
@@ -69,6 +80,11 @@ def main():
         print(f"Error: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        if profiler:
+            summary_path = profiler.write_summary()
+            if summary_path:
+                print(f"\nProfile summary: {summary_path}")
 
 if __name__ == "__main__":
     main()
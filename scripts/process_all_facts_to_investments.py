@@ -10,16 +10,32 @@ This script:
 import csv
 import json
 import re
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from collections import defaultdict
 from datetime import datetime
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
+AS_OF_RE = re.compile(r'As_Of_(\d+)_(\d+)_(\d+)')
+
+# Decoding errors from either backend (orjson.JSONDecodeError subclasses ValueError)
+_JSON_ERRORS = (ValueError, TypeError)
+
+
+@lru_cache(maxsize=1024)
 def parse_context_date(context_ref: str) -> Optional[datetime]:
     """Extract date from context_ref like 'As_Of_9_30_2025' or 'As_Of_12_31_2024'."""
     # Match patterns like "As_Of_9_30_2025" or "As_Of_12_31_2024"
-    match = re.search(r'As_Of_(\d+)_(\d+)_(\d+)', context_ref)
+    # (cached: a file only has a handful of distinct As_Of contexts)
+    match = AS_OF_RE.search(context_ref)
     if match:
         month, day, year = match.groups()
         try:
@@ -47,8 +63,8 @@ def extract_value_from_json_fact(fact_dict: Dict, key: str) -> Optional[str]:
 def parse_json_facts(all_facts_json: str) -> Dict:
     """Parse the all_facts_json string into a dictionary."""
     try:
-        return json.loads(all_facts_json)
-    except (json.JSONDecodeError, TypeError):
+        return _json_loads(all_facts_json)
+    except _JSON_ERRORS:
         return {}
 
 
@@ -340,27 +356,7 @@ def process_all_facts_file(input_file: Path, output_file: Path):
                         # Look for older contexts with financial data
                         for date, row in dated_rows_with_dates:
                             if row.get('principal_amount') or row.get('cost') or row.get('fair_value'):
-                                # Merge: use best_row as base, fill in missing fields from row
-                                if not best_row.get('principal_amount') and row.get('principal_amount'):
-                                    best_row['principal_amount'] = row['principal_amount']
-                                if not best_row.get('cost') and row.get('cost'):
-                                    best_row['cost'] = row['cost']
-                                if not best_row.get('fair_value') and row.get('fair_value'):
-                                    best_row['fair_value'] = row['fair_value']
-                                if not best_row.get('maturity_date') and row.get('maturity_date'):
-                                    best_row['maturity_date'] = row['maturity_date']
-                                if not best_row.get('interest_rate') and row.get('interest_rate'):
-                                    best_row['interest_rate'] = row['interest_rate']
-                                if not best_row.get('spread') and row.get('spread'):
-                                    best_row['spread'] = row['spread']
-                                # Also merge JSON facts if best_row has minimal facts
-                                if int(best_row.get('fact_count', 0)) < 5:
-                                    best_facts = parse_json_facts(best_row.get('all_facts_json', '{}'))
-                                    other_facts = parse_json_facts(row.get('all_facts_json', '{}'))
-                                    # Merge facts (best_row takes precedence)
-                                    merged_facts = {**other_facts, **best_facts}
-                                    best_row['all_facts_json'] = json.dumps(merged_facts)
-                                    best_row['fact_count'] = str(len(merged_facts))
+                                _fill_missing_fields(best_row, row)
                                 break
                     
                     latest_investments.append((best_date, best_row))
@@ -382,10 +378,46 @@ def process_all_facts_file(input_file: Path, output_file: Path):
         inv = extract_investment_fields(row, facts_json)
         investments.append(inv)
     
-    # Sort by company name
+    _write_investments(investments, output_file)
+    
+    return investments
+
+
+def _is_substantial(row: Dict) -> bool:
+    """A context row is substantial if it has fact_count > 2 or any financial data."""
+    return int(row.get('fact_count', 0)) > 2 or bool(
+        row.get('principal_amount') or
+        row.get('cost') or
+        row.get('fair_value') or
+        row.get('maturity_date') or
+        row.get('interest_rate')
+    )
+
+
+def _has_amounts(row: Dict) -> bool:
+    return bool(row.get('principal_amount') or row.get('cost') or row.get('fair_value'))
+
+
+def _fill_missing_fields(best_row: Dict, row: Dict):
+    """Fill best_row's missing financial fields (and sparse JSON facts) from an older context row."""
+    # Merge: use best_row as base, fill in missing fields from row
+    for field in ('principal_amount', 'cost', 'fair_value', 'maturity_date', 'interest_rate', 'spread'):
+        if not best_row.get(field) and row.get(field):
+            best_row[field] = row[field]
+    # Also merge JSON facts if best_row has minimal facts
+    if int(best_row.get('fact_count', 0)) < 5:
+        best_facts = parse_json_facts(best_row.get('all_facts_json', '{}'))
+        other_facts = parse_json_facts(row.get('all_facts_json', '{}'))
+        # Merge facts (best_row takes precedence)
+        merged_facts = {**other_facts, **best_facts}
+        best_row['all_facts_json'] = json.dumps(merged_facts)
+        best_row['fact_count'] = str(len(merged_facts))
+
+
+def _write_investments(investments: List[Dict], output_file: Path):
+    """Sort investments by company name and write the investment table."""
     investments.sort(key=lambda x: x['company_name'])
     
-    # Write output
     fieldnames = [
         'company_name', 'industry', 'business_description', 'investment_type',
         'acquisition_date', 'maturity_date', 'principal_amount', 'cost',
@@ -399,8 +431,84 @@ def process_all_facts_file(input_file: Path, output_file: Path):
         writer.writerows(investments)
     
     print(f"  Wrote {len(investments)} investments to {output_file.name}")
+
+
+def process_all_facts_file_streaming(input_file: Path, output_file: Path):
+    """
+    Streaming variant of process_all_facts_file.
+    
+    Reads the CSV in a single pass and keeps only a running reduction per
+    investment key (most recent row, most recent substantial row, most
+    recent row with amounts), so memory is bounded by the number of unique
+    investments instead of the number of context rows. JSON facts are only
+    decoded for the rows that end up in the output. Produces the same
+    investment table as process_all_facts_file.
+    """
+    print(f"Processing {input_file.name} (streaming)...")
+    
+    # key -> [latest, latest_substantial, latest_with_amounts]; each (date, row) or None
+    # Ties on date keep the earliest row in the file, as the stable sort does.
+    reduced: Dict[str, List[Optional[Tuple[datetime, Dict]]]] = {}
+    # First occurrence per key, only needed while no As_Of context has been seen
+    first_rows: Dict[str, Dict] = {}
+    # First-seen position per key, so output order matches the batch path on ties
+    key_order: Dict[str, int] = {}
+    has_date_contexts = False
+    row_count = 0
     
-    return investments
+    with open(input_file, 'r', encoding='utf-8', newline='') as f:
+        for row in csv.DictReader(f):
+            row_count += 1
+            context_ref = row.get('context_ref', '')
+            
+            if not is_as_of_context(context_ref):
+                key = get_investment_key(row)
+                key_order.setdefault(key, len(key_order))
+                if not has_date_contexts:
+                    first_rows.setdefault(key, row)
+                continue
+            
+            if not has_date_contexts:
+                has_date_contexts = True
+                first_rows.clear()
+            date = parse_context_date(context_ref)
+            if not date:
+                continue
+            
+            key = get_investment_key(row)
+            key_order.setdefault(key, len(key_order))
+            slots = reduced.get(key)
+            if slots is None:
+                slots = reduced[key] = [None, None, None]
+            if slots[0] is None or date > slots[0][0]:
+                slots[0] = (date, row)
+            if (slots[1] is None or date > slots[1][0]) and _is_substantial(row):
+                slots[1] = (date, row)
+            if (slots[2] is None or date > slots[2][0]) and _has_amounts(row):
+                slots[2] = (date, row)
+    
+    if row_count == 0:
+        print(f"  No data found in {input_file.name}")
+        return []
+    
+    if has_date_contexts:
+        latest_rows = []
+        for key in sorted(reduced, key=key_order.__getitem__):
+            latest, substantial, with_amounts = reduced[key]
+            best_row = (substantial or latest)[1]
+            if not _has_amounts(best_row) and with_amounts:
+                _fill_missing_fields(best_row, with_amounts[1])
+            latest_rows.append(best_row)
+    else:
+        latest_rows = list(first_rows.values())
+    
+    print(f"  Found {len(latest_rows)} unique investments (most recent context) from {row_count} rows")
+    
+    investments = [
+        extract_investment_fields(row, parse_json_facts(row.get('all_facts_json', '{}')))
+        for row in latest_rows
+    ]
+    _write_investments(investments, output_file)
     
     return investments
 
@@ -434,8 +542,64 @@ def validate_investment_data(investments: List[Dict]) -> Dict:
     }
 
 
+def process_ticker_file(input_file: Path, output_dir: Path, streaming: bool = False) -> Dict:
+    """Process one ticker's all_facts file and return its summary result."""
+    # Extract ticker from filename (e.g., WHF_all_facts.csv -> WHF)
+    ticker = input_file.stem.replace('_all_facts', '').upper()
+    
+    # Determine output filename
+    # Try to find existing investment file to match naming
+    existing_files = list(output_dir.glob(f'{ticker}_*_investments.csv'))
+    if existing_files:
+        # Use existing filename pattern
+        output_file = existing_files[0]
+        print(f"Using existing output file: {output_file.name}")
+    else:
+        # Create new filename
+        output_file = output_dir / f'{ticker}_investments.csv'
+    
+    try:
+        # Process file and get investments
+        if streaming:
+            investments = process_all_facts_file_streaming(input_file, output_file)
+        else:
+            investments = process_all_facts_file(input_file, output_file)
+        
+        # Validate data quality
+        validation = validate_investment_data(investments)
+        
+        # Print quick summary
+        if validation['total'] > 0:
+            print(f"  Data quality: {validation['coverage'].get('principal_amount', 0):.1f}% principal, "
+                  f"{validation['coverage'].get('cost', 0):.1f}% cost, "
+                  f"{validation['coverage'].get('fair_value', 0):.1f}% fair_value, "
+                  f"{validation['coverage'].get('maturity_date', 0):.1f}% maturity_date")
+        
+        return {
+            'ticker': ticker,
+            'file': input_file.name,
+            'validation': validation
+        }
+    except Exception as e:
+        print(f"  ERROR processing {input_file.name}: {e}")
+        import traceback
+        traceback.print_exc()
+        return {
+            'ticker': ticker,
+            'file': input_file.name,
+            'error': str(e)
+        }
+
+
 def main():
     """Process all all_facts CSV files."""
+    parser = argparse.ArgumentParser(description='Build investment tables from XBRL all_facts CSVs')
+    parser.add_argument('--streaming', action='store_true',
+                        help='Single-pass streaming reduction (bounded memory per file)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of files to process in parallel (default: 1)')
+    args = parser.parse_args()
+    
     input_dir = Path('output/xbrl_all_facts')
     output_dir = Path('output')
     
@@ -473,51 +637,28 @@ def main():
     # Track results for summary
     results = []
     
-    for input_file in files_to_process:
-        # Extract ticker from filename (e.g., WHF_all_facts.csv -> WHF)
-        ticker = input_file.stem.replace('_all_facts', '').upper()
-        
-        # Determine output filename
-        # Try to find existing investment file to match naming
-        existing_files = list(output_dir.glob(f'{ticker}_*_investments.csv'))
-        if existing_files:
-            # Use existing filename pattern
-            output_file = existing_files[0]
-            print(f"Using existing output file: {output_file.name}")
-        else:
-            # Create new filename
-            output_file = output_dir / f'{ticker}_investments.csv'
-        
-        try:
-            # Process file and get investments
-            investments = process_all_facts_file(input_file, output_file)
-            
-            # Validate data quality
-            validation = validate_investment_data(investments)
-            results.append({
-                'ticker': ticker,
-                'file': input_file.name,
-                'validation': validation
-            })
-            
-            # Print quick summary
-            if validation['total'] > 0:
-                print(f"  Data quality: {validation['coverage'].get('principal_amount', 0):.1f}% principal, "
-                      f"{validation['coverage'].get('cost', 0):.1f}% cost, "
-                      f"{validation['coverage'].get('fair_value', 0):.1f}% fair_value, "
-                      f"{validation['coverage'].get('maturity_date', 0):.1f}% maturity_date")
-            
-        except Exception as e:
-            print(f"  ERROR processing {input_file.name}: {e}")
-            import traceback
-            traceback.print_exc()
-            results.append({
-                'ticker': ticker,
-                'file': input_file.name,
-                'error': str(e)
-            })
-        
-        print()
+    if args.workers > 1:
+        # Files are independent; per-file output lines may interleave
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            futures = {
+                executor.submit(process_ticker_file, input_file, output_dir, args.streaming): input_file
+                for input_file in files_to_process
+            }
+            for future in as_completed(futures):
+                input_file = futures[future]
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    print(f"  ERROR processing {input_file.name}: {e}")
+                    results.append({
+                        'ticker': input_file.stem.replace('_all_facts', '').upper(),
+                        'file': input_file.name,
+                        'error': str(e)
+                    })
+    else:
+        for input_file in files_to_process:
+            results.append(process_ticker_file(input_file, output_dir, args.streaming))
+            print()
     
     # Print summary report
     print("\n" + "="*80)